@@ -1,3 +1,6 @@
 from .menu_bll import MenuBLL
+from .job_bll import JobBLL
+from .search_bll import SearchBLL
+from .price_bll import PriceBLL
 
-__all__ = ["MenuBLL"]
+__all__ = ["MenuBLL", "JobBLL", "SearchBLL", "PriceBLL"]
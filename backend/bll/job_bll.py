@@ -0,0 +1,160 @@
+"""
+Business Logic Layer (BLL) for scan job operations.
+This layer contains business logic and uses DAL for database operations.
+"""
+
+from sqlalchemy.orm import Session
+from dal.job_dal import JobDAL
+from typing import List, Optional, Set
+
+
+class JobBLL:
+    """Business Logic Layer for scan job operations"""
+
+    def __init__(self, db: Session):
+        """
+        Initialize BLL with database session.
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+        self.dal = JobDAL()
+
+    def enqueue_job(self, job_id: str, menu_id: str, image_path: str, original_filename: str = None,
+                    content_hash: str = None) -> dict:
+        """
+        Add a new scan job to the queue.
+
+        Args:
+            job_id: Unique job identifier
+            menu_id: ID the scanned menu will be saved under
+            image_path: Path to the uploaded image
+            original_filename: Original filename of the uploaded file
+            content_hash: SHA-256 hex digest of the uploaded image
+
+        Returns:
+            Job status dictionary
+        """
+        db_job = self.dal.create_job(
+            db=self.db,
+            job_id=job_id,
+            menu_id=menu_id,
+            image_path=image_path,
+            original_filename=original_filename,
+            content_hash=content_hash
+        )
+        return self._to_status(db_job)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """
+        Get the status of a job.
+
+        Args:
+            job_id: The job ID to retrieve
+
+        Returns:
+            Job status dictionary or None if not found
+        """
+        db_job = self.dal.get_job_by_id(self.db, job_id)
+        if not db_job:
+            return None
+        return self._to_status(db_job)
+
+    def claim_next_job(self, max_attempts: int) -> Optional[dict]:
+        """
+        Claim the next queued job for processing.
+
+        Args:
+            max_attempts: Number of times a job may be started before it is marked failed
+
+        Returns:
+            Dictionary with the job fields a worker needs, or None if the queue is empty
+        """
+        db_job = self.dal.claim_next_job(self.db, max_attempts)
+        if not db_job:
+            return None
+        return {
+            "job_id": db_job.id,
+            "menu_id": db_job.menu_id,
+            "image_path": db_job.image_path,
+            "original_filename": db_job.original_filename,
+            "content_hash": db_job.content_hash,
+            "attempts": db_job.attempts
+        }
+
+    def complete_job(self, job_id: str, stage_timings: dict) -> None:
+        """Mark a job as successfully finished"""
+        self.dal.finish_job(self.db, job_id, "done", stage_timings)
+
+    def fail_job(self, job_id: str, stage_timings: dict, error: str) -> None:
+        """Mark a job as failed"""
+        self.dal.finish_job(self.db, job_id, "failed", stage_timings, error=error)
+
+    def renew_leases(self, job_ids: List[str]) -> int:
+        """
+        Record that a worker is still running these jobs.
+
+        Args:
+            job_ids: IDs of the running jobs
+
+        Returns:
+            Number of renewed jobs
+        """
+        return self.dal.renew_leases(self.db, job_ids)
+
+    def recover_stale_jobs(self, lease_seconds: int) -> int:
+        """
+        Requeue jobs abandoned by a stopped worker.
+
+        Args:
+            lease_seconds: Seconds without a heartbeat before a job is considered abandoned
+
+        Returns:
+            Number of requeued jobs
+        """
+        return self.dal.requeue_expired_jobs(self.db, lease_seconds)
+
+    def requeue_jobs(self, job_ids: List[str]) -> int:
+        """
+        Requeue jobs a stopping worker did not finish.
+
+        Args:
+            job_ids: IDs of the interrupted jobs
+
+        Returns:
+            Number of requeued jobs
+        """
+        return self.dal.requeue_jobs(self.db, job_ids)
+
+    def get_queue_depth(self) -> int:
+        """
+        Get the number of jobs waiting to be processed.
+
+        Returns:
+            Count of queued jobs
+        """
+        return self.dal.count_jobs_by_status(self.db, "queued")
+
+    def get_pending_image_paths(self) -> Set[str]:
+        """
+        Get the image paths of queued and running jobs.
+
+        Returns:
+            Set of image paths
+        """
+        return self.dal.get_pending_image_paths(self.db)
+
+    @staticmethod
+    def _to_status(db_job) -> dict:
+        # Business logic: Only expose the menu ID once the menu actually exists
+        return {
+            "job_id": db_job.id,
+            "status": db_job.status,
+            "menu_id": db_job.menu_id if db_job.status == "done" else None,
+            "error": db_job.error,
+            "stage_timings": db_job.stage_timings or {},
+            "created_at": db_job.created_at.isoformat() if db_job.created_at else None,
+            "started_at": db_job.started_at.isoformat() if db_job.started_at else None,
+            "finished_at": db_job.finished_at.isoformat() if db_job.finished_at else None
+        }
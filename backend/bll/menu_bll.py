@@ -3,10 +3,23 @@ Business Logic Layer (BLL) for Menu operations.
 This layer contains business logic and uses DAL for database operations.
 """
 
+import base64
+import json
+import os
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from dal.menu_dal import MenuDAL
-from models.menu import MenuData, MenuCategory, MenuItem
-from typing import List, Optional
+from dal.job_dal import JobDAL
+from models.menu import MenuData
+from services.phash_index import phash_index
+from services.menu_cache import menu_cache
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Above this many menus (by the planner estimate) the list total is estimated instead of counted
+MENU_COUNT_EXACT_LIMIT = int(os.getenv("MENU_COUNT_EXACT_LIMIT", "100000"))
+# Most menus deleted per bulk delete request by ID, and per transaction when deleting by age
+MAX_BULK_DELETE = 1000
+DELETE_BATCH_SIZE = 500
 
 
 class MenuBLL:
@@ -22,10 +35,73 @@ class MenuBLL:
         self.db = db
         self.dal = MenuDAL()
 
-    def save_menu(self, menu_data: MenuData, menu_id: str, image_path: str, raw_text: str, original_filename: str = None) -> dict:
+    @staticmethod
+    def restaurant_name_for(menu_data: MenuData) -> str:
+        """Business logic: the parsed restaurant name, or "Unknown Restaurant" when it is missing"""
+        restaurant_name = menu_data.restaurant_name
+        if not restaurant_name or restaurant_name.strip() == "":
+            restaurant_name = "Unknown Restaurant"
+        return restaurant_name
+
+    @staticmethod
+    def category_rows(menu_data: MenuData) -> List[dict]:
+        """Convert parsed categories to the plain dicts the DAL writes"""
+        return [
+            {
+                "name": category.name,
+                "is_main": category.is_main,
+                "items": [
+                    {
+                        "name": item.name,
+                        "price": item.price,
+                        "description": item.description or "",
+                        "prices": [{"amount_cents": price.amount_cents, "label": price.label} for price in item.prices]
+                    }
+                    for item in category.items
+                ]
+            }
+            for category in menu_data.categories
+        ]
+
+    @staticmethod
+    def menu_snapshot(restaurant_name: str, categories: List[dict]) -> dict:
+        """
+        Build the denormalized snapshot stored on each menu row.
+        Keys follow MenuResponse, so the snapshot can be served as is.
+
+        Args:
+            restaurant_name: Stored restaurant name
+            categories: Category dicts as returned by category_rows
+
+        Returns:
+            {"restaurant_name", "categories"} dict
+        """
+        return {
+            "restaurant_name": restaurant_name,
+            "categories": [
+                {
+                    "name": category["name"],
+                    "items": [
+                        {
+                            "name": item["name"],
+                            "price": item["price"],
+                            "description": item["description"] or "",
+                            "prices": item["prices"]
+                        }
+                        for item in category["items"]
+                    ],
+                    "is_main": category["is_main"]
+                }
+                for category in categories
+            ]
+        }
+
+    def save_menu(self, menu_data: MenuData, menu_id: str, image_path: str, raw_text: str, original_filename: str = None,
+                  content_hash: str = None, perceptual_hash: str = None) -> dict:
         """
         Save a processed menu to the database.
-        This coordinates multiple DAL operations and adds business logic.
+        The menu, its categories and items are written in one transaction, so a failed
+        save leaves nothing behind.
 
         Args:
             menu_data: Parsed menu data (MenuData object)
@@ -33,44 +109,31 @@ class MenuBLL:
             image_path: Path to the uploaded image file
             raw_text: Original OCR extracted text
             original_filename: Original filename of the uploaded file
+            content_hash: SHA-256 hex digest of the uploaded image
+            perceptual_hash: Perceptual hash (hex) of the uploaded image
 
         Returns:
             Dictionary with menu summary
         """
-        # Business logic: Validate restaurant name
-        restaurant_name = menu_data.restaurant_name
-        if not restaurant_name or restaurant_name.strip() == "":
-            restaurant_name = "Unknown Restaurant"
+        restaurant_name = self.restaurant_name_for(menu_data)
+        categories = self.category_rows(menu_data)
 
-        # Create menu record using DAL
-        db_menu = self.dal.create_menu(
+        # Create menu (with its snapshot), categories and items in a single transaction using DAL
+        db_menu = self.dal.create_menu_bulk(
             db=self.db,
             menu_id=menu_id,
             restaurant_name=restaurant_name,
             raw_text=raw_text,
             image_path=image_path,
-            original_filename=original_filename
+            categories=categories,
+            original_filename=original_filename,
+            content_hash=content_hash,
+            perceptual_hash=perceptual_hash,
+            menu_snapshot=self.menu_snapshot(restaurant_name, categories)
         )
 
-        # Create categories and items
-        for category in menu_data.categories:
-            # Create category using DAL
-            db_category = self.dal.create_category(
-                db=self.db,
-                name=category.name,
-                is_main=category.is_main,
-                menu_id=menu_id
-            )
-
-            # Create items for this category using DAL
-            for item in category.items:
-                self.dal.create_menu_item(
-                    db=self.db,
-                    name=item.name,
-                    price=item.price,
-                    description=item.description or "",
-                    category_id=db_category.id
-                )
+        # Keep the near-duplicate index up to date
+        phash_index.add(db_menu.id, perceptual_hash)
 
         # Return summary
         return {
@@ -89,79 +152,328 @@ class MenuBLL:
         Returns:
             MenuData or None if not found
         """
+        snapshot = self.get_menu_snapshot(menu_id)
+        return MenuData.model_validate(snapshot) if snapshot else None
+
+    def get_menu_snapshot(self, menu_id: str) -> Optional[dict]:
+        """
+        Retrieve a menu as a {"restaurant_name", "categories"} dict.
+        Reads the stored snapshot with one primary-key lookup; menus saved before
+        snapshots existed are rebuilt from their categories and items.
+
+        Args:
+            menu_id: The menu ID to retrieve
+
+        Returns:
+            Snapshot dict or None if not found
+        """
+        versioned = self.get_versioned_snapshot(menu_id)
+        return versioned[0] if versioned else None
+
+    def get_versioned_snapshot(self, menu_id: str) -> Optional[Tuple[dict, int]]:
+        """
+        Retrieve a menu snapshot together with the menu's version.
+
+        Args:
+            menu_id: The menu ID to retrieve
+
+        Returns:
+            (snapshot, version) or None if not found
+        """
+        found, snapshot, version = self.dal.get_menu_snapshot(self.db, menu_id)
+        if not found:
+            return None
+        if snapshot is None:
+            snapshot = self._load_menu_snapshot(menu_id)
+        return (snapshot, version) if snapshot is not None else None
+
+    def _load_menu_snapshot(self, menu_id: str) -> Optional[dict]:
+        """Build a snapshot from the normalized tables"""
         # Get menu from DAL
         db_menu = self.dal.get_menu_by_id(self.db, menu_id)
 
         if not db_menu:
             return None
 
-        # Business logic: Convert database objects to Pydantic models
-        categories = []
-        for db_category in db_menu.categories:
-            items = [
-                MenuItem(
-                    name=db_item.name,
-                    price=db_item.price,
-                    description=db_item.description
-                )
-                for db_item in db_category.items
-            ]
+        # Business logic: Convert database objects to the snapshot format
+        return self.menu_snapshot(db_menu.restaurant_name, [
+            {
+                "name": db_category.name,
+                "is_main": db_category.is_main,
+                "items": [
+                    {
+                        "name": db_item.name,
+                        "price": db_item.price,
+                        "description": db_item.description,
+                        "prices": [
+                            {"amount_cents": db_price.amount_cents, "label": db_price.size_label}
+                            for db_price in db_item.prices
+                        ]
+                    }
+                    for db_item in db_category.items
+                ]
+            }
+            for db_category in db_menu.categories
+        ])
 
-            categories.append(MenuCategory(
-                name=db_category.name,
-                items=items,
-                is_main=db_category.is_main
-            ))
+    @staticmethod
+    def encode_cursor(created_at: datetime, menu_id: str) -> str:
+        """Encode a list position as an opaque cursor string"""
+        return base64.urlsafe_b64encode(json.dumps([created_at.isoformat(), menu_id]).encode()).decode()
 
-        return MenuData(
-            restaurant_name=db_menu.restaurant_name,
-            categories=categories
-        )
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """
+        Decode a cursor returned by list_menus.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            created_at, menu_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(created_at), str(menu_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
 
-    def list_menus(self, skip: int = 0, limit: int = 100) -> List[dict]:
+    def list_menus(self, skip: int = 0, limit: int = 100, cursor: str = None) -> dict:
         """
-        Get a list of all saved menus (summary only).
+        Get a page of saved menus (summary only), newest first.
 
         Args:
-            skip: Number of records to skip (for pagination)
+            skip: Number of records to skip (offset pagination, ignored when cursor is given)
             limit: Maximum number of records to return
+            cursor: next_cursor from the previous page (keyset pagination)
 
         Returns:
-            List of menu summaries
+            {"menus": list of menu summaries, "next_cursor": cursor of the next page or None}
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
         # Business logic: Validate pagination parameters
         if skip < 0:
             skip = 0
         if limit < 1 or limit > 100:
             limit = 100
+        after = self.decode_cursor(cursor) if cursor else None
 
-        # Get menus from DAL
-        menus = self.dal.get_all_menus(self.db, skip, limit)
+        # Get one extra row from DAL to know whether there is a next page
+        menus = self.dal.get_all_menus(self.db, skip, limit + 1, after)
+        has_more = len(menus) > limit
+        menus = menus[:limit]
 
         # Return formatted summaries
-        return [
-            {
-                "id": menu.id,
-                "restaurant_name": menu.restaurant_name,
-                "created_at": menu.created_at.isoformat(),
-                "image_path": menu.image_path
-            }
-            for menu in menus
-        ]
+        return {
+            "menus": [
+                {
+                    "id": menu.id,
+                    "restaurant_name": menu.restaurant_name,
+                    "created_at": menu.created_at.isoformat(),
+                    "image_path": menu.image_path,
+                    **self.image_urls(menu.content_hash)
+                }
+                for menu in menus
+            ],
+            "next_cursor": self.encode_cursor(menus[-1].created_at, menus[-1].id) if has_more else None
+        }
+
+    @staticmethod
+    def image_urls(content_hash: Optional[str]) -> dict:
+        """API URLs of a menu's image and its thumbnail (None for menus without a content hash)"""
+        if not content_hash:
+            return {"image_url": None, "thumbnail_url": None}
+        return {"image_url": f"/api/images/{content_hash}", "thumbnail_url": f"/api/images/{content_hash}/thumbnail"}
 
-    def delete_menu(self, menu_id: str) -> bool:
+    def delete_menu(self, menu_id: str) -> Optional[List[str]]:
         """
         Delete a menu by ID.
+        Image files are not touched here (this may run on the event loop with an
+        AsyncSession); pass the returned paths to remove_uploads.
 
         Args:
             menu_id: The menu ID to delete
 
         Returns:
-            True if deleted, False if not found
+            Image paths no other menu or pending job uses anymore, or None if not found
         """
         # Business logic: Could add authorization check here
-        # For now, just pass through to DAL
-        return self.dal.delete_menu(self.db, menu_id)
+        image_path = self.dal.delete_menu(self.db, menu_id)
+        if image_path is None:
+            return None
+        return self._after_delete([(menu_id, image_path)])
+
+    def delete_menus(self, menu_ids: List[str] = None, older_than_days: float = None) -> dict:
+        """
+        Delete several menus, by ID or by age.
+        Their image files are left to the caller (see delete_menu).
+
+        Args:
+            menu_ids: IDs of the menus to delete (at most MAX_BULK_DELETE)
+            older_than_days: Delete every menu created more than this many days ago
+
+        Returns:
+            {"deleted": number of menus deleted, "menu_ids": their IDs,
+             "unused_images": image paths no other menu or pending job uses anymore}
+
+        Raises:
+            ValueError: If neither or both criteria are given, or too many IDs
+        """
+        if (menu_ids is None) == (older_than_days is None):
+            raise ValueError("Give either menu_ids or older_than_days")
+        if menu_ids is not None and len(menu_ids) > MAX_BULK_DELETE:
+            raise ValueError(f"At most {MAX_BULK_DELETE} menus can be deleted by ID at once")
+        if older_than_days is not None and older_than_days < 0:
+            raise ValueError("older_than_days must not be negative")
+
+        deleted = []
+        if menu_ids is not None:
+            deleted = self.dal.delete_menus(self.db, list(dict.fromkeys(menu_ids)))
+        else:
+            # Delete in batches so a large cleanup does not hold one long transaction
+            cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+            while batch := self.dal.get_menu_ids_created_before(self.db, cutoff, DELETE_BATCH_SIZE):
+                deleted += self.dal.delete_menus(self.db, batch)
+
+        return {
+            "deleted": len(deleted),
+            "menu_ids": [menu_id for menu_id, _ in deleted],
+            "unused_images": self._after_delete(deleted)
+        }
+
+    def _after_delete(self, deleted: List[Tuple[str, Optional[str]]]) -> List[str]:
+        """Drop deleted menus from the in-memory indexes and return the images no other menu or pending job uses"""
+        for menu_id, _ in deleted:
+            phash_index.remove(menu_id)
+        menu_cache.invalidate(*(menu_id for menu_id, _ in deleted))
+        image_paths = list({image_path for _, image_path in deleted if image_path})
+        in_use = self.dal.get_referenced_image_paths(self.db, image_paths) | JobDAL.get_pending_image_paths(self.db)
+        return [image_path for image_path in image_paths if image_path not in in_use]
+
+    def get_image_paths(self) -> Set[str]:
+        """
+        Get the image paths of all stored menus.
+
+        Returns:
+            Set of image paths
+        """
+        return self.dal.get_image_paths(self.db)
+
+    def replace_image_path(self, old_path: str, new_path: str, content_hash: str) -> int:
+        """
+        Move the menus using an image to its new location (image store migration).
+
+        Args:
+            old_path: Current image path
+            new_path: Location of the image in the store
+            content_hash: SHA-256 hex digest of the image
+
+        Returns:
+            Number of menus updated
+        """
+        return self.dal.replace_image_path(self.db, old_path, new_path, content_hash)
+
+    def iter_raw_texts(self, after_id: str = None, batch_size: int = 500) -> Iterator[List[Tuple[str, str, str]]]:
+        """
+        Stream stored menus for re-parsing, in menu ID order.
+
+        Args:
+            after_id: Resume after this menu ID
+            batch_size: Menus per batch
+
+        Returns:
+            Iterator of [(menu_id, restaurant_name, raw_text)] batches
+        """
+        return self.dal.iter_raw_texts(self.db, after_id, batch_size)
+
+    def get_menu_contents(self, menu_ids: List[str]) -> Dict[str, List[dict]]:
+        """
+        Get the stored categories and items of several menus.
+
+        Args:
+            menu_ids: Menu IDs to load
+
+        Returns:
+            Dict of menu_id -> category dicts
+        """
+        return self.dal.get_menu_contents(self.db, menu_ids)
+
+    def replace_parsed_menus(self, menus: List[Tuple[str, MenuData]]):
+        """
+        Overwrite the categories and items of existing menus with a new parse, in one transaction.
+
+        Args:
+            menus: List of (menu_id, re-parsed MenuData)
+        """
+        rows = []
+        for menu_id, menu_data in menus:
+            restaurant_name = self.restaurant_name_for(menu_data)
+            categories = self.category_rows(menu_data)
+            rows.append({
+                "id": menu_id,
+                "restaurant_name": restaurant_name,
+                "menu_snapshot": self.menu_snapshot(restaurant_name, categories),
+                "categories": categories
+            })
+        self.dal.replace_menu_contents_bulk(self.db, rows)
+        menu_cache.invalidate(*[menu_id for menu_id, _ in menus])
+
+    def iter_snapshots(self, after_id: str = None, batch_size: int = 500) -> Iterator[List[Tuple[str, str, Optional[dict]]]]:
+        """
+        Stream stored snapshots in menu ID order.
+
+        Args:
+            after_id: Start after this menu ID
+            batch_size: Menus per batch
+
+        Returns:
+            Iterator of [(menu_id, restaurant_name, menu_snapshot)] batches
+        """
+        return self.dal.iter_snapshots(self.db, after_id, batch_size)
+
+    def find_inconsistent_snapshots(self, rows: List[Tuple[str, str, Optional[dict]]]) -> Dict[str, Tuple[Optional[dict], dict]]:
+        """
+        Compare snapshots with the normalized categories and items.
+
+        Args:
+            rows: Batch from iter_snapshots
+
+        Returns:
+            Dict of menu_id -> (stored snapshot or None, snapshot rebuilt from the tables)
+            for every menu whose snapshot is missing or differs
+        """
+        contents = self.dal.get_menu_contents(self.db, [menu_id for menu_id, _, _ in rows])
+        inconsistent = {}
+        for menu_id, restaurant_name, snapshot in rows:
+            expected = self.menu_snapshot(restaurant_name, contents[menu_id])
+            if snapshot != expected:
+                inconsistent[menu_id] = (snapshot, expected)
+        return inconsistent
+
+    def update_snapshots(self, snapshots: Dict[str, dict]):
+        """
+        Overwrite menu snapshots (e.g. to repair or backfill them).
+
+        Args:
+            snapshots: Dict of menu_id -> snapshot
+        """
+        self.dal.update_snapshots(self.db, snapshots)
+        menu_cache.invalidate(*snapshots)
+
+    def refresh_snapshots(self, menu_ids: List[str]) -> int:
+        """
+        Rebuild the snapshots of menus whose categories or items were changed directly.
+
+        Args:
+            menu_ids: Menus to refresh
+
+        Returns:
+            Number of snapshots that were out of date and rewritten
+        """
+        if not menu_ids:
+            return 0
+        inconsistent = self.find_inconsistent_snapshots(self.dal.get_snapshots(self.db, menu_ids))
+        self.update_snapshots({menu_id: expected for menu_id, (_, expected) in inconsistent.items()})
+        return len(inconsistent)
 
     def get_menu_count(self) -> int:
         """
@@ -172,15 +484,53 @@ class MenuBLL:
         """
         return self.dal.count_menus(self.db)
 
-    def check_filename_exists(self, original_filename: str) -> bool:
+    def get_menu_total(self) -> Tuple[int, bool]:
         """
-        Check if a menu with the given original filename already exists.
+        Get the number of saved menus for list responses.
+        Counting every row gets slow on big tables, so past MENU_COUNT_EXACT_LIMIT
+        menus the database's own estimate is used instead.
+
+        Returns:
+            (total, whether it is an estimate)
+        """
+        estimate = self.dal.estimate_menu_count(self.db)
+        if estimate is not None and estimate > MENU_COUNT_EXACT_LIMIT:
+            return estimate, True
+        return self.dal.count_menus(self.db), False
+
+    def find_menu_by_hash(self, content_hash: str) -> Optional[str]:
+        """
+        Find an existing menu uploaded from an identical image.
 
         Args:
-            original_filename: Original filename to check
+            content_hash: SHA-256 hex digest of the image
+
+        Returns:
+            Menu ID if found, None otherwise
+        """
+        existing_menu = self.dal.get_menu_by_hash(self.db, content_hash.lower())
+        return existing_menu.id if existing_menu else None
+
+    def find_similar_menu(self, perceptual_hash: str) -> Optional[Tuple[str, int]]:
+        """
+        Find an existing menu whose image looks like the given one.
+
+        Args:
+            perceptual_hash: Perceptual hash (hex) of the new image
+
+        Returns:
+            (menu_id, Hamming distance) of the closest near-duplicate, or None
+        """
+        if not phash_index.loaded:
+            self.load_similarity_index()
+        return phash_index.find_nearest(perceptual_hash)
+
+    def load_similarity_index(self) -> int:
+        """
+        Build the near-duplicate index from stored perceptual hashes (only once).
 
         Returns:
-            True if filename exists, False otherwise
+            Number of indexed menus
         """
-        existing_menu = self.dal.get_menu_by_filename(self.db, original_filename)
-        return existing_menu is not None
+        phash_index.load(lambda: self.dal.get_perceptual_hashes(self.db))
+        return len(phash_index)
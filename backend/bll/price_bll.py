@@ -0,0 +1,124 @@
+"""
+Business Logic Layer (BLL) for menu item prices.
+This layer contains business logic and uses DAL for database operations.
+"""
+
+from sqlalchemy.orm import Session
+from dal.price_dal import PriceDAL
+from services.menu_parser import parse_price_amounts
+from typing import List, Optional, Set, Tuple
+
+MAX_PRICE_RESULTS = 100
+
+
+def to_cents(dollars: Optional[float]) -> Optional[int]:
+    """Convert a dollar amount from a query parameter to cents"""
+    return None if dollars is None else round(dollars * 100)
+
+
+def format_cents(cents: int) -> str:
+    """Format cents the way the parser formats prices ($4.70)"""
+    return f"${cents // 100}.{cents % 100:02d}"
+
+
+class PriceBLL:
+    """Business Logic Layer for price filters and aggregates"""
+
+    def __init__(self, db: Session):
+        """
+        Initialize BLL with database session.
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+        self.dal = PriceDAL()
+
+    def find_items(self, min_price: float = None, max_price: float = None, restaurant: str = None,
+                   limit: int = 50, offset: int = 0) -> dict:
+        """
+        Find items across all menus with a price in a range, cheapest first.
+
+        Args:
+            min_price: Lowest price in dollars (inclusive), or None
+            max_price: Highest price in dollars (inclusive), or None
+            restaurant: Only return items from restaurants whose name contains this
+            limit: Maximum number of items to return (max 100)
+            offset: Number of items to skip (for pagination)
+
+        Returns:
+            {"items": matching items, "next_offset": offset of the next page or None}
+        """
+        # Business logic: Validate pagination parameters
+        if offset < 0:
+            offset = 0
+        if limit < 1 or limit > MAX_PRICE_RESULTS:
+            limit = MAX_PRICE_RESULTS
+
+        items = self.dal.find_items_by_price(
+            self.db, to_cents(min_price), to_cents(max_price), restaurant, limit + 1, offset
+        )
+        has_more = len(items) > limit
+        items = items[:limit]
+        for item in items:
+            item["matched_price"] = format_cents(item["amount_cents"])
+        return {"items": items, "next_offset": offset + limit if has_more else None}
+
+    def get_cheapest_items(self, menu_id: str) -> List[dict]:
+        """
+        Get the cheapest item of every category of a menu.
+
+        Args:
+            menu_id: Menu ID
+
+        Returns:
+            One item per category that has priced items
+        """
+        return self.dal.get_cheapest_items_per_category(self.db, menu_id)
+
+    def get_restaurant_stats(self, restaurant: str = None, limit: int = 100, offset: int = 0) -> List[dict]:
+        """
+        Get base price statistics per restaurant.
+
+        Args:
+            restaurant: Only include restaurants whose name contains this
+            limit: Maximum number of restaurants (max 100)
+            offset: Number of restaurants to skip
+
+        Returns:
+            Per-restaurant menu and item counts with average, lowest and highest base price
+        """
+        if offset < 0:
+            offset = 0
+        if limit < 1 or limit > MAX_PRICE_RESULTS:
+            limit = MAX_PRICE_RESULTS
+
+        stats = self.dal.get_restaurant_price_stats(self.db, restaurant, limit, offset)
+        for row in stats:
+            row["avg_cents"] = round(row["avg_cents"])
+            row["avg_price"] = format_cents(row["avg_cents"])
+        return stats
+
+    def backfill_prices(self, after_id: int = 0, batch_size: int = 1000) -> Tuple[Optional[int], int, Set[str]]:
+        """
+        Store numeric prices for one batch of items saved before prices were stored,
+        parsed from their display price string (size labels cannot be recovered from it).
+
+        Args:
+            after_id: Continue after this item ID
+            batch_size: Items per batch
+
+        Returns:
+            (last item ID of the batch or None when done, prices added, IDs of the affected menus)
+        """
+        items = self.dal.get_unpriced_items(self.db, after_id, batch_size)
+        if not items:
+            return None, 0, set()
+
+        rows = [
+            {"item_id": item_id, "position": position, "amount_cents": amount_cents, "size_label": None}
+            for item_id, _, price in items
+            for position, amount_cents in enumerate(parse_price_amounts(price))
+        ]
+        self.dal.add_prices(self.db, rows)
+        return items[-1][0], len(rows), {menu_id for _, menu_id, _ in items}
@@ -0,0 +1,70 @@
+"""
+Business Logic Layer (BLL) for menu search.
+This layer contains business logic and uses DAL for database operations.
+"""
+
+import re
+from sqlalchemy.orm import Session
+from dal.search_dal import SearchDAL
+from .price_bll import to_cents
+
+SEARCH_TERM_PATTERN = re.compile(r"\w+")
+MAX_SEARCH_TERMS = 10
+MAX_SEARCH_RESULTS = 50
+
+
+class SearchBLL:
+    """Business Logic Layer for full-text search over all saved menus"""
+
+    def __init__(self, db: Session):
+        """
+        Initialize BLL with database session.
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+        self.dal = SearchDAL()
+
+    def search(self, query: str, restaurant: str = None, limit: int = 20, offset: int = 0,
+               prefix: bool = True, min_price: float = None, max_price: float = None) -> dict:
+        """
+        Search menu items by item name, category, restaurant and description.
+        Every word of the query must match; the last one also matches as a prefix,
+        so results show up while the user is still typing.
+
+        Args:
+            query: Search text
+            restaurant: Only return items from restaurants whose name contains this
+            limit: Maximum number of results (max 50)
+            offset: Number of results to skip (for pagination)
+            prefix: Whether the last word also matches longer words
+            min_price: Only return items with a price of at least this (dollars)
+            max_price: Only return items with a price of at most this (dollars)
+
+        Returns:
+            {"results": matching items, best first, "next_offset": offset of the next page or None}
+
+        Raises:
+            SearchNotSupportedError: If the database has no full-text search support
+        """
+        # Business logic: Validate pagination parameters
+        if offset < 0:
+            offset = 0
+        if limit < 1 or limit > MAX_SEARCH_RESULTS:
+            limit = MAX_SEARCH_RESULTS
+
+        terms = SEARCH_TERM_PATTERN.findall(query.lower())[:MAX_SEARCH_TERMS]
+        if not terms:
+            return {"results": [], "next_offset": None}
+
+        # Get one extra row to know whether there is a next page
+        results = self.dal.search_items(
+            self.db, terms, prefix=prefix, restaurant=restaurant.strip() if restaurant else None,
+            min_cents=to_cents(min_price), max_cents=to_cents(max_price), limit=limit + 1, offset=offset
+        )
+        has_more = len(results) > limit
+        results = results[:limit]
+        for result in results:
+            result["score"] = round(result["score"], 4)
+        return {"results": results, "next_offset": offset + limit if has_more else None}
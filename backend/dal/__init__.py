@@ -1,3 +1,6 @@
 from .menu_dal import MenuDAL
+from .job_dal import JobDAL
+from .search_dal import SearchDAL
+from .price_dal import PriceDAL
 
-__all__ = ["MenuDAL"]
+__all__ = ["MenuDAL", "JobDAL", "SearchDAL", "PriceDAL"]
@@ -0,0 +1,248 @@
+"""
+Data Access Layer (DAL) for scan job operations.
+This layer only handles direct database queries - no business logic.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from models.database import ScanJobDB
+from services.metrics import timed_methods
+from typing import List, Optional, Set
+
+
+@timed_methods
+class JobDAL:
+    """Data Access Layer for scan job database operations"""
+
+    @staticmethod
+    def create_job(db: Session, job_id: str, menu_id: str, image_path: str, original_filename: str = None,
+                   content_hash: str = None) -> ScanJobDB:
+        """
+        Insert a new queued job into the database.
+
+        Args:
+            db: Database session
+            job_id: Unique job identifier
+            menu_id: ID the scanned menu will be saved under
+            image_path: Path to the uploaded image
+            original_filename: Original filename of the uploaded file
+            content_hash: SHA-256 hex digest of the uploaded image
+
+        Returns:
+            ScanJobDB: Created job object
+        """
+        db_job = ScanJobDB(
+            id=job_id,
+            status="queued",
+            menu_id=menu_id,
+            image_path=image_path,
+            original_filename=original_filename,
+            content_hash=content_hash,
+            stage_timings={}
+        )
+        db.add(db_job)
+        db.commit()
+        db.refresh(db_job)
+        return db_job
+
+    @staticmethod
+    def get_job_by_id(db: Session, job_id: str) -> Optional[ScanJobDB]:
+        """
+        Retrieve a job by ID.
+
+        Args:
+            db: Database session
+            job_id: Job ID to retrieve
+
+        Returns:
+            ScanJobDB or None if not found
+        """
+        return db.query(ScanJobDB).filter(ScanJobDB.id == job_id).first()
+
+    @staticmethod
+    def claim_next_job(db: Session, max_attempts: int) -> Optional[ScanJobDB]:
+        """
+        Atomically move the oldest queued job to "running".
+        The conditional UPDATE makes sure only one worker can claim a given job.
+        Jobs that were already started max_attempts times are marked "failed" instead.
+
+        Args:
+            db: Database session
+            max_attempts: Number of times a job may be started
+
+        Returns:
+            The claimed ScanJobDB, or None if the queue is empty
+        """
+        while True:
+            db_job = (
+                db.query(ScanJobDB)
+                .filter(ScanJobDB.status == "queued")
+                .order_by(ScanJobDB.created_at)
+                .first()
+            )
+            if not db_job:
+                return None
+
+            if (db_job.attempts or 0) >= max_attempts:
+                db.query(ScanJobDB).filter(ScanJobDB.id == db_job.id, ScanJobDB.status == "queued").update(
+                    {
+                        ScanJobDB.status: "failed",
+                        ScanJobDB.error: f"Gave up after {db_job.attempts} attempts",
+                        ScanJobDB.finished_at: datetime.utcnow()
+                    },
+                    synchronize_session=False
+                )
+                db.commit()
+                continue
+
+            now = datetime.utcnow()
+            claimed = (
+                db.query(ScanJobDB)
+                .filter(ScanJobDB.id == db_job.id, ScanJobDB.status == "queued")
+                .update(
+                    {
+                        ScanJobDB.status: "running",
+                        ScanJobDB.started_at: now,
+                        ScanJobDB.heartbeat_at: now,
+                        ScanJobDB.attempts: ScanJobDB.attempts + 1
+                    },
+                    synchronize_session=False
+                )
+            )
+            db.commit()
+
+            if claimed:
+                db.refresh(db_job)
+                return db_job
+
+    @staticmethod
+    def finish_job(db: Session, job_id: str, status: str, stage_timings: dict, error: str = None) -> None:
+        """
+        Mark a job as finished ("done" or "failed").
+
+        Args:
+            db: Database session
+            job_id: Job ID to update
+            status: Final job status
+            stage_timings: Per-stage durations in seconds
+            error: Error message for failed jobs
+        """
+        db.query(ScanJobDB).filter(ScanJobDB.id == job_id).update(
+            {
+                ScanJobDB.status: status,
+                ScanJobDB.stage_timings: stage_timings,
+                ScanJobDB.error: error,
+                ScanJobDB.finished_at: datetime.utcnow()
+            },
+            synchronize_session=False
+        )
+        db.commit()
+
+    @staticmethod
+    def renew_leases(db: Session, job_ids: List[str]) -> int:
+        """
+        Refresh the heartbeat of running jobs, extending their lease.
+
+        Args:
+            db: Database session
+            job_ids: IDs of the jobs the worker is still running
+
+        Returns:
+            Number of renewed jobs
+        """
+        if not job_ids:
+            return 0
+        count = (
+            db.query(ScanJobDB)
+            .filter(ScanJobDB.id.in_(job_ids), ScanJobDB.status == "running")
+            .update({ScanJobDB.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        )
+        db.commit()
+        return count
+
+    @staticmethod
+    def requeue_expired_jobs(db: Session, lease_seconds: int) -> int:
+        """
+        Put running jobs whose heartbeat is older than the lease back in the queue.
+        This recovers jobs left behind by a worker that stopped mid-scan. Jobs
+        claimed before heartbeats existed fall back to their start time.
+
+        Args:
+            db: Database session
+            lease_seconds: Seconds without a heartbeat before a job is considered abandoned
+
+        Returns:
+            Number of requeued jobs
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        count = (
+            db.query(ScanJobDB)
+            .filter(
+                ScanJobDB.status == "running",
+                or_(
+                    ScanJobDB.heartbeat_at < cutoff,
+                    and_(ScanJobDB.heartbeat_at.is_(None), ScanJobDB.started_at < cutoff)
+                )
+            )
+            .update({ScanJobDB.status: "queued"}, synchronize_session=False)
+        )
+        db.commit()
+        return count
+
+    @staticmethod
+    def requeue_jobs(db: Session, job_ids: List[str]) -> int:
+        """
+        Put running jobs back in the queue without counting the interrupted attempt.
+
+        Args:
+            db: Database session
+            job_ids: IDs of the jobs to requeue
+
+        Returns:
+            Number of requeued jobs
+        """
+        if not job_ids:
+            return 0
+        count = (
+            db.query(ScanJobDB)
+            .filter(ScanJobDB.id.in_(job_ids), ScanJobDB.status == "running")
+            .update(
+                {
+                    ScanJobDB.status: "queued",
+                    ScanJobDB.started_at: None,
+                    ScanJobDB.attempts: ScanJobDB.attempts - 1
+                },
+                synchronize_session=False
+            )
+        )
+        db.commit()
+        return count
+
+    @staticmethod
+    def count_jobs_by_status(db: Session, status: str) -> int:
+        """
+        Count jobs with the given status.
+
+        Args:
+            db: Database session
+            status: Job status to count
+
+        Returns:
+            Number of jobs
+        """
+        return db.query(ScanJobDB).filter(ScanJobDB.status == status).count()
+
+    @staticmethod
+    def get_pending_image_paths(db: Session) -> Set[str]:
+        """
+        Get the image paths of jobs that have not finished yet (their images are still needed).
+
+        Args:
+            db: Database session
+
+        Returns:
+            Set of image paths
+        """
+        query = db.query(ScanJobDB.image_path).filter(ScanJobDB.status.in_(("queued", "running")))
+        return {image_path for image_path, in query}
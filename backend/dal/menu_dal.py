@@ -3,18 +3,28 @@ Data Access Layer (DAL) for Menu operations.
 This layer only handles direct database queries - no business logic.
 """
 
-from sqlalchemy.orm import Session
-from models.database import MenuDB, CategoryDB, MenuItemDB
-from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select, text, tuple_, update
+from sqlalchemy.orm import Session, selectinload
+from models.database import MenuDB, CategoryDB, MenuItemDB, MenuItemPriceDB
+from services.metrics import timed_methods
+from .search_dal import SearchDAL
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 
+@timed_methods
 class MenuDAL:
     """Data Access Layer for Menu database operations"""
 
     @staticmethod
-    def create_menu(db: Session, menu_id: str, restaurant_name: str, raw_text: str, image_path: str, original_filename: str = None) -> MenuDB:
+    def create_menu_bulk(db: Session, menu_id: str, restaurant_name: str, raw_text: str, image_path: str,
+                         categories: List[dict], original_filename: str = None,
+                         content_hash: str = None, perceptual_hash: str = None,
+                         menu_snapshot: dict = None) -> MenuDB:
         """
-        Insert a new menu record into the database.
+        Insert a menu together with all of its categories and items in a single transaction.
+        Categories are inserted with one batched INSERT ... RETURNING, items with one executemany.
+        Nothing is committed if any statement fails.
 
         Args:
             db: Database session
@@ -22,7 +32,12 @@ class MenuDAL:
             restaurant_name: Name of the restaurant
             raw_text: Original OCR text
             image_path: Path to uploaded image
+            categories: List of {"name", "is_main", "items": [{"name", "price", "description", "prices"}]} dicts,
+                with prices as [{"amount_cents", "label"}]
             original_filename: Original filename of the uploaded file
+            content_hash: SHA-256 hex digest of the uploaded image
+            perceptual_hash: Perceptual hash (hex) of the uploaded image
+            menu_snapshot: Denormalized copy of the menu, written in the same transaction
 
         Returns:
             MenuDB: Created menu object
@@ -32,67 +47,268 @@ class MenuDAL:
             restaurant_name=restaurant_name,
             raw_text=raw_text,
             image_path=image_path,
-            original_filename=original_filename
+            original_filename=original_filename,
+            content_hash=content_hash,
+            perceptual_hash=perceptual_hash,
+            menu_snapshot=menu_snapshot
         )
-        db.add(db_menu)
-        db.commit()
+        try:
+            db.add(db_menu)
+            db.flush()
+
+            MenuDAL._insert_categories(db, [(menu_id, categories)])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
         db.refresh(db_menu)
         return db_menu
 
     @staticmethod
-    def create_category(db: Session, name: str, is_main: bool, menu_id: str) -> CategoryDB:
+    def _insert_categories(db: Session, menus: List[Tuple[str, List[dict]]]):
         """
-        Insert a new category record into the database.
+        Insert the categories and items of several menus (does not commit).
+        Categories and items are inserted with batched INSERT ... RETURNING, prices with one
+        executemany, and the items are added to the full-text search index.
 
         Args:
             db: Database session
-            name: Category name
-            is_main: Whether this is a main category
-            menu_id: ID of the parent menu
+            menus: List of (menu_id, categories) with categories as in create_menu_bulk
+        """
+        category_rows = [
+            {"name": category["name"], "is_main": category["is_main"], "menu_id": menu_id}
+            for menu_id, categories in menus
+            for category in categories
+        ]
+        if not category_rows:
+            return
 
-        Returns:
-            CategoryDB: Created category object
+        category_ids = db.scalars(
+            insert(CategoryDB).returning(CategoryDB.id, sort_by_parameter_order=True),
+            category_rows
+        ).all()
+
+        all_categories = [category for _, categories in menus for category in categories]
+        all_items = [item for category in all_categories for item in category["items"]]
+        item_rows = [
+            {
+                "name": item["name"],
+                "price": item["price"],
+                "description": item.get("description") or "",
+                "category_id": category_id
+            }
+            for category, category_id in zip(all_categories, category_ids)
+            for item in category["items"]
+        ]
+        if not item_rows:
+            return
+
+        item_ids = db.scalars(
+            insert(MenuItemDB).returning(MenuItemDB.id, sort_by_parameter_order=True),
+            item_rows
+        ).all()
+        price_rows = [
+            {"item_id": item_id, "position": position, "amount_cents": price["amount_cents"], "size_label": price["label"]}
+            for item, item_id in zip(all_items, item_ids)
+            for position, price in enumerate(item.get("prices") or [])
+        ]
+        if price_rows:
+            db.execute(insert(MenuItemPriceDB), price_rows)
+        SearchDAL.index_menus(db, [menu_id for menu_id, _ in menus])
+
+    @staticmethod
+    def replace_menu_contents_bulk(db: Session, menus: List[dict]):
         """
-        db_category = CategoryDB(
-            name=name,
-            is_main=is_main,
-            menu_id=menu_id
+        Replace the restaurant name, snapshot, categories and items of several menus in one transaction.
+        Old categories are removed with one set-based DELETE (their items and prices
+        follow through ON DELETE CASCADE) and the new ones are inserted in batches.
+        Nothing is committed if any statement fails.
+
+        Args:
+            db: Database session
+            menus: List of {"id", "restaurant_name", "menu_snapshot", "categories"} dicts
+                (categories as in create_menu_bulk)
+        """
+        if not menus:
+            return
+        menu_ids = [menu["id"] for menu in menus]
+        try:
+            SearchDAL.remove_menus(db, menu_ids)
+            db.execute(delete(CategoryDB).where(CategoryDB.menu_id.in_(menu_ids)))
+            db.execute(
+                update(MenuDB),
+                [
+                    {"id": menu["id"], "restaurant_name": menu["restaurant_name"], "menu_snapshot": menu["menu_snapshot"]}
+                    for menu in menus
+                ]
+            )
+            MenuDAL._insert_categories(db, [(menu["id"], menu["categories"]) for menu in menus])
+            MenuDAL._bump_versions(db, menu_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def _bump_versions(db: Session, menu_ids: List[str]):
+        """Increment the version of changed menus (part of the caller's transaction)"""
+        db.execute(
+            update(MenuDB).where(MenuDB.id.in_(menu_ids)).values(version=func.coalesce(MenuDB.version, 1) + 1)
         )
-        db.add(db_category)
-        db.commit()
-        db.refresh(db_category)
-        return db_category
 
     @staticmethod
-    def create_menu_item(db: Session, name: str, price: str, description: str, category_id: int) -> MenuItemDB:
+    def iter_raw_texts(db: Session, after_id: str = None,
+                       batch_size: int = 500) -> Iterator[List[Tuple[str, str, str]]]:
         """
-        Insert a new menu item record into the database.
+        Stream (menu_id, restaurant_name, raw_text) rows in menu ID order, in batches.
+        yield_per uses a server-side cursor where the driver supports it, so
+        only one batch is held in memory at a time.
 
         Args:
             db: Database session
-            name: Item name
-            price: Item price
-            description: Item description
-            category_id: ID of the parent category
+            after_id: Only return menus with an ID greater than this (for resuming)
+            batch_size: Rows per batch
 
         Returns:
-            MenuItemDB: Created menu item object
+            Iterator of row batches
         """
-        db_item = MenuItemDB(
-            name=name,
-            price=price,
-            description=description,
-            category_id=category_id
-        )
-        db.add(db_item)
-        db.commit()
-        db.refresh(db_item)
-        return db_item
+        query = select(MenuDB.id, MenuDB.restaurant_name, MenuDB.raw_text).order_by(MenuDB.id)
+        if after_id is not None:
+            query = query.where(MenuDB.id > after_id)
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+    @staticmethod
+    def get_menu_contents(db: Session, menu_ids: List[str]) -> Dict[str, List[dict]]:
+        """
+        Load the stored categories, items and prices of several menus with three queries.
+
+        Args:
+            db: Database session
+            menu_ids: Menu IDs to load
+
+        Returns:
+            Dict of menu_id -> categories (as in create_menu_bulk), in insertion order
+        """
+        contents = {menu_id: [] for menu_id in menu_ids}
+        categories = {}
+        for category_id, name, is_main, menu_id in db.execute(
+            select(CategoryDB.id, CategoryDB.name, CategoryDB.is_main, CategoryDB.menu_id)
+            .where(CategoryDB.menu_id.in_(menu_ids))
+            .order_by(CategoryDB.id)
+        ):
+            categories[category_id] = {"name": name, "is_main": is_main, "items": []}
+            contents[menu_id].append(categories[category_id])
+
+        items = {}
+        if categories:
+            for item_id, name, price, description, category_id in db.execute(
+                select(MenuItemDB.id, MenuItemDB.name, MenuItemDB.price, MenuItemDB.description, MenuItemDB.category_id)
+                .where(MenuItemDB.category_id.in_(list(categories)))
+                .order_by(MenuItemDB.id)
+            ):
+                items[item_id] = {"name": name, "price": price, "description": description or "", "prices": []}
+                categories[category_id]["items"].append(items[item_id])
+
+        if items:
+            for item_id, amount_cents, size_label in db.execute(
+                select(MenuItemPriceDB.item_id, MenuItemPriceDB.amount_cents, MenuItemPriceDB.size_label)
+                .where(MenuItemPriceDB.item_id.in_(select(MenuItemDB.id).where(
+                    MenuItemDB.category_id.in_(list(categories))
+                )))
+                .order_by(MenuItemPriceDB.item_id, MenuItemPriceDB.position)
+            ):
+                items[item_id]["prices"].append({"amount_cents": amount_cents, "label": size_label})
+        return contents
+
+    @staticmethod
+    def get_menu_snapshot(db: Session, menu_id: str) -> Tuple[bool, Optional[dict], int]:
+        """
+        Read a menu's snapshot and version with a single primary-key lookup.
+
+        Args:
+            db: Database session
+            menu_id: Menu ID to retrieve
+
+        Returns:
+            (found, snapshot, version); snapshot is None for menus saved before snapshots existed
+        """
+        row = db.execute(select(MenuDB.menu_snapshot, MenuDB.version).where(MenuDB.id == menu_id)).first()
+        if row is None:
+            return False, None, 0
+        return True, row.menu_snapshot, row.version or 1
+
+    @staticmethod
+    def iter_snapshots(db: Session, after_id: str = None,
+                       batch_size: int = 500) -> Iterator[List[Tuple[str, str, Optional[dict]]]]:
+        """
+        Stream (menu_id, restaurant_name, menu_snapshot) rows in menu ID order, in batches.
+
+        Args:
+            db: Database session
+            after_id: Only return menus with an ID greater than this
+            batch_size: Rows per batch
+
+        Returns:
+            Iterator of row batches
+        """
+        query = select(MenuDB.id, MenuDB.restaurant_name, MenuDB.menu_snapshot).order_by(MenuDB.id)
+        if after_id is not None:
+            query = query.where(MenuDB.id > after_id)
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+    @staticmethod
+    def get_snapshots(db: Session, menu_ids: List[str]) -> List[Tuple[str, str, Optional[dict]]]:
+        """
+        Get (menu_id, restaurant_name, menu_snapshot) rows of several menus.
+
+        Args:
+            db: Database session
+            menu_ids: Menu IDs to load
+
+        Returns:
+            Rows in menu ID order
+        """
+        return [
+            tuple(row) for row in db.execute(
+                select(MenuDB.id, MenuDB.restaurant_name, MenuDB.menu_snapshot)
+                .where(MenuDB.id.in_(menu_ids))
+                .order_by(MenuDB.id)
+            )
+        ]
+
+    @staticmethod
+    def update_snapshots(db: Session, snapshots: Dict[str, dict]):
+        """
+        Overwrite the snapshots of several menus in one transaction.
+
+        Args:
+            db: Database session
+            snapshots: Dict of menu_id -> snapshot
+        """
+        if not snapshots:
+            return
+        try:
+            db.execute(
+                update(MenuDB),
+                [{"id": menu_id, "menu_snapshot": snapshot} for menu_id, snapshot in snapshots.items()]
+            )
+            MenuDAL._bump_versions(db, list(snapshots))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
 
     @staticmethod
     def get_menu_by_id(db: Session, menu_id: str) -> Optional[MenuDB]:
         """
-        Retrieve a menu by ID.
+        Retrieve a menu by ID with its categories, items and prices.
+        They are eager-loaded with selectinload, so a menu always takes four
+        queries instead of one per category and item.
 
         Args:
             db: Database session
@@ -101,42 +317,164 @@ class MenuDAL:
         Returns:
             MenuDB or None if not found
         """
-        return db.query(MenuDB).filter(MenuDB.id == menu_id).first()
+        return db.scalars(
+            select(MenuDB)
+            .options(selectinload(MenuDB.categories).selectinload(CategoryDB.items).selectinload(MenuItemDB.prices))
+            .where(MenuDB.id == menu_id)
+        ).first()
 
     @staticmethod
-    def get_all_menus(db: Session, skip: int = 0, limit: int = 100) -> List[MenuDB]:
+    def get_all_menus(db: Session, skip: int = 0, limit: int = 100,
+                      after: Optional[Tuple[datetime, str]] = None) -> List[Tuple[str, str, datetime, str, str]]:
         """
-        Retrieve all menus with pagination.
+        Retrieve menu summaries, newest first.
+        Only the summary columns are selected. With `after` the page starts right
+        after that (created_at, id) position, so the ix_menus_created_at_id index
+        is used and a deep page costs the same as the first one; `skip` (OFFSET)
+        is kept for compatibility but scans every skipped row.
 
         Args:
             db: Database session
-            skip: Number of records to skip
+            skip: Number of records to skip (ignored when after is given)
             limit: Maximum number of records to return
+            after: (created_at, id) of the last menu of the previous page
 
         Returns:
-            List of MenuDB objects
+            List of (id, restaurant_name, created_at, image_path, content_hash) rows
         """
-        return db.query(MenuDB).offset(skip).limit(limit).all()
+        query = (
+            select(MenuDB.id, MenuDB.restaurant_name, MenuDB.created_at, MenuDB.image_path, MenuDB.content_hash)
+            .order_by(MenuDB.created_at.desc(), MenuDB.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(tuple_(MenuDB.created_at, MenuDB.id) < tuple_(*after))
+        elif skip:
+            query = query.offset(skip)
+        return db.execute(query).all()
 
     @staticmethod
-    def delete_menu(db: Session, menu_id: str) -> bool:
+    def delete_menu(db: Session, menu_id: str) -> Optional[str]:
         """
-        Delete a menu by ID.
+        Delete a menu by ID with a single DELETE; its categories, items and
+        prices are removed by the ON DELETE CASCADE foreign keys.
 
         Args:
             db: Database session
             menu_id: Menu ID to delete
 
         Returns:
-            True if deleted, False if not found
+            Image path of the deleted menu ("" if it had none), or None if not found
+        """
+        deleted = MenuDAL.delete_menus(db, [menu_id])
+        return (deleted[0][1] or "") if deleted else None
+
+    @staticmethod
+    def delete_menus(db: Session, menu_ids: List[str]) -> List[Tuple[str, Optional[str]]]:
+        """
+        Delete menus by ID in one transaction (one DELETE for all of them;
+        children are removed by the ON DELETE CASCADE foreign keys).
+
+        Args:
+            db: Database session
+            menu_ids: Menu IDs to delete
+
+        Returns:
+            List of (menu_id, image_path) of the menus that existed and were deleted
+        """
+        if not menu_ids:
+            return []
+        try:
+            SearchDAL.remove_menus(db, menu_ids)
+            result = db.execute(
+                delete(MenuDB).where(MenuDB.id.in_(menu_ids)).returning(MenuDB.id, MenuDB.image_path)
+            )
+            deleted = [tuple(row) for row in result]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return deleted
+
+    @staticmethod
+    def get_menu_ids_created_before(db: Session, cutoff: datetime, limit: int = 500) -> List[str]:
+        """
+        Get IDs of menus created before a point in time, oldest first.
+
+        Args:
+            db: Database session
+            cutoff: Only return menus created before this (UTC)
+            limit: Maximum number of IDs to return
+
+        Returns:
+            List of menu IDs
+        """
+        query = (
+            select(MenuDB.id)
+            .where(MenuDB.created_at < cutoff)
+            .order_by(MenuDB.created_at, MenuDB.id)
+            .limit(limit)
+        )
+        return list(db.scalars(query))
+
+    @staticmethod
+    def get_image_paths(db: Session) -> Set[str]:
         """
-        db_menu = db.query(MenuDB).filter(MenuDB.id == menu_id).first()
-        if not db_menu:
-            return False
+        Get the image paths of all menus.
+
+        Args:
+            db: Database session
 
-        db.delete(db_menu)
-        db.commit()
-        return True
+        Returns:
+            Set of image paths
+        """
+        query = select(MenuDB.image_path).where(MenuDB.image_path.is_not(None))
+        return set(db.scalars(query.execution_options(yield_per=5000)))
+
+    @staticmethod
+    def get_referenced_image_paths(db: Session, image_paths: List[str]) -> Set[str]:
+        """
+        Get which of the given image paths are still used by a menu
+        (stored images are shared by menus with the same content).
+
+        Args:
+            db: Database session
+            image_paths: Image paths to check
+
+        Returns:
+            Set of the image paths at least one menu refers to
+        """
+        if not image_paths:
+            return set()
+        query = select(MenuDB.image_path).where(MenuDB.image_path.in_(image_paths)).distinct()
+        return set(db.scalars(query))
+
+    @staticmethod
+    def replace_image_path(db: Session, old_path: str, new_path: str, content_hash: str) -> int:
+        """
+        Point every menu using an image path to a new location, filling in
+        the content hash of menus saved before images were hashed.
+
+        Args:
+            db: Database session
+            old_path: Current image path
+            new_path: New image path
+            content_hash: SHA-256 hex digest of the image
+
+        Returns:
+            Number of menus updated
+        """
+        try:
+            result = db.execute(
+                update(MenuDB)
+                .where(MenuDB.image_path == old_path)
+                .values(image_path=new_path, content_hash=func.coalesce(MenuDB.content_hash, content_hash))
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return result.rowcount
 
     @staticmethod
     def count_menus(db: Session) -> int:
@@ -149,18 +487,56 @@ class MenuDAL:
         Returns:
             Total count of menus
         """
-        return db.query(MenuDB).count()
+        return db.scalar(select(func.count()).select_from(MenuDB))
 
     @staticmethod
-    def get_menu_by_filename(db: Session, original_filename: str) -> Optional[MenuDB]:
+    def estimate_menu_count(db: Session) -> Optional[int]:
         """
-        Check if a menu with the given original filename exists.
+        Estimate the number of menus from the planner statistics (PostgreSQL only).
+        This is a catalog lookup instead of a full scan, but is only as fresh as the last ANALYZE.
 
         Args:
             db: Database session
-            original_filename: Original filename to check
+
+        Returns:
+            Estimated count, or None if not available
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return None
+        estimate = db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": MenuDB.__tablename__}
+        )
+        # reltuples is -1 (or 0) until the table has been analyzed
+        return estimate if estimate and estimate > 0 else None
+
+    @staticmethod
+    def get_menu_by_hash(db: Session, content_hash: str) -> Optional[MenuDB]:
+        """
+        Find a menu whose uploaded image has the given content hash.
+
+        Args:
+            db: Database session
+            content_hash: SHA-256 hex digest of the image
 
         Returns:
             MenuDB or None if not found
         """
-        return db.query(MenuDB).filter(MenuDB.original_filename == original_filename).first()
+        return db.query(MenuDB).filter(MenuDB.content_hash == content_hash).first()
+
+    @staticmethod
+    def get_perceptual_hashes(db: Session) -> List[Tuple[str, str]]:
+        """
+        Retrieve the perceptual hash of every menu that has one.
+
+        Args:
+            db: Database session
+
+        Returns:
+            List of (menu_id, perceptual_hash) tuples
+        """
+        return [
+            (menu_id, perceptual_hash)
+            for menu_id, perceptual_hash in db.query(MenuDB.id, MenuDB.perceptual_hash)
+            .filter(MenuDB.perceptual_hash.isnot(None))
+        ]
@@ -0,0 +1,180 @@
+"""
+Data Access Layer (DAL) for numeric menu item prices.
+This layer only handles direct database queries - no business logic.
+"""
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from models.database import MenuDB, CategoryDB, MenuItemDB, MenuItemPriceDB
+from services.metrics import timed_methods
+from typing import List, Optional, Tuple
+
+
+@timed_methods
+class PriceDAL:
+    """Data Access Layer for menu item price queries"""
+
+    @staticmethod
+    def find_items_by_price(db: Session, min_cents: Optional[int] = None, max_cents: Optional[int] = None,
+                            restaurant: str = None, limit: int = 50, offset: int = 0) -> List[dict]:
+        """
+        Find items with at least one price in a range, cheapest first.
+        The range is resolved on the (amount_cents, item_id) index.
+
+        Args:
+            db: Database session
+            min_cents: Lowest accepted price in cents (inclusive), or None
+            max_cents: Highest accepted price in cents (inclusive), or None
+            restaurant: Only return items from restaurants whose name contains this
+            limit: Maximum number of items to return
+            offset: Number of items to skip
+
+        Returns:
+            List of {"item_id", "name", "price", "category", "menu_id", "restaurant_name", "amount_cents"}
+            dicts, where amount_cents is the item's lowest price within the range
+        """
+        conditions = []
+        if min_cents is not None:
+            conditions.append(MenuItemPriceDB.amount_cents >= min_cents)
+        if max_cents is not None:
+            conditions.append(MenuItemPriceDB.amount_cents <= max_cents)
+        if restaurant:
+            conditions.append(MenuDB.restaurant_name.icontains(restaurant, autoescape=True))
+
+        amount = func.min(MenuItemPriceDB.amount_cents).label("amount_cents")
+        query = (
+            select(
+                MenuItemDB.id.label("item_id"), MenuItemDB.name, MenuItemDB.price,
+                CategoryDB.name.label("category"), CategoryDB.menu_id, MenuDB.restaurant_name, amount
+            )
+            .join(MenuItemDB, MenuItemDB.id == MenuItemPriceDB.item_id)
+            .join(CategoryDB, CategoryDB.id == MenuItemDB.category_id)
+            .join(MenuDB, MenuDB.id == CategoryDB.menu_id)
+            .where(*conditions)
+            .group_by(
+                MenuItemDB.id, MenuItemDB.name, MenuItemDB.price,
+                CategoryDB.name, CategoryDB.menu_id, MenuDB.restaurant_name
+            )
+            .order_by(amount, MenuItemDB.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    @staticmethod
+    def get_cheapest_items_per_category(db: Session, menu_id: str) -> List[dict]:
+        """
+        Find the cheapest item of every category of a menu (by each item's lowest price).
+
+        Args:
+            db: Database session
+            menu_id: Menu ID
+
+        Returns:
+            List of {"category", "item_id", "name", "price", "amount_cents"} dicts in category order
+        """
+        item_prices = (
+            select(
+                CategoryDB.id.label("category_id"), CategoryDB.name.label("category"),
+                MenuItemDB.id.label("item_id"), MenuItemDB.name, MenuItemDB.price,
+                func.min(MenuItemPriceDB.amount_cents).label("amount_cents")
+            )
+            .join(MenuItemDB, MenuItemDB.category_id == CategoryDB.id)
+            .join(MenuItemPriceDB, MenuItemPriceDB.item_id == MenuItemDB.id)
+            .where(CategoryDB.menu_id == menu_id)
+            .group_by(CategoryDB.id, CategoryDB.name, MenuItemDB.id, MenuItemDB.name, MenuItemDB.price)
+            .subquery()
+        )
+        ranked = select(
+            item_prices,
+            func.row_number().over(
+                partition_by=item_prices.c.category_id,
+                order_by=(item_prices.c.amount_cents, item_prices.c.item_id)
+            ).label("rank")
+        ).subquery()
+        query = (
+            select(ranked.c.category, ranked.c.item_id, ranked.c.name, ranked.c.price, ranked.c.amount_cents)
+            .where(ranked.c.rank == 1)
+            .order_by(ranked.c.category_id)
+        )
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    @staticmethod
+    def get_restaurant_price_stats(db: Session, restaurant: str = None, limit: int = 100,
+                                   offset: int = 0) -> List[dict]:
+        """
+        Aggregate the base price (first price) of every item per restaurant.
+
+        Args:
+            db: Database session
+            restaurant: Only include restaurants whose name contains this
+            limit: Maximum number of restaurants to return
+            offset: Number of restaurants to skip
+
+        Returns:
+            List of {"restaurant_name", "menus", "items", "avg_cents", "min_cents", "max_cents"} dicts
+        """
+        conditions = [MenuItemPriceDB.position == 0]
+        if restaurant:
+            conditions.append(MenuDB.restaurant_name.icontains(restaurant, autoescape=True))
+
+        query = (
+            select(
+                MenuDB.restaurant_name,
+                func.count(func.distinct(MenuDB.id)).label("menus"),
+                func.count(MenuItemPriceDB.id).label("items"),
+                func.avg(MenuItemPriceDB.amount_cents).label("avg_cents"),
+                func.min(MenuItemPriceDB.amount_cents).label("min_cents"),
+                func.max(MenuItemPriceDB.amount_cents).label("max_cents")
+            )
+            .join(MenuItemDB, MenuItemDB.id == MenuItemPriceDB.item_id)
+            .join(CategoryDB, CategoryDB.id == MenuItemDB.category_id)
+            .join(MenuDB, MenuDB.id == CategoryDB.menu_id)
+            .where(*conditions)
+            .group_by(MenuDB.restaurant_name)
+            .order_by(MenuDB.restaurant_name)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    @staticmethod
+    def get_unpriced_items(db: Session, after_id: int = 0, limit: int = 1000) -> List[Tuple[int, str, str]]:
+        """
+        Get items that have no numeric prices yet (saved before prices were stored), in ID order.
+
+        Args:
+            db: Database session
+            after_id: Only return items with a greater ID
+            limit: Maximum number of items to return
+
+        Returns:
+            List of (item_id, menu_id, price string) tuples
+        """
+        has_prices = select(MenuItemPriceDB.id).where(MenuItemPriceDB.item_id == MenuItemDB.id).exists()
+        query = (
+            select(MenuItemDB.id, CategoryDB.menu_id, MenuItemDB.price)
+            .join(CategoryDB, CategoryDB.id == MenuItemDB.category_id)
+            .where(MenuItemDB.id > after_id, ~has_prices)
+            .order_by(MenuItemDB.id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in db.execute(query)]
+
+    @staticmethod
+    def add_prices(db: Session, rows: List[dict]):
+        """
+        Insert price rows in one transaction.
+
+        Args:
+            db: Database session
+            rows: List of {"item_id", "position", "amount_cents", "size_label"} dicts
+        """
+        if not rows:
+            return
+        try:
+            db.execute(insert(MenuItemPriceDB), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
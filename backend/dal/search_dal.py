@@ -0,0 +1,248 @@
+"""
+Data Access Layer (DAL) for full-text menu search.
+This layer only handles direct database queries - no business logic.
+
+The search index (table menu_search) holds one document per menu item, built
+from the item name, its category, the restaurant name and the description:
+- PostgreSQL: a tsvector column with a GIN index (item name weighted highest)
+- SQLite: an FTS5 virtual table keyed by the item ID (rowid), ranked with bm25
+The index is maintained by MenuDAL in the same transaction as the menu rows.
+"""
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from services.metrics import timed_methods
+from typing import List
+
+SEARCH_TABLE = "menu_search"
+
+# Text search configuration; "simple" does not stem, which suits multilingual menus
+TS_CONFIG = "simple"
+
+# Relative weights of item name, category, restaurant name and description
+SQLITE_WEIGHTS = "10.0, 4.0, 2.0, 1.0"
+
+SUPPORTED_DIALECTS = ("postgresql", "sqlite")
+
+# Engines (by URL) on which the index is known to exist
+_indexed_engines = set()
+
+_ITEM_SOURCE = """
+    FROM menu_items i
+    JOIN categories c ON c.id = i.category_id
+    JOIN menus m ON m.id = c.menu_id
+"""
+
+_POSTGRES_DOCUMENT = f"""
+    setweight(to_tsvector('{TS_CONFIG}', i.name), 'A') ||
+    setweight(to_tsvector('{TS_CONFIG}', c.name), 'B') ||
+    setweight(to_tsvector('{TS_CONFIG}', coalesce(m.restaurant_name, '')), 'C') ||
+    setweight(to_tsvector('{TS_CONFIG}', coalesce(i.description, '')), 'D')
+"""
+
+
+class SearchNotSupportedError(Exception):
+    """Raised when the database has no full-text search support"""
+
+
+@timed_methods
+class SearchDAL:
+    """Data Access Layer for the full-text search index"""
+
+    @staticmethod
+    def _dialect(bind) -> str:
+        dialect = bind.dialect.name
+        if dialect not in SUPPORTED_DIALECTS:
+            raise SearchNotSupportedError(f"Full-text search is not supported on {dialect}")
+        return dialect
+
+    @staticmethod
+    def _maintained_dialect(db: Session):
+        """
+        Dialect to maintain the index for, or None when there is no index to maintain
+        (unsupported database, or create_search_index has not run yet; it indexes
+        every stored item when it does).
+        """
+        bind = db.get_bind()
+        dialect = bind.dialect.name
+        if dialect not in SUPPORTED_DIALECTS:
+            return None
+        key = str(bind.url)
+        if key not in _indexed_engines:
+            if not inspect(bind).has_table(SEARCH_TABLE):
+                return None
+            _indexed_engines.add(key)
+        return dialect
+
+    @staticmethod
+    def create_search_index(engine: Engine) -> bool:
+        """
+        Create the search index if it does not exist yet and fill it from the stored menus.
+
+        Args:
+            engine: Database engine
+
+        Returns:
+            True if the index was created, False if it already existed (or is not supported)
+        """
+        try:
+            dialect = SearchDAL._dialect(engine)
+        except SearchNotSupportedError as e:
+            print(f"Warning: {e}")
+            return False
+        if inspect(engine).has_table(SEARCH_TABLE):
+            _indexed_engines.add(str(engine.url))
+            return False
+
+        with engine.begin() as conn:
+            if dialect == "postgresql":
+                conn.execute(text(f"""
+                    CREATE TABLE {SEARCH_TABLE} (
+                        item_id INTEGER PRIMARY KEY REFERENCES menu_items(id) ON DELETE CASCADE,
+                        document TSVECTOR NOT NULL
+                    )
+                """))
+                conn.execute(text(f"CREATE INDEX ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)"))
+                conn.execute(text(f"INSERT INTO {SEARCH_TABLE} (item_id, document) SELECT i.id, {_POSTGRES_DOCUMENT} {_ITEM_SOURCE}"))
+            else:
+                conn.execute(text(f"""
+                    CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+                        item_name, category_name, restaurant_name, description,
+                        tokenize = 'unicode61 remove_diacritics 2'
+                    )
+                """))
+                conn.execute(text(f"""
+                    INSERT INTO {SEARCH_TABLE} (rowid, item_name, category_name, restaurant_name, description)
+                    SELECT i.id, i.name, c.name, coalesce(m.restaurant_name, ''), coalesce(i.description, '')
+                    {_ITEM_SOURCE}
+                """))
+        _indexed_engines.add(str(engine.url))
+        return True
+
+    @staticmethod
+    def index_menus(db: Session, menu_ids: List[str]):
+        """
+        Add the items of the given menus to the search index (does not commit).
+
+        Args:
+            db: Database session
+            menu_ids: Menus whose items were just inserted
+        """
+        dialect = SearchDAL._maintained_dialect(db) if menu_ids else None
+        if dialect is None:
+            return
+        if dialect == "postgresql":
+            statement = f"""
+                INSERT INTO {SEARCH_TABLE} (item_id, document)
+                SELECT i.id, {_POSTGRES_DOCUMENT} {_ITEM_SOURCE}
+                WHERE c.menu_id IN :menu_ids
+            """
+        else:
+            statement = f"""
+                INSERT INTO {SEARCH_TABLE} (rowid, item_name, category_name, restaurant_name, description)
+                SELECT i.id, i.name, c.name, coalesce(m.restaurant_name, ''), coalesce(i.description, '')
+                {_ITEM_SOURCE}
+                WHERE c.menu_id IN :menu_ids
+            """
+        db.execute(
+            text(statement).bindparams(bindparam("menu_ids", expanding=True)),
+            {"menu_ids": list(menu_ids)}
+        )
+
+    @staticmethod
+    def remove_menus(db: Session, menu_ids: List[str]):
+        """
+        Remove the items of the given menus from the search index (does not commit).
+        Must run before the items themselves are deleted.
+
+        Args:
+            db: Database session
+            menu_ids: Menus about to be deleted or replaced
+        """
+        dialect = SearchDAL._maintained_dialect(db) if menu_ids else None
+        # On PostgreSQL the index rows go with their items (ON DELETE CASCADE foreign key)
+        if dialect != "sqlite":
+            return
+        db.execute(
+            text(f"""
+                DELETE FROM {SEARCH_TABLE} WHERE rowid IN (
+                    SELECT i.id FROM menu_items i JOIN categories c ON c.id = i.category_id
+                    WHERE c.menu_id IN :menu_ids
+                )
+            """).bindparams(bindparam("menu_ids", expanding=True)),
+            {"menu_ids": list(menu_ids)}
+        )
+
+    @staticmethod
+    def search_items(db: Session, terms: List[str], prefix: bool = True, restaurant: str = None,
+                     min_cents: int = None, max_cents: int = None, limit: int = 20, offset: int = 0) -> List[dict]:
+        """
+        Find menu items matching all search terms, best matches first.
+
+        Args:
+            db: Database session
+            terms: Lowercase word tokens (letters, digits and underscores only)
+            prefix: Whether the last term also matches longer words ("mil" -> "milk")
+            restaurant: Only return items from restaurants whose name contains this
+            min_cents: Only return items with a price of at least this many cents
+            max_cents: Only return items with a price of at most this many cents
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            List of {"item_id", "name", "price", "description", "category", "menu_id",
+            "restaurant_name", "score"} dicts; a higher score is a better match
+
+        Raises:
+            SearchNotSupportedError: If the database has no full-text search support
+        """
+        dialect = SearchDAL._dialect(db.get_bind())
+        params = {"limit": limit, "offset": offset}
+        filters = ""
+        if restaurant:
+            escaped = restaurant.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params["restaurant"] = f"%{escaped}%"
+            like = "ILIKE" if dialect == "postgresql" else "LIKE"
+            filters = f"AND m.restaurant_name {like} :restaurant ESCAPE '\\'"
+        if min_cents is not None or max_cents is not None:
+            params["min_cents"] = min_cents if min_cents is not None else 0
+            params["max_cents"] = max_cents if max_cents is not None else 2 ** 31 - 1
+            filters += """
+                AND EXISTS (
+                    SELECT 1 FROM menu_item_prices p
+                    WHERE p.item_id = i.id AND p.amount_cents BETWEEN :min_cents AND :max_cents
+                )
+            """
+
+        columns = """
+            i.id AS item_id, i.name, i.price, i.description, c.name AS category,
+            c.menu_id, m.restaurant_name
+        """
+        if dialect == "postgresql":
+            params["query"] = " & ".join(terms) + (":*" if prefix else "")
+            statement = f"""
+                SELECT {columns}, ts_rank(s.document, q) AS score
+                FROM to_tsquery('{TS_CONFIG}', :query) AS q
+                CROSS JOIN {SEARCH_TABLE} s
+                JOIN menu_items i ON i.id = s.item_id
+                JOIN categories c ON c.id = i.category_id
+                JOIN menus m ON m.id = c.menu_id
+                WHERE s.document @@ q {filters}
+                ORDER BY score DESC, i.id
+                LIMIT :limit OFFSET :offset
+            """
+        else:
+            params["query"] = " ".join(f'"{term}"' for term in terms) + ("*" if prefix else "")
+            # bm25() is lower for better matches, so it is negated into the score
+            statement = f"""
+                SELECT {columns}, -bm25({SEARCH_TABLE}, {SQLITE_WEIGHTS}) AS score
+                FROM {SEARCH_TABLE}
+                JOIN menu_items i ON i.id = {SEARCH_TABLE}.rowid
+                JOIN categories c ON c.id = i.category_id
+                JOIN menus m ON m.id = c.menu_id
+                WHERE {SEARCH_TABLE} MATCH :query {filters}
+                ORDER BY score DESC, i.id
+                LIMIT :limit OFFSET :offset
+            """
+        return [dict(row._mapping) for row in db.execute(text(statement), params)]
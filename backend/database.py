@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -17,12 +18,90 @@ if not DATABASE_URL:
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Connection pool settings (configurable through environment variables).
+# The sync pool is shared by the database worker threads and the job workers,
+# so keep DB_POOL_CONNECTIONS + DB_MAX_OVERFLOW above DB_POOL_SIZE + SCAN_WORKERS.
+DB_POOL_CONNECTIONS = int(os.getenv("DB_POOL_CONNECTIONS", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() not in ("0", "false", "no")
+
+# Serve API requests through an async engine (asyncpg / aiosqlite) instead of
+# sync sessions in the database thread pool
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+
+def pool_options(url: str) -> dict:
+    """
+    Engine pool arguments for a database URL.
+    SQLite connections are local files, so it keeps SQLAlchemy's default pool.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": DB_POOL_CONNECTIONS,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+
+
+def async_database_url(url: str) -> str:
+    """
+    Async driver URL for a database URL:
+    postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg takes "ssl" instead of libpq's "sslmode" (used by hosted Postgres URLs)
+        if "sslmode" in url.query:
+            query = dict(url.query)
+            query["ssl"] = query.pop("sslmode")
+            url = url.set(query=query)
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    else:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return url.render_as_string(hide_password=False)
+
+
 # Create the database engine for PostgreSQL
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL))
+
+
+
+def enable_sqlite_foreign_keys(sync_engine):
+    """SQLite only enforces foreign keys (and ON DELETE CASCADE) when enabled per connection"""
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_foreign_keys(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+enable_sqlite_foreign_keys(engine)
 
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory (only created with DB_ASYNC=true, since
+# they need the optional asyncpg / aiosqlite drivers)
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(async_database_url(DATABASE_URL), **pool_options(DATABASE_URL))
+    enable_sqlite_foreign_keys(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=True)
+
 # Base class for our database models
 Base = declarative_base()
 
@@ -37,3 +116,106 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session (DB_ASYNC=true).
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Session dependency for API endpoints: async sessions with DB_ASYNC=true, sync sessions otherwise
+get_session = get_async_db if DB_ASYNC else get_db
+
+
+def add_missing_columns():
+    """
+    Add model columns and indexes that are missing from existing tables.
+    create_all() only creates missing tables, so new (nullable) columns and
+    new indexes on tables that already exist are added here.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn, checkfirst=True)
+
+
+def update_foreign_keys():
+    """
+    Give existing tables the ON DELETE rules of the models (e.g. ON DELETE CASCADE),
+    which create_all() does not apply to tables that already exist.
+    PostgreSQL constraints are replaced in place. SQLite cannot alter constraints,
+    so its tables are rebuilt with the new definition and their rows copied over.
+    """
+    inspector = inspect(engine)
+    outdated = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {
+            tuple(fk["constrained_columns"]): fk for fk in inspector.get_foreign_keys(table.name)
+        }
+        for constraint in table.foreign_key_constraints:
+            wanted = (constraint.ondelete or "").upper()
+            current = existing.get(tuple(constraint.column_keys))
+            if current is not None and (current["options"].get("ondelete") or "").upper() != wanted:
+                outdated.append((table, constraint, current))
+    if not outdated:
+        return
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for table, constraint, current in outdated:
+                columns = ", ".join(constraint.column_keys)
+                referred = constraint.referred_table.name
+                referred_columns = ", ".join(element.column.name for element in constraint.elements)
+                name = current["name"]
+                conn.execute(text(f"ALTER TABLE {table.name} DROP CONSTRAINT {name}"))
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD CONSTRAINT {name} FOREIGN KEY ({columns}) "
+                    f"REFERENCES {referred} ({referred_columns}) ON DELETE {constraint.ondelete}"
+                ))
+    elif engine.dialect.name == "sqlite":
+        tables = list(dict.fromkeys(table for table, _, _ in outdated))
+        with engine.connect() as conn:
+            # Foreign keys must be off while tables are swapped; the pragma is ignored inside a transaction
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            # Keep references from other tables pointing at the original table names
+            conn.exec_driver_sql("PRAGMA legacy_alter_table=ON")
+            conn.exec_driver_sql("BEGIN")
+            try:
+                for table in tables:
+                    old_name = f"{table.name}_old"
+                    columns = ", ".join(column["name"] for column in inspector.get_columns(table.name)
+                                        if column["name"] in table.columns)
+                    for index in inspector.get_indexes(table.name):
+                        conn.exec_driver_sql(f"DROP INDEX {index['name']}")
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {old_name}")
+                    table.create(conn)
+                    conn.exec_driver_sql(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old_name}")
+                    conn.exec_driver_sql(f"DROP TABLE {old_name}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.exec_driver_sql("PRAGMA legacy_alter_table=OFF")
+                conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+    else:
+        return
+    print(f"Updated foreign keys of {', '.join(sorted({table.name for table, _, _ in outdated}))}")
@@ -1,23 +1,81 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pathlib import Path
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.datastructures import Headers, MutableHeaders
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import re
+import time
 import traceback
 import uuid
 import os
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 
-from models.menu import MenuResponse
-from services import extract_text_openai, extract_text_tesseract, parse_menu_text
-from database import Base, engine, get_db
+from models.menu import MenuResponse, BulkDeleteRequest
+from services import (
+    OCR_ENGINE, scan_menu, stream_menu_text, MenuTextParser, perceptual_hash, ocr_cache, menu_cache, cascade_stats, run_io, run_db, run_bll, shutdown_executors,
+    close_openai_client
+)
+from services.job_queue import ScanJobQueue, MAX_QUEUED_JOBS, save_scanned_menu
+from services import metrics
+from services.metrics import registry, CallbackMetric, http_request_seconds, start_request, finish_request, server_timing, render_metrics
+from services.upload_service import (
+    ingest_upload, store_upload, create_thumbnail, remove_uploads, UploadTooLargeError, InvalidImageError, MAX_UPLOAD_BYTES, UPLOAD_DIR
+)
+from services.image_store import image_store, StoredImage
+from services.image_service import THUMBNAIL_SIZE
+from services.upload_sweeper import upload_sweeper
+from services.responses import EncodedBody, dumps, json_response, not_modified
+from database import Base, engine, async_engine, get_session, add_missing_columns, update_foreign_keys, SessionLocal
 from bll.menu_bll import MenuBLL
+from bll.job_bll import JobBLL
+from bll.search_bll import SearchBLL
+from bll.price_bll import PriceBLL
+from dal.search_dal import SearchDAL, SearchNotSupportedError
 
 load_dotenv()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
+update_foreign_keys()
+if SearchDAL.create_search_index(engine):
+    print("Built full-text search index")
+
+
+job_queue = ScanJobQueue()
 
-app = FastAPI(title="Menu Scanner API")
+
+def load_similarity_index():
+    """Load the near-duplicate index from the database"""
+    db = SessionLocal()
+    try:
+        count = MenuBLL(db).load_similarity_index()
+        print(f"Loaded near-duplicate index ({count} menus)")
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    await upload_sweeper.start()
+    # Build the near-duplicate index in the background so startup is not delayed
+    index_task = asyncio.create_task(run_db(load_similarity_index))
+    yield
+    await asyncio.gather(index_task, return_exceptions=True)
+    # Stop job workers, the OpenAI client and worker pools on shutdown
+    await job_queue.stop()
+    await upload_sweeper.stop()
+    await close_openai_client()
+    if async_engine is not None:
+        await async_engine.dispose()
+    shutdown_executors()
+
+
+app = FastAPI(title="Menu Scanner API", lifespan=lifespan)
 
 # Configure CORS for local development and production
 allowed_origins = [
@@ -42,52 +100,192 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-USE_OPENAI = bool(os.getenv("OPENAI_API_KEY"))
+SHA256_PATTERN = re.compile(r"^[0-9a-fA-F]{64}$")
+
+# Stored images never change (their URL contains their hash), so clients may cache them indefinitely
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Menus can be re-parsed, so clients may keep them but must revalidate (cheap with the ETag)
+MENU_CACHE_CONTROL = "no-cache"
+# Part of the menu ETag; bump when the layout of the GET /api/menus/{id} response changes
+MENU_RESPONSE_FORMAT = 1
+
+
+def menu_etag(version: int) -> str:
+    """ETag of a menu response, derived from the menu's version"""
+    return f'"v{version}.{MENU_RESPONSE_FORMAT}"'
+
+
+def image_response(image: StoredImage, etag: str) -> FileResponse:
+    """
+    Serve a stored image. FileResponse sends the file without reading it into
+    memory (zero-copy with servers that support the pathsend extension) and
+    answers Range requests.
+    """
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+    return FileResponse(image.path, media_type=image.media_type, headers=headers, stat_result=image.stat)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject request bodies larger than an upload may be.
+    FastAPI spools a multipart upload to a temporary file before the endpoint
+    runs (and ingest_upload sees it), so the limit has to be enforced here for
+    that spool to stay bounded. A declared Content-Length is checked before the
+    body is read; a body without one (chunked) is counted as it is received.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES + 64 * 1024):
+        """
+        Args:
+            app: ASGI application to wrap
+            max_bytes: Largest accepted body (room is left for the multipart boundaries and headers)
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None:
+            if not content_length.strip().isdigit():
+                response = JSONResponse(status_code=400, content={"detail": "Invalid Content-Length header"})
+                return await response(scope, receive, send)
+            if int(content_length) > self.max_bytes:
+                response = JSONResponse(status_code=413, content={"detail": str(UploadTooLargeError())})
+                return await response(scope, receive, send)
+            # The server never passes on more than the declared length
+            return await self.app(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised while the form is parsed, so the app answers 413 instead of spooling the rest
+                    raise HTTPException(status_code=413, detail=str(UploadTooLargeError()))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+app.add_middleware(UploadSizeLimitMiddleware)
+
+
+class RequestMetricsMiddleware:
+    """
+    Time every request and report its pipeline stage and database durations in Server-Timing.
+    A plain ASGI middleware, so unlike @app.middleware("http") it does not run
+    the endpoint in a separate task or pass the response body through a stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+        token = start_request()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = server_timing()
+                total = f"total;dur={(time.perf_counter() - start) * 1000:.1f}"
+                MutableHeaders(scope=message).append("Server-Timing", f"{timing}, {total}" if timing else total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            seconds = time.perf_counter() - start
+            finish_request(token)
+            # Label by route template (/api/menus/{menu_id}), not the raw path, to bound label values
+            route = scope.get("route")
+            http_request_seconds.observe(
+                seconds, method=scope["method"], route=route.path if route else "unmatched", status=status
+            )
+
+
+app.add_middleware(RequestMetricsMiddleware)
+
+
+# Expose the counters the caches already keep
+for cache_name, cache, description in (("ocr", ocr_cache, "OCR text cache"), ("menu", menu_cache, "Menu response cache")):
+    for key, metric_type in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("entries", "gauge")):
+        suffix = "_total" if metric_type == "counter" else ""
+        registry.register(CallbackMetric(
+            f"menu_scanner_{cache_name}_cache_{key}{suffix}", f"{description} {key}",
+            lambda cache=cache, key=key: cache.stats()[key], metric_type
+        ))
 
 
 @app.get("/")
 async def root():
-    return {"message": f"Menu Scanner API is running (Using: {'OpenAI Vision' if USE_OPENAI else 'Tesseract OCR'})"}
+    engines = {"openai": "OpenAI Vision", "tesseract": "Tesseract OCR", "cascade": "Tesseract OCR with OpenAI Vision fallback"}
+    return {"message": f"Menu Scanner API is running (Using: {engines.get(OCR_ENGINE, OCR_ENGINE)})"}
 
 
 @app.post("/api/upload-menu", response_model=MenuResponse)
-async def upload_menu(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_menu(file: UploadFile = File(...), reuse_similar: bool = False, db: Session = Depends(get_session)):
     try:
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File must be an image")
 
-        contents = await file.read()
-
-        # Generate unique menu ID and filename
         menu_id = str(uuid.uuid4())
-        file_extension = Path(file.filename).suffix
-        safe_filename = f"{menu_id}{file_extension}"
-        file_path = UPLOAD_DIR / safe_filename
-
-        # Save uploaded image
-        with open(file_path, "wb") as f:
-            f.write(contents)
-
-        # Extract text using OCR
-        if USE_OPENAI:
-            raw_text = extract_text_openai(str(file_path))
-        else:
-            raw_text = extract_text_tesseract(str(file_path))
 
-        # Parse menu text
-        parsed_data = parse_menu_text(raw_text)
+        # Save the uploaded image while hashing it, under its hash (with a thumbnail for the menu list)
+        staging_path = image_store.staging_path()
+        contents, content_hash = await ingest_upload(file, staging_path)
+
+        # Reuse a near-duplicate menu instead of running OCR again. This is checked on the
+        # bytes in memory before the upload is stored, so a reused upload only has its
+        # staged file to discard and never reaches the image store
+        image_phash = None
+        if reuse_similar:
+            try:
+                image_phash = await perceptual_hash(contents)
+            except Exception:
+                pass  # Undecodable uploads are rejected by store_upload below
+            match = await run_bll(db, MenuBLL, "find_similar_menu", image_phash) if image_phash else None
+            if match:
+                existing_menu_id, _ = match
+                menu_data = await run_bll(db, MenuBLL, "get_menu", existing_menu_id)
+                if menu_data:
+                    await run_io(staging_path.unlink, missing_ok=True)
+                    return MenuResponse(
+                        menu_id=existing_menu_id,
+                        restaurant_name=menu_data.restaurant_name,
+                        categories=menu_data.categories,
+                        raw_text=""
+                    )
+
+        image_path = await store_upload(staging_path, contents, content_hash)
+        if image_phash is None:
+            image_phash = await perceptual_hash(contents)
+
+        # Extract text using OCR and parse it, straight from the bytes already in memory
+        raw_text, parsed_data = await scan_menu(contents, content_hash=content_hash)
 
         # Save to database using BLL
-        bll = MenuBLL(db)
-        bll.save_menu(
+        await run_bll(
+            db, MenuBLL, "save_menu",
             menu_data=parsed_data,
             menu_id=menu_id,
-            image_path=str(file_path),
+            image_path=image_path,
             raw_text=raw_text,
-            original_filename=file.filename
+            original_filename=file.filename,
+            content_hash=content_hash,
+            perceptual_hash=image_phash
         )
 
         return MenuResponse(
@@ -97,51 +295,466 @@ async def upload_menu(file: UploadFile = File(...), db: Session = Depends(get_db
             raw_text=raw_text
         )
 
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"ERROR: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
-@app.get("/api/check-filename/{filename}")
-async def check_filename(filename: str, db: Session = Depends(get_db)):
+@app.post("/api/upload-menu/stream")
+async def upload_menu_stream(file: UploadFile = File(...)):
     """
-    Check if a menu with the given filename already exists.
+    Scan a menu and stream the result as newline-delimited JSON while the model is still reading it.
+    Emits a "start" event, then "restaurant", "category" and "item" events as each line
+    of the menu is recognised, and finally a "menu" event with the saved MenuResponse
+    (or an "error" event).
 
     Args:
-        filename: Original filename to check
+        file: Menu image
+
+    Returns:
+        application/x-ndjson stream of events
+    """
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    menu_id = str(uuid.uuid4())
+    try:
+        staging_path = image_store.staging_path()
+        contents, content_hash = await ingest_upload(file, staging_path)
+        image_path = await store_upload(staging_path, contents, content_hash)
+        image_phash = await perceptual_hash(contents)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+    async def events():
+        yield json.dumps({"type": "start", "menu_id": menu_id}) + "\n"
+        try:
+            parser = MenuTextParser()
+            chunks = []
+            async for chunk in stream_menu_text(contents, content_hash=content_hash):
+                chunks.append(chunk)
+                for event in parser.feed(chunk):
+                    yield json.dumps(event) + "\n"
+            for event in parser.flush():
+                yield json.dumps(event) + "\n"
+
+            raw_text = "".join(chunks)
+            parsed_data = parser.finish()
+            # The request's session is closed once streaming starts, so save with a fresh one
+            await run_db(
+                save_scanned_menu,
+                menu_data=parsed_data,
+                menu_id=menu_id,
+                image_path=image_path,
+                raw_text=raw_text,
+                original_filename=file.filename,
+                content_hash=content_hash,
+                perceptual_hash=image_phash
+            )
+            menu = MenuResponse(
+                menu_id=menu_id,
+                restaurant_name=parsed_data.restaurant_name,
+                categories=parsed_data.categories,
+                raw_text=raw_text
+            )
+            yield json.dumps({"type": "menu", **menu.model_dump()}) + "\n"
+        except Exception as e:
+            print(f"ERROR: {str(e)}")
+            print(traceback.format_exc())
+            yield json.dumps({"type": "error", "detail": f"Error: {str(e)}"}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_scan_job(file: UploadFile = File(...), db: Session = Depends(get_session)):
+    """
+    Queue a menu image for scanning and return immediately.
+
+    Args:
+        file: Menu image
         db: Database session
 
     Returns:
-        {"exists": true/false}
+        Job status with the job ID to poll
     """
     try:
-        bll = MenuBLL(db)
-        exists = bll.check_filename_exists(filename)
-        return {"exists": exists}
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="File must be an image")
+
+        # Shed load when the queue is full
+        if await run_bll(db, JobBLL, "get_queue_depth") >= MAX_QUEUED_JOBS:
+            raise HTTPException(status_code=503, detail="Scan queue is full, try again later")
+
+        job_id = str(uuid.uuid4())
+        menu_id = str(uuid.uuid4())
+
+        # The worker reads the image from the store
+        staging_path = image_store.staging_path()
+        contents, content_hash = await ingest_upload(file, staging_path)
+        image_path = await store_upload(staging_path, contents, content_hash)
+
+        job = await run_bll(
+            db, JobBLL, "enqueue_job",
+            job_id=job_id,
+            menu_id=menu_id,
+            image_path=image_path,
+            original_filename=file.filename,
+            content_hash=content_hash
+        )
+        job_queue.notify()
+        return job
+
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_scan_job(job_id: str, db: Session = Depends(get_session)):
+    """
+    Get the status of a scan job.
+
+    Args:
+        job_id: The job ID to check
+        db: Database session
+
+    Returns:
+        Job status (queued/running/done/failed), per-stage timings and the menu ID once done
+    """
+    try:
+        job = await run_bll(db, JobBLL, "get_job", job_id)
+
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/api/check-hash/{content_hash}")
+async def check_hash(content_hash: str, db: Session = Depends(get_session)):
+    """
+    Check if a menu was already uploaded from an image with the given content hash.
+
+    Args:
+        content_hash: SHA-256 hex digest of the image bytes
+        db: Database session
+
+    Returns:
+        {"exists": true/false, "menu_id": existing menu ID or null}
+    """
+    try:
+        if not SHA256_PATTERN.match(content_hash):
+            raise HTTPException(status_code=400, detail="Hash must be a SHA-256 hex digest")
+
+        menu_id = await run_bll(db, MenuBLL, "find_menu_by_hash", content_hash)
+        return {"exists": menu_id is not None, "menu_id": menu_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/api/images/{content_hash}")
+async def get_image(content_hash: str, request: Request):
+    """
+    Get a stored menu image by its content hash.
+    The ETag is the hash itself, so conditional requests are answered
+    without touching the file; Range requests are supported.
+
+    Args:
+        content_hash: SHA-256 hex digest of the image
+        request: HTTP request (for If-None-Match and Range)
+
+    Returns:
+        The original image, or 304 Not Modified
+    """
+    if not SHA256_PATTERN.match(content_hash):
+        raise HTTPException(status_code=400, detail="Hash must be a SHA-256 hex digest")
+    content_hash = content_hash.lower()
+    etag = f'"{content_hash}"'
+    cached = not_modified(request, etag, IMAGE_CACHE_CONTROL)
+    if cached:
+        return cached
+
+    image = await run_io(image_store.get, content_hash)
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return image_response(image, etag)
+
+
+@app.get("/api/images/{content_hash}/thumbnail")
+async def get_image_thumbnail(content_hash: str, request: Request):
+    """
+    Get the WebP thumbnail of a stored menu image.
+    Thumbnails are created when the image is uploaded; one that is missing
+    (e.g. after THUMBNAIL_SIZE changed) is created on the first request.
+
+    Args:
+        content_hash: SHA-256 hex digest of the image
+        request: HTTP request (for If-None-Match and Range)
+
+    Returns:
+        The thumbnail, or 304 Not Modified
+    """
+    if not SHA256_PATTERN.match(content_hash):
+        raise HTTPException(status_code=400, detail="Hash must be a SHA-256 hex digest")
+    content_hash = content_hash.lower()
+    etag = f'"{content_hash}-{THUMBNAIL_SIZE}"'
+    cached = not_modified(request, etag, IMAGE_CACHE_CONTROL)
+    if cached:
+        return cached
+
+    try:
+        thumbnail = await run_io(image_store.get_thumbnail, content_hash, THUMBNAIL_SIZE)
+        if not thumbnail and await create_thumbnail(content_hash):
+            thumbnail = await run_io(image_store.get_thumbnail, content_hash, THUMBNAIL_SIZE)
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    if not thumbnail:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return image_response(thumbnail, etag)
+
+
+@app.post("/api/find-similar")
+async def find_similar(file: UploadFile = File(...), db: Session = Depends(get_session)):
+    """
+    Check if a near-duplicate of an image (same menu, re-photographed) was already scanned.
+
+    Args:
+        file: Menu image
+        db: Database session
+
+    Returns:
+        {"match": true/false, "menu_id": closest menu ID or null, "distance": Hamming distance or null}
+    """
+    try:
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="File must be an image")
+
+        contents, _ = await ingest_upload(file)
+        image_phash = await perceptual_hash(contents)
+
+        match = await run_bll(db, MenuBLL, "find_similar_menu", image_phash)
+        if not match:
+            return {"match": False, "menu_id": None, "distance": None}
+
+        menu_id, distance = match
+        return {"match": True, "menu_id": menu_id, "distance": distance}
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"ERROR: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+@app.get("/api/ocr-cache")
+async def get_ocr_cache_stats():
+    """
+    Get OCR cache statistics.
+
+    Returns:
+        Cache size, capacity and hit/miss counters
+    """
+    return ocr_cache.stats()
+
+
+@app.get("/api/menu-cache")
+async def get_menu_cache_stats():
+    """
+    Get menu response cache statistics.
+
+    Returns:
+        Cache size, hit ratio and database load latency of cache misses
+    """
+    return menu_cache.stats()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Get latency and throughput metrics in the Prometheus text format.
+
+    Returns:
+        Stage, database and HTTP latency histograms, scan and upload counters and cache counters
+    """
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/ocr-cascade")
+async def get_ocr_cascade_stats():
+    """
+    Get OCR cascade statistics (OCR_ENGINE=cascade).
+
+    Returns:
+        Escalation rate, average engine latencies and estimated latency saved
+    """
+    return {"engine": OCR_ENGINE, **cascade_stats.stats()}
+
+
 @app.get("/api/menus")
-async def list_menus(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_menus(request: Request, skip: int = 0, limit: int = 100, cursor: str = None,
+                     db: Session = Depends(get_session)):
     """
-    Get a list of all saved menus.
+    Get a list of all saved menus, newest first.
 
     Args:
-        skip: Number of records to skip (for pagination)
+        request: HTTP request (Accept-Encoding)
+        skip: Number of records to skip (offset pagination, prefer cursor)
         limit: Maximum number of records to return (max 100)
+        cursor: next_cursor of the previous page
         db: Database session
 
     Returns:
-        List of menu summaries
+        Menu summaries, the total number of menus (total_estimated is true when it is
+        an estimate) and next_cursor for the following page (null on the last page)
     """
     try:
-        bll = MenuBLL(db)
-        menus = bll.list_menus(skip=skip, limit=limit)
-        return {"menus": menus, "total": len(menus)}
+        page = await run_bll(db, MenuBLL, "list_menus", skip=skip, limit=limit, cursor=cursor)
+        total, estimated = await run_bll(db, MenuBLL, "get_menu_total")
+        return json_response(request, EncodedBody(dumps({
+            "menus": page["menus"], "total": total, "total_estimated": estimated, "next_cursor": page["next_cursor"]
+        })))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/api/search")
+async def search_menus(q: str, restaurant: str = None, min_price: float = None, max_price: float = None,
+                       limit: int = 20, offset: int = 0, prefix: bool = True, db: Session = Depends(get_session)):
+    """
+    Full-text search over the items of all saved menus.
+
+    Args:
+        q: Search text; every word must match, the last one also as a prefix
+        restaurant: Only return items from restaurants whose name contains this
+        min_price: Only return items with a price of at least this (dollars)
+        max_price: Only return items with a price of at most this (dollars)
+        limit: Maximum number of results (max 50)
+        offset: Number of results to skip (for pagination)
+        prefix: Set to false to match the last word exactly
+        db: Database session
+
+    Returns:
+        Matching items with their category, menu and restaurant, best matches first,
+        and next_offset for the following page (null on the last page)
+    """
+    try:
+        return await run_bll(
+            db, SearchBLL, "search", q, restaurant=restaurant, limit=limit, offset=offset, prefix=prefix,
+            min_price=min_price, max_price=max_price
+        )
+    except SearchNotSupportedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/api/items")
+async def find_items_by_price(min_price: float = None, max_price: float = None, restaurant: str = None,
+                              limit: int = 50, offset: int = 0, db: Session = Depends(get_session)):
+    """
+    Find items across all menus with a price in a range, cheapest first.
+
+    Args:
+        min_price: Lowest price in dollars (inclusive)
+        max_price: Highest price in dollars (inclusive)
+        restaurant: Only return items from restaurants whose name contains this
+        limit: Maximum number of items to return (max 100)
+        offset: Number of items to skip (for pagination)
+        db: Database session
+
+    Returns:
+        Matching items with the lowest matching price, and next_offset for the following page
+    """
+    try:
+        return await run_bll(
+            db, PriceBLL, "find_items", min_price=min_price, max_price=max_price, restaurant=restaurant, limit=limit, offset=offset
+        )
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/api/restaurants/prices")
+async def get_restaurant_prices(restaurant: str = None, limit: int = 100, offset: int = 0,
+                                db: Session = Depends(get_session)):
+    """
+    Get price statistics per restaurant.
+
+    Args:
+        restaurant: Only include restaurants whose name contains this
+        limit: Maximum number of restaurants (max 100)
+        offset: Number of restaurants to skip
+        db: Database session
+
+    Returns:
+        Menu and item counts with the average, lowest and highest base price (first price of each item)
+    """
+    try:
+        return {"restaurants": await run_bll(db, PriceBLL, "get_restaurant_stats", restaurant=restaurant, limit=limit, offset=offset)}
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/api/menus/{menu_id}/cheapest-items")
+async def get_cheapest_items(menu_id: str, db: Session = Depends(get_session)):
+    """
+    Get the cheapest item of every category of a menu.
+
+    Args:
+        menu_id: The menu ID
+        db: Database session
+
+    Returns:
+        One item per category, with its lowest price in cents
+    """
+    try:
+        return {"menu_id": menu_id, "items": await run_bll(db, PriceBLL, "get_cheapest_items", menu_id)}
     except Exception as e:
         print(f"ERROR: {str(e)}")
         print(traceback.format_exc())
@@ -149,30 +762,43 @@ async def list_menus(skip: int = 0, limit: int = 100, db: Session = Depends(get_
 
 
 @app.get("/api/menus/{menu_id}", response_model=MenuResponse)
-async def get_menu(menu_id: str, db: Session = Depends(get_db)):
+async def get_menu(menu_id: str, request: Request, db: Session = Depends(get_session)):
     """
     Get a specific menu by ID.
+    The ETag changes with the menu's version, so a client sending it back in
+    If-None-Match gets 304 Not Modified. Large menus are sent Brotli or gzip
+    compressed when the client accepts it.
 
     Args:
         menu_id: The menu ID to retrieve
+        request: HTTP request (If-None-Match, Accept-Encoding)
         db: Database session
 
     Returns:
         Full menu data with all categories and items
     """
     try:
-        bll = MenuBLL(db)
-        menu_data = bll.get_menu(menu_id)
-
-        if not menu_data:
-            raise HTTPException(status_code=404, detail="Menu not found")
-
-        return MenuResponse(
-            menu_id=menu_id,
-            restaurant_name=menu_data.restaurant_name,
-            categories=menu_data.categories,
-            raw_text=""  # We don't return raw_text for GET requests
-        )
+        # Serve the serialized response from the cache when possible
+        body = menu_cache.get(menu_id)
+        if body is None:
+            generation = menu_cache.generation
+            start = time.perf_counter()
+            versioned = await run_bll(db, MenuBLL, "get_versioned_snapshot", menu_id)
+
+            if not versioned:
+                raise HTTPException(status_code=404, detail="Menu not found")
+
+            # The snapshot already has the MenuResponse layout, so it is serialized as is
+            snapshot, version = versioned
+            body = EncodedBody(dumps({
+                "menu_id": menu_id,
+                **snapshot,
+                "raw_text": ""  # We don't return raw_text for GET requests
+            }), menu_etag(version))
+            menu_cache.put(menu_id, body, time.perf_counter() - start, generation)
+
+        # Already validated and serialized, so skip response_model processing
+        return json_response(request, body, MENU_CACHE_CONTROL)
     except HTTPException:
         raise
     except Exception as e:
@@ -182,7 +808,7 @@ async def get_menu(menu_id: str, db: Session = Depends(get_db)):
 
 
 @app.delete("/api/menus/{menu_id}")
-async def delete_menu(menu_id: str, db: Session = Depends(get_db)):
+async def delete_menu(menu_id: str, db: Session = Depends(get_session)):
     """
     Delete a menu by ID.
 
@@ -194,12 +820,13 @@ async def delete_menu(menu_id: str, db: Session = Depends(get_db)):
         Success message
     """
     try:
-        bll = MenuBLL(db)
-        success = bll.delete_menu(menu_id)
+        unused_images = await run_bll(db, MenuBLL, "delete_menu", menu_id)
 
-        if not success:
+        if unused_images is None:
             raise HTTPException(status_code=404, detail="Menu not found")
 
+        await run_io(remove_uploads, unused_images)
+
         return {"message": "Menu deleted successfully", "menu_id": menu_id}
     except HTTPException:
         raise
@@ -209,6 +836,62 @@ async def delete_menu(menu_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+@app.post("/api/menus/bulk-delete")
+async def bulk_delete_menus(request: BulkDeleteRequest, db: Session = Depends(get_session)):
+    """
+    Delete several menus and their images, by ID or by age.
+
+    Args:
+        request: {"menu_ids": [...]} (at most 1000) or {"older_than_days": N}
+        db: Database session
+
+    Returns:
+        Number and IDs of the deleted menus, image files removed and bytes reclaimed
+    """
+    try:
+        result = await run_bll(
+            db, MenuBLL, "delete_menus", menu_ids=request.menu_ids, older_than_days=request.older_than_days
+        )
+        files, reclaimed = await run_io(remove_uploads, result.pop("unused_images"))
+        return {**result, "files_removed": files, "reclaimed_bytes": reclaimed}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/api/upload-sweeper")
+async def get_upload_sweeper_stats():
+    """
+    Get statistics of the orphaned upload sweeper.
+
+    Returns:
+        Sweep interval, number of sweeps, files removed and bytes reclaimed
+    """
+    return upload_sweeper.stats()
+
+
+@app.post("/api/upload-sweeper/run")
+async def run_upload_sweeper(dry_run: bool = False):
+    """
+    Remove orphaned upload files now.
+
+    Args:
+        dry_run: Only report what would be removed
+
+    Returns:
+        Number of files removed and bytes reclaimed
+    """
+    try:
+        return await upload_sweeper.sweep(dry_run=dry_run)
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
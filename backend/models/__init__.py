@@ -1,3 +1,3 @@
-from .menu import MenuItem, MenuCategory, MenuData, MenuResponse
+from .menu import MenuItemPrice, MenuItem, MenuCategory, MenuData, MenuResponse, BulkDeleteRequest
 
-__all__ = ["MenuItem", "MenuCategory", "MenuData", "MenuResponse"]
+__all__ = ["MenuItemPrice", "MenuItem", "MenuCategory", "MenuData", "MenuResponse", "BulkDeleteRequest"]
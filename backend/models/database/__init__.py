@@ -1,3 +1,4 @@
-from .menu_models import MenuDB, CategoryDB, MenuItemDB
+from .menu_models import MenuDB, CategoryDB, MenuItemDB, MenuItemPriceDB
+from .job_models import ScanJobDB
 
-__all__ = ["MenuDB", "CategoryDB", "MenuItemDB"]
+__all__ = ["MenuDB", "CategoryDB", "MenuItemDB", "MenuItemPriceDB", "ScanJobDB"]
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from database import Base
+
+
+class ScanJobDB(Base):
+    """Database model for an asynchronous menu scan job"""
+    __tablename__ = "scan_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="queued", index=True)
+    menu_id = Column(String, nullable=False)
+    image_path = Column(String, nullable=False)
+    original_filename = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    error = Column(String, nullable=True)
+    stage_timings = Column(JSON, default=dict)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    # Renewed by the worker while the job runs; an expired lease means the worker is gone
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
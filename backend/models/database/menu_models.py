@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from database import Base
 
@@ -7,16 +8,31 @@ from database import Base
 class MenuDB(Base):
     """Database model for Menu"""
     __tablename__ = "menus"
+    __table_args__ = (
+        # Keyset pagination of the menu list (newest first)
+        Index("ix_menus_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     restaurant_name = Column(String, nullable=True)
-    raw_text = Column(String)
+    # Potentially large, only loaded when accessed
+    raw_text = deferred(Column(String))
     image_path = Column(String)
     original_filename = Column(String, nullable=True, index=True)
+    content_hash = Column(String(64), nullable=True, index=True)
+    perceptual_hash = Column(String(16), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Denormalized copy of the parsed menu ({"restaurant_name", "categories"}) for single-row reads
+    menu_snapshot = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    # Incremented whenever the parsed contents change (ETag of the menu response; NULL counts as 1)
+    version = Column(Integer, nullable=True, default=1)
 
     # Relationship
-    categories = relationship("CategoryDB", back_populates="menu", cascade="all, delete-orphan")
+    # Children are removed by the ON DELETE CASCADE foreign keys, not loaded and deleted one by one
+    categories = relationship(
+        "CategoryDB", back_populates="menu", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="CategoryDB.id"
+    )
 
 
 class CategoryDB(Base):
@@ -26,11 +42,14 @@ class CategoryDB(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String, nullable=False)
     is_main = Column(Boolean, default=True)
-    menu_id = Column(String, ForeignKey("menus.id"))
+    menu_id = Column(String, ForeignKey("menus.id", ondelete="CASCADE"), index=True)
 
     # Relationships
     menu = relationship("MenuDB", back_populates="categories")
-    items = relationship("MenuItemDB", back_populates="category", cascade="all, delete-orphan")
+    items = relationship(
+        "MenuItemDB", back_populates="category", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="MenuItemDB.id"
+    )
 
 
 class MenuItemDB(Base):
@@ -41,7 +60,30 @@ class MenuItemDB(Base):
     name = Column(String, nullable=False)
     price = Column(String, nullable=False)
     description = Column(String, default="")
-    category_id = Column(Integer, ForeignKey("categories.id"))
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), index=True)
 
-    # Relationship
+    # Relationships
     category = relationship("CategoryDB", back_populates="items")
+    prices = relationship(
+        "MenuItemPriceDB", back_populates="item", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="MenuItemPriceDB.position"
+    )
+
+
+class MenuItemPriceDB(Base):
+    """Database model for one numeric price of a Menu Item (e.g. each size)"""
+    __tablename__ = "menu_item_prices"
+    __table_args__ = (
+        # Price range filters and per-price sorting
+        Index("ix_menu_item_prices_amount_item", "amount_cents", "item_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    item_id = Column(Integer, ForeignKey("menu_items.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Order of the price in the item's display string (0 = base price)
+    position = Column(Integer, nullable=False, default=0)
+    amount_cents = Column(Integer, nullable=False)
+    size_label = Column(String, nullable=True)
+
+    # Relationship
+    item = relationship("MenuItemDB", back_populates="prices")
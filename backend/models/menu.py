@@ -1,11 +1,20 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 
 
+class MenuItemPrice(BaseModel):
+    # Immutable, so the parser can share one instance between items with the same price
+    model_config = ConfigDict(frozen=True)
+
+    amount_cents: int
+    label: Optional[str] = None
+
+
 class MenuItem(BaseModel):
     name: str
     price: str
     description: Optional[str] = ""
+    prices: List[MenuItemPrice] = []
 
 
 class MenuCategory(BaseModel):
@@ -24,3 +33,8 @@ class MenuResponse(BaseModel):
     restaurant_name: Optional[str]
     categories: List[MenuCategory]
     raw_text: str
+
+
+class BulkDeleteRequest(BaseModel):
+    menu_ids: Optional[List[str]] = None
+    older_than_days: Optional[float] = None
@@ -0,0 +1,56 @@
+"""
+Backfill numeric prices for menu items saved before prices were stored.
+
+Older items only have the display price string ("$4.70 / $5.20"). This parses
+it into one price row per amount (in cents, without size labels) and then
+refreshes the JSON snapshots of the affected menus so they include the new
+prices. Items are processed in ID order in batches; the script can be
+re-run safely since items that already have prices are skipped.
+
+To also recover size labels ("Large $5.20"), re-parse the stored OCR text
+instead with scripts/reparse_menus.py.
+
+Usage (from the backend directory):
+    python scripts/backfill_prices.py [--batch-size 1000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal  # noqa: E402
+from bll.menu_bll import MenuBLL  # noqa: E402
+from bll.price_bll import PriceBLL  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Items per batch / transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    after_id = 0
+    prices = snapshots = 0
+    start = time.perf_counter()
+    try:
+        price_bll = PriceBLL(db)
+        menu_bll = MenuBLL(db)
+        while True:
+            last_id, added, menu_ids = price_bll.backfill_prices(after_id, args.batch_size)
+            if last_id is None:
+                break
+            prices += added
+            snapshots += menu_bll.refresh_snapshots(sorted(menu_ids))
+            after_id = last_id
+            print(f"Up to item {after_id}: {prices} prices added, {snapshots} snapshot updates")
+    finally:
+        db.close()
+
+    print(f"\nDone in {time.perf_counter() - start:.1f}s: {prices} prices added, {snapshots} snapshot updates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmark parse_menu_text against the original implementation.
+
+Generates large synthetic menus (headers, sub-headers, upper-case sections,
+single and multi-price items, descriptions, noise lines), checks that the
+current parser produces the same MenuData as the original one (apart from the
+numeric prices it adds), and
+reports the speedup for single large menus and for a parse_menu_texts batch.
+
+Usage (from the backend directory):
+    python scripts/benchmark_menu_parser.py [--lines 10000 50000] [--batch 500] [--repeat 5] [--seed 0]
+"""
+
+import argparse
+import gc
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.menu import MenuData, MenuCategory, MenuItem  # noqa: E402
+from services.menu_parser import parse_menu_text, parse_menu_texts  # noqa: E402
+
+WORDS = ["latte", "mocha", "flat", "white", "bagel", "toast", "avocado", "egg", "salmon", "oat",
+         "chai", "matcha", "cheese", "salad", "soup", "croissant", "smoked", "iced", "house", "special"]
+DASHES = ["-", "–", "—", ""]
+
+
+def reference_parse_menu_text(text: str) -> MenuData:
+    """The original parse_menu_text, kept verbatim as the reference output"""
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+    restaurant_name = None
+    categories = []
+    current_category = None
+    current_is_main = True
+    items = []
+
+    # Pattern to find prices: either after dash or standalone with $
+    # Supports both 1 and 2 decimal places (e.g., $4.7 or $4.70)
+    dash_price_pattern = r'[\-\–\—]\s*\$?\s*(\d+)\.(\d{1,2})'
+    standalone_price_pattern = r'\$\s*(\d+)\.(\d{1,2})'
+
+    for i, line in enumerate(lines):
+        if len(line) < 2:
+            continue
+
+        if i == 0 and not re.search(r'\d', line) and not line.startswith('#'):
+            restaurant_name = line
+            continue
+
+        # Check for category markers: ##, ###, or #
+        if line.startswith('#'):
+            # Count the number of # symbols
+            hash_count = len(line) - len(line.lstrip('#'))
+            new_is_main = (hash_count == 2)
+
+            # Save previous category if it has items OR if it's a main category (acts as section header)
+            if current_category and (items or current_is_main):
+                categories.append(MenuCategory(
+                    name=current_category,
+                    items=items if items else [],
+                    is_main=current_is_main
+                ))
+                items = []
+
+            # Extract category name
+            current_category = line.lstrip('#').strip()
+            current_is_main = new_is_main
+            continue
+
+        if line.isupper() and len(line) > 3 and not re.search(dash_price_pattern, line):
+            if items and current_category:
+                categories.append(MenuCategory(
+                    name=current_category,
+                    items=items,
+                    is_main=current_is_main
+                ))
+                items = []
+            current_category = line.title()
+            current_is_main = True
+            continue
+
+        # Find all prices (both dash-prefixed and standalone)
+        price_matches = list(re.finditer(standalone_price_pattern, line))
+
+        if price_matches:
+            # Format prices with 2 decimal places (pad with 0 if needed)
+            prices = [f"${m.group(1)}.{m.group(2).ljust(2, '0')}" for m in price_matches]
+            price = " / ".join(prices)
+
+            first_price_pos = price_matches[0].start()
+            item_name = line[:first_price_pos].strip()
+            item_name = re.sub(r'[\-\–\—]+$', '', item_name).strip()
+
+            if item_name and len(item_name) > 1:
+                items.append(MenuItem(
+                    name=item_name,
+                    price=price,
+                    description=""
+                ))
+
+    if items and current_category:
+        categories.append(MenuCategory(
+            name=current_category,
+            items=items,
+            is_main=current_is_main
+        ))
+
+    return MenuData(
+        restaurant_name=restaurant_name,
+        categories=categories
+    )
+
+
+def comparable(menu: MenuData) -> dict:
+    """
+    Dump a parsed menu without the numeric prices, which the original parser did
+    not produce (its MenuItems carry the model's empty default). Both sides of a
+    comparison must go through this.
+    """
+    return menu.model_dump(exclude={"categories": {"__all__": {"items": {"__all__": {"prices"}}}}})
+
+
+def _price(rng: random.Random) -> str:
+    cents = rng.choice(["", "0", "5", "50", "75", "9"])
+    return f"${rng.randint(1, 40)}.{cents}" if cents else f"${rng.randint(1, 40)}"
+
+
+def synthetic_menu(rng: random.Random, lines: int) -> str:
+    """Build a menu-like OCR text with roughly the given number of lines"""
+    out = [" ".join(rng.choice(WORDS) for _ in range(2)).title() + " Cafe"]
+    while len(out) < lines:
+        kind = rng.random()
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        if kind < 0.05:
+            out.append("## " + name.upper())
+        elif kind < 0.10:
+            out.append("# " + name)
+        elif kind < 0.13:
+            out.append(name.upper())
+        elif kind < 0.70:
+            prices = " / ".join(_price(rng) for _ in range(rng.choice([1, 1, 1, 2, 3])))
+            out.append(f"{name.title()} {rng.choice(DASHES)} {prices}")
+        elif kind < 0.80:
+            out.append(f"{name.upper()} - {rng.randint(1, 30)}.{rng.randint(0, 99)}")
+        elif kind < 0.90:
+            out.append(name.capitalize() + ", served with " + rng.choice(WORDS))
+        elif kind < 0.95:
+            out.append(rng.choice(["", "   ", "x", "-", "$", "12"]))
+        else:
+            out.append(f"  {name}   ${rng.randint(1, 9)}.{rng.randint(0, 99)}  ")
+    return "\n".join(out)
+
+
+def _best(func, arg, repeat: int) -> float:
+    timings = []
+    # Like timeit, keep garbage collection pauses out of the measurement
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(arg)
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[10000, 50000], help="Synthetic menu sizes")
+    parser.add_argument("--batch", type=int, default=500, help="Number of 100-line menus in the batch test")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best time is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    print(f"{'input':<22} {'original':>10} {'current':>10} {'speedup':>8}  identical")
+    for lines in args.lines:
+        text = synthetic_menu(rng, lines)
+        identical = comparable(parse_menu_text(text)) == comparable(reference_parse_menu_text(text))
+        original = _best(reference_parse_menu_text, text, args.repeat)
+        current = _best(parse_menu_text, text, args.repeat)
+        print(f"{f'{lines} lines':<22} {original * 1000:>8.1f}ms {current * 1000:>8.1f}ms "
+              f"{original / current:>7.2f}x  {identical}")
+
+    texts = [synthetic_menu(rng, 100) for _ in range(args.batch)]
+    identical = [comparable(menu) for menu in parse_menu_texts(texts)] == \
+        [comparable(reference_parse_menu_text(text)) for text in texts]
+    original = _best(lambda batch: [reference_parse_menu_text(text) for text in batch], texts, args.repeat)
+    current = _best(parse_menu_texts, texts, args.repeat)
+    print(f"{f'batch {args.batch}x100 lines':<22} {original * 1000:>8.1f}ms {current * 1000:>8.1f}ms "
+          f"{original / current:>7.2f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark GET /api/menus/{id} for a large menu.
+
+Saves one synthetic menu (300 items by default) and requests it through the
+ASGI app in-process, reporting requests per second, median latency and
+response size for:
+  - baseline: the menu loaded, validated into MenuResponse and serialized by
+    response_model on every request (how the endpoint used to work)
+  - no cache: the snapshot serialized on every request (MENU_CACHE_SIZE=0)
+  - cached: the cached body, uncompressed / gzip / Brotli
+  - revalidate: If-None-Match with the current ETag (304, no body)
+It also times serializing the menu once with json, orjson and Pydantic.
+
+Usage (from the backend directory):
+    python scripts/benchmark_menu_response.py [--items 300] [--requests 3000] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def build_menu_text(items: int) -> str:
+    """OCR-like text of a menu with the given number of items in 10 categories"""
+    lines = ["Benchmark Bistro"]
+    per_category = max(1, items // 10)
+    for category in range(10):
+        lines.append(f"## CATEGORY {category}")
+        lines += [f"Dish {category}-{item} with seasonal vegetables ${item % 30 + 4}.50"
+                  for item in range(per_category)]
+    return "\n".join(lines)
+
+
+def time_serializers(snapshot: dict, rounds: int = 300) -> dict:
+    """Microseconds per serialization of the menu response"""
+    from models.menu import MenuResponse  # noqa: E402
+    from services.responses import orjson  # noqa: E402
+
+    payload = {"menu_id": "benchmark", **snapshot, "raw_text": ""}
+    model = MenuResponse.model_validate(payload)
+    candidates = {
+        "json.dumps": lambda: json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode(),
+        "model_validate + model_dump_json": lambda: MenuResponse.model_validate(payload).model_dump_json().encode(),
+        "model_dump_json (validated model)": lambda: model.model_dump_json().encode()
+    }
+    if orjson is not None:
+        candidates["orjson.dumps"] = lambda: orjson.dumps(payload)
+    results = {}
+    for name, serialize in candidates.items():
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                serialize()
+            best = min(best, (time.perf_counter() - start) / rounds)
+        results[name] = best * 1e6
+    return results
+
+
+async def run_load(client, path: str, headers: dict, requests: int, concurrency: int) -> dict:
+    """Send requests with a fixed number of concurrent clients"""
+    remaining = [requests]
+    latencies = []
+    sizes = []
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            # Read the body as sent, so the client does not spend time decompressing it
+            async with client.stream("GET", path, headers=headers) as response:
+                size = sum([len(chunk) async for chunk in response.aiter_raw()])
+            latencies.append(time.perf_counter() - start)
+            if response.status_code not in (200, 304):
+                raise RuntimeError(f"{path}: HTTP {response.status_code}")
+            sizes.append(size)
+
+    await client.get(path, headers=headers)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "bytes": statistics.median(sizes)
+    }
+
+
+async def benchmark(args) -> list:
+    import httpx  # noqa: E402
+    import main as app_module  # noqa: E402
+    from fastapi import Depends  # noqa: E402
+    from sqlalchemy.orm import Session  # noqa: E402
+    from database import SessionLocal, get_session  # noqa: E402
+    from bll.menu_bll import MenuBLL  # noqa: E402
+    from models.menu import MenuResponse  # noqa: E402
+    from services import menu_cache, parse_menu_text, run_bll  # noqa: E402
+
+    # The endpoint as it was: load, validate and serialize through response_model on every request
+    @app_module.app.get("/benchmark/baseline/{menu_id}", response_model=MenuResponse)
+    async def baseline_menu(menu_id: str, db: Session = Depends(get_session)):
+        menu_data = await run_bll(db, MenuBLL, "get_menu", menu_id)
+        return MenuResponse(menu_id=menu_id, restaurant_name=menu_data.restaurant_name,
+                            categories=menu_data.categories, raw_text="")
+
+    text = build_menu_text(args.items)
+    menu_id = str(uuid.uuid4())
+    db = SessionLocal()
+    try:
+        bll = MenuBLL(db)
+        menu_data = parse_menu_text(text)
+        bll.save_menu(menu_data, menu_id, "", text)
+        snapshot = bll.get_menu_snapshot(menu_id)
+    finally:
+        db.close()
+    item_count = sum(len(category["items"]) for category in snapshot["categories"])
+    print(f"Menu with {item_count} items, {len(json.dumps(snapshot)) / 1024:.0f}KB of JSON\n")
+
+    print("Serializing the response once:")
+    for name, micros in time_serializers(snapshot).items():
+        print(f"  {name:<36} {micros:>8.1f} us")
+    print()
+
+    path = f"/api/menus/{menu_id}"
+    identity = {"Accept-Encoding": "identity"}
+    rows = []
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        etag = (await client.get(path, headers=identity)).headers["etag"]
+        scenarios = [
+            ("baseline (response_model)", f"/benchmark/baseline/{menu_id}", identity, 0),
+            ("no cache", path, identity, 0),
+            ("cached", path, identity, None),
+            ("cached, gzip", path, {"Accept-Encoding": "gzip"}, None),
+            ("cached, br", path, {"Accept-Encoding": "br, gzip"}, None),
+            ("revalidate (304)", path, {"If-None-Match": etag, **identity}, None)
+        ]
+        default_size = menu_cache.max_entries
+        for name, url, headers, cache_size in scenarios:
+            menu_cache.clear()
+            menu_cache.max_entries = default_size if cache_size is None else cache_size
+            rows.append((name, await run_load(client, url, headers, args.requests, args.concurrency)))
+        menu_cache.max_entries = default_size
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=300, help="Items on the synthetic menu")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--database-url", default="sqlite:///menu_response_benchmark.db")
+    args = parser.parse_args()
+
+    # Configure the app before its modules are imported
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("MENU_CACHE_SIZE", "512")
+
+    rows = asyncio.run(benchmark(args))
+    baseline = rows[0][1]["requests_per_second"]
+    print(f"{args.requests} requests per scenario, {args.concurrency} concurrent clients")
+    print(f"{'scenario':<26}  {'req/s':>8}  {'p50 ms':>7}  {'bytes':>7}  {'vs baseline':>11}")
+    for name, row in rows:
+        print(f"{name:<26}  {row['requests_per_second']:>8.0f}  {row['p50_ms']:>7.2f}  {row['bytes']:>7.0f}  "
+              f"{row['requests_per_second'] / baseline:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
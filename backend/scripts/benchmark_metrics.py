@@ -0,0 +1,164 @@
+"""
+Measure the overhead of latency instrumentation (services/metrics.py).
+
+Fills its own database with synthetic menus, then replays the same API request
+mix (menu reads with the response cache cleared so every read goes through
+the DAL, menu list pages, search and price queries) in interleaved rounds
+against the app as deployed (metrics on) and the same app built without
+RequestMetricsMiddleware and with metrics recording switched off. Every request
+is sent to both back to back, so noise hits both settings alike. Each round
+gives one overhead measurement, and the median over all rounds is reported
+with its 95% confidence interval, so a single noisy round cannot move the result.
+It also estimates the overhead directly from the number of samples recorded
+per round and the cost of one sample.
+
+The benchmark uses its own database: a SQLite file (and upload directory) in a
+temporary directory that is deleted at the end, unless --database-url points
+elsewhere. Do not point it at production data.
+
+Usage (from the backend directory):
+    python scripts/benchmark_metrics.py [--menus 200] [--rounds 60] [--database-url postgresql://...]
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--menus", type=int, default=200, help="Synthetic menus to create")
+    parser.add_argument("--rounds", type=int, default=60, help="Rounds per setting")
+    parser.add_argument("--database-url", help="Database to fill (default: SQLite in a temporary directory)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="metrics_benchmark_") as work_dir:
+        # Configure the database and uploads before the app modules read them
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(work_dir) / 'benchmark.db'}"
+        os.environ["UPLOAD_DIR"] = str(Path(work_dir) / "uploads")
+        try:
+            run_benchmark(args)
+        finally:
+            # Close the pooled connections so the temporary database file can be deleted
+            if "database" in sys.modules:
+                sys.modules["database"].engine.dispose()
+
+
+def run_benchmark(args):
+
+    from fastapi.testclient import TestClient  # noqa: E402
+    from database import SessionLocal  # noqa: E402
+    from bll.menu_bll import MenuBLL  # noqa: E402
+    from services import metrics, menu_cache, parse_menu_text  # noqa: E402
+    import main as app_module  # noqa: E402
+
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        menu_ids = [menu["id"] for menu in MenuBLL(db).list_menus(limit=args.menus)["menus"]]
+        while len(menu_ids) < args.menus:
+            lines = ["Benchmark Diner"]
+            for category in ("STARTERS", "MAINS", "DESSERTS"):
+                lines.append(f"## {category}")
+                lines += [f"Dish {rng.randint(1, 999)} ${rng.randint(3, 40)}.{rng.randint(0, 99):02d}" for _ in range(15)]
+            raw_text = "\n".join(lines)
+            menu_id = str(uuid.uuid4())
+            MenuBLL(db).save_menu(parse_menu_text(raw_text), menu_id, "synthetic", raw_text)
+            menu_ids.append(menu_id)
+    finally:
+        db.close()
+
+    app = app_module.app
+    # The same app without the request middleware: Starlette builds its middleware stack from user_middleware
+    middleware = app.user_middleware
+    app.user_middleware = [m for m in middleware if m.cls is not app_module.RequestMetricsMiddleware]
+    bare_stack = app.build_middleware_stack()
+    app.user_middleware = middleware
+    deployed_stack = app.build_middleware_stack()
+
+    def entry(stack):
+        # Both settings enter their stack the same way (as FastAPI.__call__ does, without
+        # its per-request telemetry check), so only the metrics code differs between them
+        async def asgi_app(scope, receive, send):
+            scope["app"] = app
+            await stack(scope, receive, send)
+        return asgi_app
+
+    clients = {True: TestClient(entry(deployed_stack)), False: TestClient(entry(bare_stack))}
+
+    request_mix = [(f"/api/menus/{menu_id}", None) for menu_id in menu_ids[:50]]
+    for _ in range(10):
+        request_mix += [("/api/menus", {"limit": 20}), ("/api/items", {"max_price": 10, "limit": 20}),
+                        ("/api/search", {"q": "dish"})]
+
+    def run_round(index: int) -> dict:
+        """Send every request of the mix with both settings back to back; returns the seconds spent per setting"""
+        totals = {True: 0.0, False: 0.0}
+        for number, (path, params) in enumerate(request_mix):
+            # Alternate which setting goes first so drift affects both equally
+            for enabled in ((True, False) if (index + number) % 2 == 0 else (False, True)):
+                menu_cache.clear()
+                metrics.METRICS_ENABLED = enabled
+                start = time.perf_counter()
+                clients[enabled].get(path, params=params)
+                totals[enabled] += time.perf_counter() - start
+        metrics.METRICS_ENABLED = True
+        return totals
+
+    def recorded_samples():
+        return sum(
+            entry[2] for metric in (metrics.stage_seconds, metrics.db_seconds, metrics.http_request_seconds)
+            for entry in metric._values.values()
+        )
+
+    run_round(0)  # warm up connections and caches
+    results = {True: [], False: []}
+    for index in range(args.rounds):
+        for enabled, seconds in run_round(index).items():
+            results[enabled].append(seconds)
+
+    # Also estimate the cost of recording alone: samples per round x cost of one sample
+    # (the end-to-end overhead adds the middleware and the timing context around each call)
+    before = recorded_samples()
+    run_round(0)
+    samples = recorded_samples() - before
+    token = metrics.start_request()
+    calls = 100000
+    timed_call = metrics._timed_call(lambda: None, "benchmark")
+    start = time.perf_counter()
+    for _ in range(calls):
+        timed_call()
+    per_sample = (time.perf_counter() - start) / calls
+    metrics.finish_request(token)
+
+    on = statistics.median(results[True])
+    off = statistics.median(results[False])
+    # Both settings of a round ran interleaved request by request, so their ratio cancels most of the noise
+    overheads = sorted((on_round - off_round) / off_round * 100
+                       for on_round, off_round in zip(results[True], results[False]))
+    median = statistics.median(overheads)
+    # Distribution-free 95% confidence interval of the median (order statistics of the round overheads)
+    spread = math.ceil(1.96 * len(overheads) ** 0.5 / 2)
+    low = overheads[max(len(overheads) // 2 - spread - 1, 0)]
+    high = overheads[min((len(overheads) + 1) // 2 + spread, len(overheads) - 1)]
+    requests = len(request_mix)
+    print(f"Menus: {len(menu_ids)}, {requests} requests per round, {args.rounds} rounds per setting (medians)")
+    print(f"  no metrics:  {off * 1000:8.1f} ms/round ({off / requests * 1000:.3f} ms/request)")
+    print(f"  metrics on:  {on * 1000:8.1f} ms/round ({on / requests * 1000:.3f} ms/request)")
+    print(f"  overhead:    {median:+.2f}% (end to end, median of {len(overheads)} rounds, "
+          f"95% confidence interval {low:+.2f}% to {high:+.2f}%)")
+    print(f"  estimated:   {samples} samples/round x {per_sample * 1e6:.1f} us = {samples * per_sample * 1000:.2f} ms/round "
+          f"({samples * per_sample / off * 100:.2f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Exercise the shared OpenAI client against a local stand-in of the chat completions API.
+
+The stand-in server simulates response latency and a requests-per-second rate
+limit (answering 429 with Retry-After), and streams the reply line by line as
+server-sent events when the request sets stream=true. The benchmark fires a
+burst of concurrent requests through create_chat_completion and reports how
+many succeeded, how many were retried, the peak number of in-flight requests
+and how many TCP connections were opened. A client-per-request run is shown for
+comparison. The stand-in is also the server of the client's tests
+(tests/test_openai_client.py).
+
+Usage (from the backend directory):
+    python scripts/benchmark_openai_client.py [--requests 40] [--latency 0.2] [--rate 10] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class StandInState:
+    """Counters shared by the stand-in server's handler threads"""
+
+    def __init__(self, latency: float, rate: float, reject_first: int = 0, retry_after: float = 0.0):
+        """
+        Args:
+            latency: Seconds to spend on each accepted request
+            rate: Requests per second accepted before answering 429
+            reject_first: Answer this many requests with 429 (and retry_after) before accepting any
+            retry_after: Retry-After of the rejected requests
+        """
+        self.latency = latency
+        self.rate = rate
+        self.reject_first = reject_first
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.accepted = 0
+        self.rate_limited = 0
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        # (arrival time, Retry-After sent or None) of every request
+        self.requests = []
+
+    def admit(self) -> float:
+        """Return 0 if the request is accepted, otherwise the Retry-After to answer 429 with"""
+        with self.lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.reject_first:
+                self.reject_first -= 1
+                wait = self.retry_after
+            else:
+                if now - self.window_start >= 1.0:
+                    self.window_start = now
+                    self.window_count = 0
+                if self.window_count >= self.rate:
+                    wait = 1.0 - (now - self.window_start)
+            self.requests.append((now, wait or None))
+            if wait:
+                self.rate_limited += 1
+                return wait
+            self.window_count += 1
+            self.accepted += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return 0.0
+
+    def done(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+STANDIN_MENU = "Stand-in Cafe\n## DRINKS\nLatte - $4.50\nMocha - $5.00 / $5.50\n## FOOD\nBagel - $3.20\nToast - $2.75\n"
+
+
+def make_handler(state: StandInState):
+    class ChatCompletionsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_stream(self):
+            # The latency is spread over the lines, like a model generating them one by one
+            lines = STANDIN_MENU.splitlines(keepends=True)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            finished = False
+            try:
+                for line in lines + [None]:
+                    if line is None:
+                        # The request counts as finished before the client can see the end of the stream
+                        finished = True
+                        state.done()
+                        event = "data: [DONE]\n\n"
+                    else:
+                        time.sleep(state.latency / len(lines))
+                        chunk = {
+                            "id": "chatcmpl-standin",
+                            "object": "chat.completion.chunk",
+                            "created": int(time.time()),
+                            "model": "gpt-4o",
+                            "choices": [{"index": 0, "delta": {"content": line}, "finish_reason": None}]
+                        }
+                        event = f"data: {json.dumps(chunk)}\n\n"
+                    payload = event.encode()
+                    self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client closed the stream early
+                self.close_connection = True
+                if not finished:
+                    state.done()
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            wait = state.admit()
+            if wait:
+                self._send_json(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                    {"Retry-After": f"{wait:.3f}"}
+                )
+                return
+            if body.get("stream"):
+                self._send_stream()
+                return
+            time.sleep(state.latency)
+            state.done()
+            self._send_json(200, {
+                "id": "chatcmpl-standin",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": STANDIN_MENU},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+            })
+
+    return ChatCompletionsHandler
+
+
+def start_server(latency: float, rate: float, reject_first: int = 0, retry_after: float = 0.0):
+    state = StandInState(latency, rate, reject_first, retry_after)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def _messages():
+    return [{"role": "user", "content": "Transcribe this menu"}]
+
+
+async def run_shared(count: int) -> dict:
+    from services import openai_client
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(openai_client.create_chat_completion(model="gpt-4o", messages=_messages()) for _ in range(count)),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - start
+    await openai_client.close_client()
+    return {"elapsed": elapsed, "errors": sum(isinstance(r, Exception) for r in results), **openai_client.stats}
+
+
+async def run_client_per_request(count: int) -> dict:
+    from openai import AsyncOpenAI
+
+    async def call():
+        # What extract_text_openai used to do: a fresh client (and connection) per call
+        client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
+        try:
+            return await client.chat.completions.create(model="gpt-4o", messages=_messages())
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(call() for _ in range(count)), return_exceptions=True)
+    return {"elapsed": time.perf_counter() - start, "errors": sum(isinstance(r, Exception) for r in results)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40, help="Number of concurrent requests to fire")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated response latency in seconds")
+    parser.add_argument("--rate", type=float, default=10, help="Requests per second the stand-in accepts")
+    parser.add_argument("--concurrency", type=int, default=4, help="OPENAI_MAX_CONCURRENCY for the shared client")
+    args = parser.parse_args()
+
+    server, state = start_server(args.latency, args.rate)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "standin"
+    os.environ["OPENAI_MAX_CONCURRENCY"] = str(args.concurrency)
+    os.environ.setdefault("OPENAI_MAX_RETRIES", "10")
+
+    result = asyncio.run(run_shared(args.requests))
+    print(f"Shared client (max {args.concurrency} in flight)")
+    print(f"  {args.requests - result['errors']}/{args.requests} succeeded in {result['elapsed']:.2f}s")
+    print(f"  retries {result['retries']}, 429s {result['rate_limited']}, peak in flight {state.max_in_flight}")
+    print(f"  TCP connections opened {state.connections}")
+
+    server.shutdown()
+    server, state = start_server(args.latency, args.rate)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    result = asyncio.run(run_client_per_request(args.requests))
+    print("\nClient per request (SDK defaults)")
+    print(f"  {args.requests - result['errors']}/{args.requests} succeeded in {result['elapsed']:.2f}s")
+    print(f"  429s {state.rate_limited}, peak in flight {state.max_in_flight}")
+    print(f"  TCP connections opened {state.connections}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
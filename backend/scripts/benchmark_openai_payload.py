@@ -0,0 +1,97 @@
+"""
+Benchmark the image payload sent to the OpenAI Vision API.
+
+For every sample image this compares the original upload against the
+re-encoded JPEG and WebP payloads: bytes sent (base64, as in the request),
+output size and encoding time. With --live (and OPENAI_API_KEY set) it also
+measures end-to-end extract_text_openai latency for each variant.
+
+Usage (from the backend directory):
+    python scripts/benchmark_openai_payload.py [--images "../menu images"] [--live]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv  # noqa: E402
+from PIL import Image  # noqa: E402
+from services.image_service import prepare_openai_image  # noqa: E402
+
+FORMATS = ["original", "jpeg", "webp"]
+
+
+def _measure(image_path: Path, image_format: str, live: bool) -> dict:
+    start = time.perf_counter()
+    payload, mime_type = prepare_openai_image(str(image_path), image_format)
+    encode_time = time.perf_counter() - start
+
+    with Image.open(io.BytesIO(payload)) as img:
+        size = img.size
+
+    latency = None
+    if live:
+        from services.ocr_service import extract_text_openai
+        start = time.perf_counter()
+        asyncio.run(extract_text_openai(str(image_path), image_format))
+        latency = time.perf_counter() - start
+
+    return {
+        "bytes": len(base64.b64encode(payload)),
+        "mime": mime_type,
+        "size": size,
+        "encode": encode_time,
+        "latency": latency
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_images = Path(__file__).resolve().parent.parent.parent / "menu images"
+    parser.add_argument("--images", default=str(default_images), help="Directory with sample menu images")
+    parser.add_argument("--live", action="store_true", help="Also call the OpenAI API and time each request")
+    args = parser.parse_args()
+
+    load_dotenv()
+    images = sorted(
+        p for p in Path(args.images).iterdir()
+        if p.suffix.lower() in {".png", ".jpg", ".jpeg", ".webp", ".heic"}
+    )
+    if not images:
+        print(f"No images found in {args.images}")
+        return
+
+    print(f"{'image':<40} {'format':<9} {'mime':<11} {'output':>11} {'sent KB':>9} {'encode':>9} {'latency':>9}")
+    totals = {image_format: {"bytes": 0, "latency": 0.0} for image_format in FORMATS}
+    for image_path in images:
+        for image_format in FORMATS:
+            result = _measure(image_path, image_format, args.live)
+            totals[image_format]["bytes"] += result["bytes"]
+            totals[image_format]["latency"] += result["latency"] or 0.0
+
+            width, height = result["size"]
+            latency = f"{result['latency']:.2f}s" if result["latency"] is not None else "n/a"
+            print(
+                f"{image_path.name[:40]:<40} {image_format:<9} {result['mime']:<11} {f'{width}x{height}':>11} "
+                f"{result['bytes'] / 1024:>9.1f} {result['encode'] * 1000:>7.1f}ms {latency:>9}"
+            )
+
+    print("\nSummary")
+    original = totals["original"]["bytes"]
+    for image_format in FORMATS:
+        total = totals[image_format]
+        latency = f"{total['latency']:.2f}s" if args.live else "n/a"
+        print(
+            f"  {image_format:<9} sent {total['bytes'] / 1024:9.1f}KB "
+            f"({total['bytes'] / original:6.1%} of original)   total latency {latency}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark the Tesseract preprocessing profiles (fast / balanced / accurate).
+
+For every sample image and profile this reports preprocessing latency, peak
+memory and - when Tesseract is installed - character-level OCR agreement
+with the "accurate" profile.
+
+Usage (from the backend directory):
+    python scripts/benchmark_preprocessing.py [--images "../menu images"] [--repeat 3]
+"""
+
+import argparse
+import difflib
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.image_service import PREPROCESS_PROFILES, preprocess_image  # noqa: E402
+
+OCR_CONFIG = r'--oem 3 --psm 6 -c preserve_interword_spaces=1'
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(args):
+    """Run one profile on one image in a fresh process so peak memory is isolated"""
+    image_path, quality, repeat, with_ocr = args
+
+    # Warm up OpenCV so its one-off initialisation is not counted as preprocessing memory
+    import cv2
+    import numpy as np
+    warmup = np.zeros((64, 64), np.uint8)
+    cv2.fastNlMeansDenoising(cv2.resize(warmup, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC), None, 10, 7, 21)
+    cv2.adaptiveThreshold(warmup, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    baseline = _peak_rss_mb()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        image = preprocess_image(image_path, quality)
+        timings.append(time.perf_counter() - start)
+
+    text = None
+    if with_ocr:
+        import pytesseract
+        text = pytesseract.image_to_string(image, config=OCR_CONFIG, lang='eng')
+
+    return {
+        "latency": min(timings),
+        "peak_mb": _peak_rss_mb() - baseline,
+        "size": image.size,
+        "text": text
+    }
+
+
+def _tesseract_available() -> bool:
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_images = Path(__file__).resolve().parent.parent.parent / "menu images"
+    parser.add_argument("--images", default=str(default_images), help="Directory with sample menu images")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per image/profile (best time is reported)")
+    args = parser.parse_args()
+
+    images = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in {".png", ".jpg", ".jpeg"})
+    if not images:
+        print(f"No images found in {args.images}")
+        return
+
+    with_ocr = _tesseract_available()
+    if not with_ocr:
+        print("Tesseract not found - skipping OCR agreement\n")
+
+    profiles = list(PREPROCESS_PROFILES)
+    print(f"{'image':<40} {'profile':<10} {'output':>11} {'latency':>10} {'peak MB':>9} {'agreement':>10}")
+
+    totals = {quality: {"latency": 0.0, "peak_mb": 0.0, "agreement": []} for quality in profiles}
+    for image_path in images:
+        results = {}
+        for quality in profiles:
+            # One task per process so ru_maxrss reflects only this run
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                results[quality] = pool.map(_measure, [(str(image_path), quality, args.repeat, with_ocr)])[0]
+
+        reference = results["accurate"]["text"]
+        for quality in profiles:
+            result = results[quality]
+            agreement = None
+            if with_ocr:
+                agreement = difflib.SequenceMatcher(None, reference, result["text"]).ratio()
+                totals[quality]["agreement"].append(agreement)
+            totals[quality]["latency"] += result["latency"]
+            totals[quality]["peak_mb"] = max(totals[quality]["peak_mb"], result["peak_mb"])
+
+            width, height = result["size"]
+            print(
+                f"{image_path.name[:40]:<40} {quality:<10} {f'{width}x{height}':>11} "
+                f"{result['latency'] * 1000:>8.1f}ms {result['peak_mb']:>9.1f} "
+                f"{f'{agreement:.1%}' if agreement is not None else 'n/a':>10}"
+            )
+
+    print("\nSummary")
+    for quality in profiles:
+        total = totals[quality]
+        agreement = total["agreement"]
+        mean_agreement = f"{sum(agreement) / len(agreement):.1%}" if agreement else "n/a"
+        print(
+            f"  {quality:<10} total latency {total['latency'] * 1000:8.1f}ms   "
+            f"max peak {total['peak_mb']:7.1f}MB   mean agreement {mean_agreement}"
+        )
+
+
+if __name__ == "__main__":
+    main()
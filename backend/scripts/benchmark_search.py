@@ -0,0 +1,120 @@
+"""
+Benchmark full-text menu search latency on a synthetic dataset.
+
+Fills a database with synthetic menus (100k items by default) through
+MenuBLL.save_menu, so the search index is maintained exactly as in the API,
+then runs a mix of single-word, multi-word, prefix and restaurant-filtered
+queries through SearchBLL and reports p50/p95/p99 latency.
+
+The benchmark uses its own database (a local SQLite file unless --database-url
+points elsewhere); do not point it at production data.
+
+Usage (from the backend directory):
+    python scripts/benchmark_search.py [--items 100000] [--queries 1000] [--database-url sqlite:///search_benchmark.db]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ADJECTIVES = ["oat", "iced", "hot", "vegan", "spicy", "smoked", "grilled", "crispy", "classic", "house",
+              "double", "mini", "sweet", "salted", "fresh", "roasted", "garlic", "truffle", "lemon", "honey"]
+NOUNS = ["milk latte", "mocha", "espresso", "chai", "burger", "wings", "salad", "pizza", "taco", "ramen",
+         "fries", "sandwich", "bagel", "croissant", "pancakes", "smoothie", "tea", "soup", "pasta", "curry"]
+CATEGORIES = ["Drinks", "Coffee", "Breakfast", "Lunch", "Dinner", "Sides", "Desserts", "Specials", "Kids", "Bowls"]
+RESTAURANTS = ["Blue Door", "Corner Cafe", "Oat & Honey", "Green Fork", "Night Owl", "Harbor Grill",
+               "Little Saigon", "Pasta Bar", "Sunrise Diner", "Taco Stand"]
+
+
+def menu_text(rng: random.Random, restaurant: str, items: int) -> str:
+    lines = [restaurant]
+    per_category = max(1, items // len(CATEGORIES))
+    for category in CATEGORIES:
+        lines.append(f"## {category.upper()}")
+        for _ in range(per_category):
+            lines.append(f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()} - ${rng.randint(2, 30)}.{rng.randint(0, 99):02d}")
+    return "\n".join(lines)
+
+
+def build_queries(rng: random.Random, count: int) -> list:
+    queries = []
+    for _ in range(count):
+        kind = rng.randrange(4)
+        if kind == 0:
+            queries.append((rng.choice(NOUNS).split()[0], None))
+        elif kind == 1:
+            queries.append((f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}", None))
+        elif kind == 2:
+            word = rng.choice(NOUNS).split()[0]
+            queries.append((word[:max(2, len(word) - 2)], None))
+        else:
+            queries.append((rng.choice(NOUNS).split()[0], rng.choice(RESTAURANTS).split()[0]))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000, help="Number of synthetic menu items")
+    parser.add_argument("--items-per-menu", type=int, default=100, help="Items per synthetic menu")
+    parser.add_argument("--queries", type=int, default=1000, help="Number of timed queries")
+    parser.add_argument("--limit", type=int, default=20, help="Results per query")
+    parser.add_argument("--database-url", default="sqlite:///search_benchmark.db", help="Benchmark database")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from database import Base, engine, SessionLocal, add_missing_columns
+    from bll.menu_bll import MenuBLL
+    from bll.search_bll import SearchBLL
+    from dal.search_dal import SearchDAL
+    from services.menu_parser import parse_menu_text
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    SearchDAL.create_search_index(engine)
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        bll = MenuBLL(db)
+        existing = bll.get_menu_count() * args.items_per_menu
+        menus = max(0, (args.items - existing) // args.items_per_menu)
+        if menus:
+            print(f"Saving {menus} synthetic menus ({menus * args.items_per_menu} items)...")
+            start = time.perf_counter()
+            for _ in range(menus):
+                text = menu_text(rng, rng.choice(RESTAURANTS), args.items_per_menu)
+                bll.save_menu(parse_menu_text(text), str(uuid.uuid4()), "synthetic", text)
+            print(f"  {time.perf_counter() - start:.1f}s ({menus / (time.perf_counter() - start):.0f} menus/sec, index included)")
+
+        search = SearchBLL(db)
+        queries = build_queries(rng, args.queries)
+        for query, restaurant in queries[:20]:
+            search.search(query, restaurant=restaurant, limit=args.limit)
+
+        latencies = []
+        result_counts = []
+        for query, restaurant in queries:
+            start = time.perf_counter()
+            page = search.search(query, restaurant=restaurant, limit=args.limit)
+            latencies.append((time.perf_counter() - start) * 1000)
+            result_counts.append(len(page["results"]))
+    finally:
+        db.close()
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"\n{len(latencies)} queries on {engine.dialect.name}, ~{max(existing, args.items)} items")
+    print(f"  p50 {quantiles[49]:.2f}ms  p95 {quantiles[94]:.2f}ms  p99 {quantiles[98]:.2f}ms  max {latencies[-1]:.2f}ms")
+    print(f"  avg results per page {statistics.mean(result_counts):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Check that every menu's JSON snapshot matches its categories and items.
+
+GET /api/menus/{id} serves the snapshot stored on the menu row, while the
+normalized categories/menu_items tables stay the source of truth. This walks
+all menus in ID order, rebuilds each snapshot from the tables and reports the
+ones that are missing (menus saved before snapshots existed) or different.
+With --fix the snapshots are rewritten from the tables.
+
+Usage (from the backend directory):
+    python scripts/check_menu_snapshots.py [--fix] [--batch-size 500] [--show 20]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal  # noqa: E402
+from bll.menu_bll import MenuBLL  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fix", action="store_true", help="Rewrite missing or inconsistent snapshots")
+    parser.add_argument("--batch-size", type=int, default=500, help="Menus per batch")
+    parser.add_argument("--show", type=int, default=20, help="Maximum number of mismatches printed")
+    args = parser.parse_args()
+
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+    checked = missing = different = shown = 0
+    start = time.perf_counter()
+    try:
+        write_bll = MenuBLL(write_db)
+        for rows in MenuBLL(read_db).iter_snapshots(batch_size=args.batch_size):
+            inconsistent = write_bll.find_inconsistent_snapshots(rows)
+            checked += len(rows)
+            for menu_id, (stored, expected) in inconsistent.items():
+                if stored is None:
+                    missing += 1
+                    continue
+                different += 1
+                if shown < args.show:
+                    shown += 1
+                    print(f"{menu_id}: snapshot differs from the tables")
+                    print(f"  stored:   {json.dumps(stored)[:200]}")
+                    print(f"  expected: {json.dumps(expected)[:200]}")
+            if args.fix and inconsistent:
+                write_bll.update_snapshots({menu_id: expected for menu_id, (_, expected) in inconsistent.items()})
+    finally:
+        read_db.close()
+        write_db.close()
+
+    elapsed = time.perf_counter() - start
+    action = "fixed" if args.fix else "found"
+    print(f"\nChecked {checked} menus in {elapsed:.1f}s: {missing} missing and {different} inconsistent snapshots {action}")
+    if (missing or different) and not args.fix:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Move images uploaded before the content-addressed image store into it.
+
+Older menus point to uploads/<menu id>.<ext>. Each such file is hashed,
+stored once under its SHA-256 with a thumbnail, the menus using it are
+pointed to the stored copy (and get a content hash if they had none), and the
+old file is removed. Images of unfinished scan jobs are left alone; run the
+script again once the queue is empty. Safe to interrupt and re-run.
+
+Usage (from the backend directory):
+    python scripts/migrate_images.py [--dry-run] [--keep-files]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal  # noqa: E402
+from bll.job_bll import JobBLL  # noqa: E402
+from bll.menu_bll import MenuBLL  # noqa: E402
+from services.image_store import image_store  # noqa: E402
+from services.upload_service import store_upload, InvalidImageError  # noqa: E402
+
+
+async def migrate(dry_run: bool, keep_files: bool) -> dict:
+    """Move every legacy image into the store"""
+    db = SessionLocal()
+    try:
+        menu_bll = MenuBLL(db)
+        pending = JobBLL(db).get_pending_image_paths()
+        legacy = sorted(
+            path for path in menu_bll.get_image_paths()
+            if path not in pending and not image_store.hash_for_location(path)
+        )
+        counts = {"images": 0, "menus": 0, "missing": 0, "invalid": 0}
+        for old_path in legacy:
+            source = Path(old_path)
+            if not source.is_file():
+                counts["missing"] += 1
+                continue
+            contents = source.read_bytes()
+            content_hash = hashlib.sha256(contents).hexdigest()
+            if dry_run:
+                counts["images"] += 1
+                continue
+
+            # Copy first, so the old file is only removed once the menus point to the store
+            staging_path = image_store.staging_path()
+            shutil.copyfile(source, staging_path)
+            try:
+                new_path = await store_upload(staging_path, contents, content_hash)
+            except InvalidImageError:
+                print(f"  Skipping {old_path}: not a readable image")
+                counts["invalid"] += 1
+                continue
+            counts["menus"] += menu_bll.replace_image_path(old_path, new_path, content_hash)
+            counts["images"] += 1
+            if not keep_files:
+                source.unlink(missing_ok=True)
+        return counts
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the images that would be moved")
+    parser.add_argument("--keep-files", action="store_true", help="Leave the old files in place")
+    args = parser.parse_args()
+
+    counts = asyncio.run(migrate(args.dry_run, args.keep_files))
+    action = "Would move" if args.dry_run else "Moved"
+    print(f"{action} {counts['images']} image(s) into {image_store.root}/ "
+          f"({counts['menus']} menus updated, {counts['missing']} files missing, {counts['invalid']} unreadable)")
+
+
+if __name__ == "__main__":
+    main()
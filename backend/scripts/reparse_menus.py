@@ -0,0 +1,160 @@
+"""
+Re-parse stored menus from their raw OCR text.
+
+When the parsing rules in services/menu_parser.py change, this refreshes the
+categories and items of every saved menu without re-uploading anything.
+Menus are streamed from the database in ID order, parsed in batches across a
+process pool, and only menus whose result changed are rewritten (one
+transaction per batch). Progress is checkpointed after every batch, so an
+interrupted run resumes where it stopped.
+
+Usage (from the backend directory):
+    python scripts/reparse_menus.py --dry-run            # show what would change
+    python scripts/reparse_menus.py                      # rewrite changed menus
+    python scripts/reparse_menus.py --restart            # ignore an existing checkpoint
+"""
+
+import argparse
+import difflib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal  # noqa: E402
+from bll.menu_bll import MenuBLL  # noqa: E402
+from services.menu_parser import parse_menu_texts  # noqa: E402
+
+
+def load_checkpoint(path: Path) -> dict:
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {"last_id": None, "processed": 0, "changed": 0}
+
+
+def save_checkpoint(path: Path, checkpoint: dict):
+    # Write to a temp file first so a crash never leaves a truncated checkpoint
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def render(restaurant_name: str, categories: list) -> list:
+    """Render a menu as text lines for diffing"""
+    lines = [f"restaurant: {restaurant_name}"]
+    for category in categories:
+        lines.append(("## " if category["is_main"] else "# ") + category["name"])
+        for item in category["items"]:
+            prices = ", ".join(
+                f"{price['amount_cents']}" + (f" {price['label']}" if price["label"] else "") for price in item["prices"]
+            )
+            lines.append(f"    {item['name']}  {item['price']}  [{prices}]")
+    return lines
+
+
+class Reparser:
+    """Compares re-parsed menus with the stored ones and writes (or reports) the changes"""
+
+    def __init__(self, args):
+        self.args = args
+        self.checkpoint_path = Path(args.checkpoint)
+        self.checkpoint = {"last_id": None, "processed": 0, "changed": 0}
+        if not args.dry_run and not args.restart:
+            self.checkpoint = load_checkpoint(self.checkpoint_path)
+        self.processed = 0
+        self.changed = 0
+        self.diffs_shown = 0
+        self.start = time.perf_counter()
+
+    def handle_batch(self, write_bll: MenuBLL, rows: list, parsed: list):
+        menu_ids = [menu_id for menu_id, _, _ in rows]
+        stored = write_bll.get_menu_contents(menu_ids)
+
+        changed = []
+        for (menu_id, restaurant_name, _), menu_data in zip(rows, parsed):
+            old = render(restaurant_name, stored[menu_id])
+            new = render(MenuBLL.restaurant_name_for(menu_data), MenuBLL.category_rows(menu_data))
+            if old == new:
+                continue
+            changed.append((menu_id, menu_data))
+            if self.args.dry_run and self.diffs_shown < self.args.show_diffs:
+                self.diffs_shown += 1
+                print("\n".join(difflib.unified_diff(
+                    old, new, fromfile=f"{menu_id} (stored)", tofile=f"{menu_id} (re-parsed)", lineterm=""
+                )))
+
+        if changed and not self.args.dry_run:
+            write_bll.replace_parsed_menus(changed)
+
+        self.processed += len(rows)
+        self.changed += len(changed)
+        if not self.args.dry_run:
+            self.checkpoint = {
+                "last_id": menu_ids[-1],
+                "processed": self.checkpoint["processed"] + len(rows),
+                "changed": self.checkpoint["changed"] + len(changed)
+            }
+            save_checkpoint(self.checkpoint_path, self.checkpoint)
+
+        elapsed = time.perf_counter() - self.start
+        print(f"{self.processed} menus, {self.changed} changed, {self.processed / elapsed:.1f} menus/sec")
+
+    def run(self):
+        after_id = self.checkpoint["last_id"]
+        if after_id:
+            print(f"Resuming after menu {after_id} ({self.checkpoint['processed']} menus done earlier)")
+
+        read_db = SessionLocal()
+        write_db = SessionLocal()
+        # Spawned workers do not inherit the parent's open database connections
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=self.args.workers, mp_context=context) as pool:
+                write_bll = MenuBLL(write_db)
+                pending = deque()
+                for rows in MenuBLL(read_db).iter_raw_texts(after_id, self.args.batch_size):
+                    texts = [raw_text or "" for _, _, raw_text in rows]
+                    pending.append((rows, pool.submit(parse_menu_texts, texts)))
+                    # Keep a bounded number of batches in flight so memory stays flat
+                    if len(pending) >= self.args.workers * 2:
+                        rows, future = pending.popleft()
+                        self.handle_batch(write_bll, rows, future.result())
+                while pending:
+                    rows, future = pending.popleft()
+                    self.handle_batch(write_bll, rows, future.result())
+        finally:
+            read_db.close()
+            write_db.close()
+
+        elapsed = time.perf_counter() - self.start
+        action = "would change" if self.args.dry_run else "changed"
+        print(f"\nDone: {self.processed} menus re-parsed, {self.changed} {action} "
+              f"in {elapsed:.1f}s ({self.processed / elapsed if elapsed else 0:.1f} menus/sec)")
+        if not self.args.dry_run and self.checkpoint_path.exists():
+            # A finished run starts from the beginning next time
+            self.checkpoint_path.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report changes as diffs without writing")
+    parser.add_argument("--show-diffs", type=int, default=20, help="Maximum number of diffs printed in a dry run")
+    parser.add_argument("--batch-size", type=int, default=500, help="Menus per batch / transaction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    parser.add_argument("--checkpoint", default="reparse_checkpoint.json", help="Checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    Reparser(args).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Remove uploaded images that no menu or pending scan job refers to.
+
+The API runs the same sweep in the background every UPLOAD_SWEEP_INTERVAL
+seconds; this runs it once, e.g. to reclaim space left behind before images
+were removed together with their menus. Files modified within --min-age
+seconds are kept, since an upload is written before its menu is saved.
+
+Usage (from the backend directory):
+    python scripts/sweep_uploads.py [--dry-run] [--min-age 3600] [--show 20]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.upload_service import UPLOAD_DIR, remove_orphaned_uploads  # noqa: E402
+from services.upload_sweeper import UPLOAD_SWEEP_MIN_AGE, referenced_image_paths  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only list the files that would be removed")
+    parser.add_argument("--min-age", type=int, default=UPLOAD_SWEEP_MIN_AGE, help="Minimum file age in seconds")
+    parser.add_argument("--show", type=int, default=20, help="Maximum number of files printed")
+    args = parser.parse_args()
+
+    referenced = referenced_image_paths()
+    removed, reclaimed = remove_orphaned_uploads(referenced, args.min_age, dry_run=args.dry_run)
+    for path in removed[:args.show]:
+        print(f"  {path}")
+    if len(removed) > args.show:
+        print(f"  ... and {len(removed) - args.show} more")
+
+    action = "Would remove" if args.dry_run else "Removed"
+    print(f"\n{action} {len(removed)} orphaned file(s) from {UPLOAD_DIR}/, "
+          f"{reclaimed / (1024 * 1024):.1f}MB ({len(referenced)} images in use)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,43 @@
-from .ocr_service import extract_text_openai, extract_text_tesseract
-from .image_service import preprocess_image
-from .menu_parser import parse_menu_text
+from .ocr_service import (
+    extract_text_openai, extract_text_tesseract, extract_text_tesseract_region, segment_for_ocr,
+    extract_text_tesseract_scored
+)
+from .image_service import preprocess_image, preprocess_array, preprocess_params, compute_perceptual_hash
+from .menu_parser import parse_menu_text, parse_menu_texts, parse_menu_lines, MenuTextParser
+from .executor import run_io, run_cpu, run_db, run_bll, shutdown_executors
+from .scan_pipeline import OCR_ENGINE, USE_OPENAI, scan_menu, stream_menu_text, stage_timer, perceptual_hash
+from .ocr_cache import ocr_cache
+from .menu_cache import menu_cache
+from .ocr_cascade import cascade_stats
+from .openai_client import close_client as close_openai_client
 
 __all__ = [
     "extract_text_openai",
     "extract_text_tesseract",
+    "extract_text_tesseract_region",
+    "segment_for_ocr",
+    "extract_text_tesseract_scored",
     "preprocess_image",
-    "parse_menu_text"
+    "preprocess_array",
+    "preprocess_params",
+    "compute_perceptual_hash",
+    "parse_menu_text",
+    "parse_menu_texts",
+    "parse_menu_lines",
+    "MenuTextParser",
+    "run_io",
+    "run_cpu",
+    "run_db",
+    "run_bll",
+    "shutdown_executors",
+    "OCR_ENGINE",
+    "USE_OPENAI",
+    "scan_menu",
+    "stream_menu_text",
+    "stage_timer",
+    "perceptual_hash",
+    "ocr_cache",
+    "menu_cache",
+    "cascade_stats",
+    "close_openai_client"
 ]
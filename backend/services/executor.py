@@ -0,0 +1,132 @@
+"""
+Execution layer for blocking work.
+Keeps OCR, OpenCV, file and database calls off the event loop by running them
+in bounded worker pools that async handlers can await.
+"""
+
+import asyncio
+import contextvars
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Optional
+
+# Pool sizes (configurable through environment variables)
+IO_POOL_SIZE = int(os.getenv("IO_POOL_SIZE", "8"))
+CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", str(os.cpu_count() or 1)))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+
+_io_pool: Optional[ThreadPoolExecutor] = None
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+_db_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Thread pool for blocking I/O such as file writes"""
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=IO_POOL_SIZE, thread_name_prefix="io")
+    return _io_pool
+
+
+def _init_cpu_worker():
+    """
+    Set up a CPU pool worker process. The pool already runs CPU_POOL_SIZE OCR
+    calls side by side (page regions, concurrent scans), so Tesseract's own
+    OpenMP threads would only oversubscribe the cores: every worker is made
+    single-threaded for its whole lifetime, unless OMP_THREAD_LIMIT is set
+    explicitly. This only changes the worker's environment, not the API process.
+    """
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def get_cpu_pool() -> ProcessPoolExecutor:
+    """Process pool for CPU-bound work such as OpenCV preprocessing and Tesseract"""
+    global _cpu_pool
+    if _cpu_pool is None:
+        _cpu_pool = ProcessPoolExecutor(max_workers=CPU_POOL_SIZE, initializer=_init_cpu_worker)
+    return _cpu_pool
+
+
+def get_db_pool() -> ThreadPoolExecutor:
+    """
+    Thread pool for blocking database sessions.
+    Kept separate from the I/O pool so reads are not queued behind slow file I/O.
+    """
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+    return _db_pool
+
+
+async def _run(pool: Executor, func: Callable, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    call = partial(func, *args, **kwargs)
+    if isinstance(pool, ThreadPoolExecutor):
+        # Run in a copy of the caller's context (as asyncio.to_thread does) so work done
+        # in the thread shows up in the request's Server-Timing header
+        call = partial(contextvars.copy_context().run, call)
+    return await loop.run_in_executor(pool, call)
+
+
+async def run_io(func: Callable, *args, **kwargs):
+    """Run a blocking I/O-bound function in the I/O thread pool"""
+    return await _run(get_io_pool(), func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable, *args, **kwargs):
+    """
+    Run a CPU-bound function in the process pool (func and args must be picklable).
+    If a worker died (crash, OOM kill, an exception that cannot be unpickled) the
+    pool is unusable from then on, so it is replaced for later calls. The call
+    itself is not retried: the input may be what killed the worker, so the
+    BrokenProcessPool is raised to the caller (a 500 response or a failed job).
+    """
+    global _cpu_pool
+    pool = get_cpu_pool()
+    try:
+        return await _run(pool, func, *args, **kwargs)
+    except BrokenProcessPool:
+        print("WARNING: CPU worker pool broke, starting a new one for later calls")
+        if _cpu_pool is pool:
+            _cpu_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+async def run_db(func: Callable, *args, **kwargs):
+    """Run a blocking database call in the database thread pool"""
+    return await _run(get_db_pool(), func, *args, **kwargs)
+
+
+async def run_bll(db, bll_class: type, method: str, *args, **kwargs):
+    """
+    Call a BLL method without blocking the event loop.
+    With a sync Session the call runs in the database thread pool. With an
+    AsyncSession (DB_ASYNC=true) the same sync BLL/DAL code runs through
+    AsyncSession.run_sync, which awaits the async driver for every query instead
+    of holding a thread, so both paths behave identically.
+
+    run_sync runs the Python code of the method on the event loop thread itself:
+    keep file I/O out of BLL methods (they return paths for the caller to handle
+    with run_io), and note that CPU-heavy BLL work (parsing, snapshots of very
+    large menus) still blocks the loop while it runs.
+
+    Args:
+        db: Session or AsyncSession
+        bll_class: BLL class (MenuBLL, SearchBLL, ...)
+        method: Name of the BLL method to call
+    """
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(lambda session: getattr(bll_class(session), method)(*args, **kwargs))
+    return await run_db(getattr(bll_class(db), method), *args, **kwargs)
+
+
+def shutdown_executors():
+    """Shut down all worker pools (called on application shutdown)"""
+    global _io_pool, _cpu_pool, _db_pool
+    for pool in (_io_pool, _cpu_pool, _db_pool):
+        if pool is not None:
+            pool.shutdown(wait=True)
+    _io_pool = _cpu_pool = _db_pool = None
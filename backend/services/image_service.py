@@ -1,21 +1,504 @@
+import io
+import os
+import threading
 import cv2
+from typing import List, Optional, Tuple, Union
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageOps
 
+try:
+    # Optional: lets PIL open HEIC/HEIF photos from iPhones
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
 
-def preprocess_image(image_path: str):
-    """Preprocess image for better OCR with Tesseract"""
-    img = cv2.imread(image_path)
+# Preprocessing profiles, from fastest to most thorough.
+# "accurate" is the original pipeline: fixed 2x upscale and full NL-means denoising.
+# "fast" and "balanced" scale the page so text lands at a height Tesseract reads well,
+# cap the working resolution and only denoise when the image is actually noisy.
+PREPROCESS_PROFILES = {
+    "fast": {
+        "target_text_height": 24,
+        "max_pixels": 4_000_000,
+        "noise_threshold": 8.0,
+        "denoise": "median"
+    },
+    "balanced": {
+        "target_text_height": 32,
+        "max_pixels": 8_000_000,
+        "noise_threshold": 4.0,
+        "denoise": "nlmeans"
+    },
+    "accurate": {
+        "scale": 2.0,
+        "denoise": "nlmeans_full"
+    }
+}
+
+PREPROCESS_QUALITY = os.getenv("PREPROCESS_QUALITY", "accurate")
+
+# Images sent to the OpenAI Vision API. With detail "high" the API fits the image
+# into 2048x2048 and then scales the shortest side down to 768px, so anything
+# larger only costs upload time. "original" sends the upload unchanged.
+OPENAI_IMAGE_FORMAT = os.getenv("OPENAI_IMAGE_FORMAT", "jpeg")
+OPENAI_IMAGE_QUALITY = int(os.getenv("OPENAI_IMAGE_QUALITY", "85"))
+OPENAI_IMAGE_MAX_SIDE = int(os.getenv("OPENAI_IMAGE_MAX_SIDE", "2048"))
+OPENAI_IMAGE_MIN_SIDE = int(os.getenv("OPENAI_IMAGE_MIN_SIDE", "768"))
+
+# Preview thumbnails generated when an image is stored (longest side in pixels, WebP quality)
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "320"))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "75"))
+
+# Per-thread scratch buffers for intermediate images, reused across calls of the same size
+_buffers = threading.local()
+
+
+def _scratch(name: str, shape: tuple) -> np.ndarray:
+    pool = getattr(_buffers, "pool", None)
+    if pool is None:
+        pool = _buffers.pool = {}
+    buffer = pool.get(name)
+    if buffer is None or buffer.shape != shape:
+        buffer = pool[name] = np.empty(shape, np.uint8)
+    return buffer
+
+
+def _resolve_quality(quality: Optional[str]) -> str:
+    quality = quality or PREPROCESS_QUALITY
+    if quality not in PREPROCESS_PROFILES:
+        raise ValueError(f"Unknown preprocessing quality: {quality}")
+    return quality
+
+
+def preprocess_params(quality: Optional[str] = None) -> str:
+    """
+    Describe the preprocessing used for a quality profile.
+    Part of the OCR cache key, so cached text is not reused after the preprocessing changes.
+    """
+    quality = _resolve_quality(quality)
+    profile = PREPROCESS_PROFILES[quality]
+    return f"v2:{quality}:" + ",".join(f"{key}={value}" for key, value in sorted(profile.items()))
+
+
+def estimate_text_height(gray: np.ndarray, percentile: float = 50) -> Optional[float]:
+    """
+    Estimate the typical character height (in pixels) of the text in a grayscale page.
+    Works on a downsampled copy: connected components of letter-like size are
+    measured and their median (or another percentile) height is scaled back up.
+
+    Returns:
+        Text height, or None if no text-like components were found
+    """
+    height, width = gray.shape
+    factor = min(1.0, 1000 / max(height, width))
+    small = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA) if factor < 1.0 else gray
+
+    _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    # Text is the minority class; flip for light text on a dark background
+    if cv2.countNonZero(binary) > binary.size / 2:
+        binary = cv2.bitwise_not(binary)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    if count <= 1:
+        return None
+
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    small_height = small.shape[0]
+    # Keep letter-sized blobs: not specks, not lines/boxes/photos
+    letters = (heights >= 4) & (heights <= small_height * 0.1) & (widths <= heights * 3)
+    if letters.sum() < 10:
+        return None
+
+    return float(np.percentile(heights[letters], percentile)) / factor
+
+
+def estimate_noise(gray: np.ndarray) -> float:
+    """
+    Fast estimate of the Gaussian noise standard deviation (Immerkaer's method).
+    """
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], np.float32)
+    response = cv2.filter2D(gray, cv2.CV_32F, kernel)
+    height, width = gray.shape
+    return float(np.abs(response[1:-1, 1:-1]).sum() * np.sqrt(np.pi / 2) / (6 * (width - 2) * (height - 2)))
+
+
+def read_image(image: Union[str, bytes], flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """
+    Decode an image with OpenCV.
+
+    Args:
+        image: Image file path, or encoded image bytes already in memory (decoded without a copy)
+        flags: cv2.imread flags, e.g. cv2.IMREAD_GRAYSCALE
+
+    Returns:
+        Decoded image array
+    """
+    if isinstance(image, str):
+        img = cv2.imread(image, flags)
+    else:
+        img = cv2.imdecode(np.frombuffer(memoryview(image), np.uint8), flags)
     if img is None:
-        raise Exception(f"Failed to read image: {image_path}")
+        raise Exception(f"Failed to read image: {image}" if isinstance(image, str) else "Failed to read image")
+    return img
+
+
+def preprocess_image(image: Union[str, bytes], quality: Optional[str] = None):
+    """
+    Preprocess image for better OCR with Tesseract.
+
+    Args:
+        image: Path to the image or encoded image bytes
+        quality: "fast", "balanced" or "accurate" (defaults to PREPROCESS_QUALITY)
+    """
+    return Image.fromarray(preprocess_array(image, quality))
+
+
+def preprocess_array(image: Union[str, bytes], quality: Optional[str] = None) -> np.ndarray:
+    """Same as preprocess_image, but returns the binarized page as a 2D uint8 NumPy array"""
+    quality = _resolve_quality(quality)
+    profile = PREPROCESS_PROFILES[quality]
+
+    if quality == "accurate":
+        img = read_image(image)
+
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+        thresh = cv2.adaptiveThreshold(
+            denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+        )
+        kernel = np.ones((1, 1), np.uint8)
+        processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+
+        return processed
+
+    # Decode straight to grayscale instead of decoding BGR and converting
+    gray = read_image(image, cv2.IMREAD_GRAYSCALE)
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-    denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-    thresh = cv2.adaptiveThreshold(
-        denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+    # Scale so text reaches the target height, then cap the working resolution
+    height, width = gray.shape
+    text_height = estimate_text_height(gray)
+    scale = profile["target_text_height"] / text_height if text_height else 1.0
+    scale = min(max(scale, 0.25), 2.0)
+    scale = min(scale, (profile["max_pixels"] / (height * width)) ** 0.5)
+
+    if abs(scale - 1.0) > 0.05:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+        gray = cv2.resize(gray, size, dst=_scratch("resized", (size[1], size[0])), interpolation=interpolation)
+
+    # Only denoise when there is noise worth removing
+    if estimate_noise(gray) > profile["noise_threshold"]:
+        denoised = _scratch("denoised", gray.shape)
+        if profile["denoise"] == "median":
+            cv2.medianBlur(gray, 3, dst=denoised)
+        else:
+            # Smaller search window than "accurate": roughly 4x faster
+            cv2.fastNlMeansDenoising(gray, denoised, 10, 7, 11)
+        gray = denoised
+
+    processed = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
     )
-    kernel = np.ones((1, 1), np.uint8)
-    processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+    return processed
+
+
+def compute_perceptual_hash(image: Union[str, bytes]) -> str:
+    """
+    Compute a 64-bit perceptual hash (pHash) of an image.
+    Similar images (re-photographed, resized, recompressed) get hashes with a
+    small Hamming distance.
+
+    Args:
+        image: Image file path or encoded image bytes
+
+    Returns:
+        16-character hex string
+    """
+    img = read_image(image, cv2.IMREAD_GRAYSCALE)
+    small = cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(small)[:8, :8]
+    # Compare against the median, ignoring the DC term which only reflects brightness
+    median = np.median(low_freq.flatten()[1:])
+    bits = (low_freq > median).flatten()
+    return np.packbits(bits).tobytes().hex()
+
+
+def openai_image_params(image_format: Optional[str] = None) -> str:
+    """Describe the OpenAI image encoding settings (used in OCR cache keys)"""
+    image_format = image_format or OPENAI_IMAGE_FORMAT
+    if image_format == "original":
+        return "original"
+    return f"{image_format}-q{OPENAI_IMAGE_QUALITY}-{OPENAI_IMAGE_MAX_SIDE}x{OPENAI_IMAGE_MIN_SIDE}"
+
+
+def prepare_openai_image(image: Union[str, bytes], image_format: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Shrink and re-encode an image for the OpenAI Vision API.
+    The image is rotated upright according to its EXIF orientation, transparency is
+    flattened onto white, it is downscaled to the resolution the model actually uses
+    and re-encoded without metadata.
+
+    Args:
+        image: Image file path or encoded image bytes
+        image_format: "jpeg", "webp" or "original" (defaults to OPENAI_IMAGE_FORMAT)
+
+    Returns:
+        Tuple of (encoded image bytes, MIME type)
+    """
+    image_format = image_format or OPENAI_IMAGE_FORMAT
+    if isinstance(image, str):
+        with open(image, "rb") as f:
+            image = f.read()
+
+    with Image.open(io.BytesIO(image)) as img:
+        if image_format == "original":
+            return bytes(image), Image.MIME.get(img.format, "application/octet-stream")
+
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "L"):
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+
+        width, height = img.size
+        scale = min(1.0, OPENAI_IMAGE_MAX_SIDE / max(width, height), OPENAI_IMAGE_MIN_SIDE / min(width, height))
+        if scale < 1.0:
+            img = img.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+        output = io.BytesIO()
+        if image_format == "webp":
+            img.save(output, "WEBP", quality=OPENAI_IMAGE_QUALITY, method=4)
+            return output.getvalue(), "image/webp"
+        img.save(output, "JPEG", quality=OPENAI_IMAGE_QUALITY, optimize=True)
+        return output.getvalue(), "image/jpeg"
+
+
+def make_thumbnail(image: Union[str, bytes], max_side: Optional[int] = None) -> Tuple[str, bytes]:
+    """
+    Create a small WebP preview of an image.
+    JPEGs are decoded at a reduced scale (draft mode), so a phone photo is not
+    fully decompressed just to be shrunk to a few hundred pixels.
+
+    Args:
+        image: Image file path or encoded image bytes
+        max_side: Longest side of the thumbnail in pixels (defaults to THUMBNAIL_SIZE)
+
+    Returns:
+        Tuple of (format of the source image as reported by PIL, e.g. "JPEG", WebP bytes)
+
+    Raises:
+        PIL.UnidentifiedImageError: If the data is not a supported image
+    """
+    max_side = max_side or THUMBNAIL_SIZE
+    if isinstance(image, str):
+        with open(image, "rb") as f:
+            image = f.read()
+
+    with Image.open(io.BytesIO(image)) as img:
+        source_format = img.format
+        img.draft("RGB", (max_side, max_side))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if img.mode in ("LA", "PA", "P") or "transparency" in img.info else "RGB")
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        output = io.BytesIO()
+        img.save(output, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+        return source_format, output.getvalue()
+
+
+def _gaps(profile: np.ndarray, min_gap: int) -> List[tuple]:
+    """Find interior runs of empty profile entries at least min_gap long"""
+    empty = profile == 0
+    gaps = []
+    start = None
+    for i, is_empty in enumerate(empty):
+        if is_empty and start is None:
+            start = i
+        elif not is_empty and start is not None:
+            if start > 0 and i - start >= min_gap:
+                gaps.append((start, i))
+            start = None
+    return gaps
+
+
+def _same_lines(left: np.ndarray, right: np.ndarray) -> bool:
+    """
+    True if the text lines of two side-by-side parts line up, like item names
+    and their price column. Compares the row occupancy profiles of both parts.
+    """
+    left_rows = np.count_nonzero(left, axis=1) > 0
+    right_rows = np.count_nonzero(right, axis=1) > 0
+    # Centre row of every text line on the right
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], right_rows.astype(np.int8), [0]))))
+    centres = (edges[0::2] + edges[1::2]) // 2
+    if centres.size == 0:
+        return True
+    return np.mean(left_rows[centres]) >= 0.8
+
+
+def _line_metrics(ink: np.ndarray, strips: int = 4) -> tuple:
+    """
+    Measure typical line height and leading (blank space between lines) from the
+    row profiles of a few vertical strips, so columns are measured separately.
+
+    Returns:
+        (line_height, leading) in pixels
+    """
+    width = ink.shape[1]
+    runs, gaps = [], []
+    for i in range(strips):
+        strip = ink[:, i * width // strips:(i + 1) * width // strips]
+        filled = (np.count_nonzero(strip, axis=1) > 0).astype(np.int8)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], filled, [0]))))
+        runs.extend(edges[1::2] - edges[0::2])
+        gaps.extend(edges[2::2] - edges[1:-1:2])
+    line_height = float(np.median(runs)) if runs else 20.0
+    leading = float(np.median(gaps)) if gaps else line_height * 0.5
+    return line_height, leading
+
+
+def _cut(ink: np.ndarray, box: tuple, line_height: float, block_gap: int, depth: int = 0) -> List[tuple]:
+    """
+    Recursive XY-cut: split the box at vertical gutters (columns) first,
+    then at blank horizontal bands (blocks), and recurse into each part.
+    """
+    x, y, width, height = box
+    region = ink[y:y + height, x:x + width]
+    cols = np.count_nonzero(region, axis=0)
+    rows = np.count_nonzero(region, axis=1)
+
+    # Trim surrounding whitespace
+    filled_cols = np.flatnonzero(cols)
+    filled_rows = np.flatnonzero(rows)
+    if filled_cols.size == 0 or filled_rows.size == 0:
+        return []
+    x0, x1 = int(filled_cols[0]), int(filled_cols[-1]) + 1
+    y0, y1 = int(filled_rows[0]), int(filled_rows[-1]) + 1
+    x, y, width, height = x + x0, y + y0, x1 - x0, y1 - y0
+    region = ink[y:y + height, x:x + width]
+    cols, rows = cols[x0:x1], rows[y0:y1]
+
+    if height < line_height * 0.5 or depth > 16:
+        return [(x, y, width, height)]
+
+    # Columns: gutters of at least 1.5 line heights. A part whose lines line up with
+    # its neighbour's (e.g. a price column next to item names) or that is too
+    # narrow to be a column stays attached, so an item and its price are OCRed together.
+    gaps = _gaps(cols, int(line_height * 1.5))
+    if gaps:
+        edges = [0] + [edge for gap in gaps for edge in gap] + [width]
+        merged = [[edges[0], edges[1]]]
+        for i in range(2, len(edges), 2):
+            start, end = edges[i], edges[i + 1]
+            previous = merged[-1]
+            if (end - start < line_height * 4 or previous[1] - previous[0] < line_height * 4
+                    or _same_lines(region[:, previous[0]:previous[1]], region[:, start:end])):
+                previous[1] = end
+            else:
+                merged.append([start, end])
+        if len(merged) > 1:
+            return [
+                region_box
+                for start, end in merged
+                for region_box in _cut(ink, (x + start, y, end - start, height), line_height, block_gap, depth + 1)
+            ]
+
+    # Blocks: blank bands clearly wider than the normal space between lines
+    gaps = _gaps(rows, block_gap)
+    if gaps:
+        edges = [0] + [edge for gap in gaps for edge in gap] + [height]
+        return [
+            region_box
+            for i in range(0, len(edges), 2)
+            for region_box in _cut(ink, (x, y + edges[i], width, edges[i + 1] - edges[i]), line_height, block_gap, depth + 1)
+        ]
+
+    return [(x, y, width, height)]
+
+
+def _group_columns(boxes: List[tuple], max_gap: int) -> List[tuple]:
+    """
+    Merge vertically stacked blocks of the same column into one region,
+    so each region is a column section rather than a single line.
+    """
+    groups = []
+    for box in sorted(boxes, key=lambda b: (b[1], b[0])):
+        x, y, w, h = box
+        for i, (gx, gy, gw, gh) in enumerate(groups):
+            overlap = min(x + w, gx + gw) - max(x, gx)
+            if overlap >= 0.7 * max(w, gw) and 0 <= y - (gy + gh) <= max_gap:
+                nx, ny = min(x, gx), gy
+                groups[i] = (nx, ny, max(x + w, gx + gw) - nx, y + h - ny)
+                break
+        else:
+            groups.append(box)
+    return groups
+
+
+def _split_boxes(boxes: List[tuple], axis: int) -> List[List[tuple]]:
+    """Group boxes that do not overlap along axis (0 = x, 1 = y)"""
+    ordered = sorted(boxes, key=lambda box: box[axis])
+    groups = [[ordered[0]]]
+    group_end = ordered[0][axis] + ordered[0][axis + 2]
+    for box in ordered[1:]:
+        if box[axis] >= group_end:
+            groups.append([box])
+        else:
+            groups[-1].append(box)
+        group_end = max(group_end, box[axis] + box[axis + 2])
+    return groups
+
+
+def _reading_order(boxes: List[tuple]) -> List[tuple]:
+    """Order regions like a reader would: columns left to right, top to bottom within each"""
+    if len(boxes) <= 1:
+        return boxes
+    for axis in (0, 1):
+        groups = _split_boxes(boxes, axis)
+        if len(groups) > 1:
+            return [box for group in groups for box in _reading_order(group)]
+    return sorted(boxes, key=lambda box: (box[1], box[0]))
+
+
+def segment_regions(page: np.ndarray) -> List[tuple]:
+    """
+    Split a preprocessed page (dark text on white) into column/block regions.
+    Specks and long ruling lines are removed with connected components and
+    morphological opening, the page is cut recursively along empty columns and
+    rows of the ink mask, and the resulting blocks are grouped into column sections.
+
+    Args:
+        page: Binarized page as a 2D uint8 array
+
+    Returns:
+        List of (x, y, w, h) boxes in reading order
+    """
+    height, width = page.shape
+    # Tall letters give the scale for specks and ruling lines
+    text_height = estimate_text_height(page, percentile=90) or 20
+    ink = cv2.threshold(page, 127, 255, cv2.THRESH_BINARY_INV)[1]
+
+    # Drop specks, which would otherwise bridge gutters
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    specks = stats[:, cv2.CC_STAT_AREA] < max(4, (text_height * 0.15) ** 2)
+    specks[0] = False
+    ink[specks[labels]] = 0
+
+    # Drop horizontal/vertical rules and frames
+    rule_length = max(10, int(text_height * 8))
+    for kernel_size in ((rule_length, 1), (1, rule_length)):
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, kernel_size)
+        ink = cv2.subtract(ink, cv2.morphologyEx(ink, cv2.MORPH_OPEN, kernel))
+
+    line_height, leading = _line_metrics(ink)
+    block_gap = max(2, int(max(1.25 * leading, 0.5 * line_height)))
+    boxes = _cut(ink, (0, 0, width, height), line_height, block_gap)
+    # Ignore leftovers that cannot contain a character
+    boxes = [box for box in boxes if box[2] >= line_height * 0.5 and box[3] >= line_height * 0.5]
+    if not boxes:
+        return [(0, 0, width, height)]
 
-    return Image.fromarray(processed)
+    return _reading_order(_group_columns(boxes, block_gap * 2))
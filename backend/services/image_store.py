@@ -0,0 +1,233 @@
+"""
+Content-addressed image storage.
+Every image is stored once under its SHA-256, in directories sharded by the
+first hex digits of the hash (originals/ab/cd/abcd....jpg), next to a WebP
+thumbnail generated when it is stored. Menus with the same image share the
+file, and since a stored file never changes it can be served with a strong
+ETag and cached by clients forever.
+
+ImageStore is the interface the API uses; LocalImageStore keeps the files on
+local disk. An object store backend only has to implement the same methods.
+"""
+
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+IMAGE_STORE_DIR = Path(os.getenv("IMAGE_STORE_DIR", os.path.join(os.getenv("UPLOAD_DIR", "uploads"), "images")))
+
+# PIL format -> (file extension, media type) of stored originals
+IMAGE_FORMATS = {
+    "JPEG": (".jpg", "image/jpeg"),
+    "MPO": (".jpg", "image/jpeg"),
+    "PNG": (".png", "image/png"),
+    "WEBP": (".webp", "image/webp"),
+    "GIF": (".gif", "image/gif"),
+    "BMP": (".bmp", "image/bmp"),
+    "TIFF": (".tif", "image/tiff"),
+    "HEIF": (".heic", "image/heic"),
+    "AVIF": (".avif", "image/avif")
+}
+MEDIA_TYPES = {extension: media_type for extension, media_type in IMAGE_FORMATS.values()}
+
+
+class StoredImage(NamedTuple):
+    """A stored original or thumbnail"""
+    content_hash: str
+    path: Path
+    media_type: str
+    stat: os.stat_result
+
+
+class ImageStore(ABC):
+    """Interface of an image storage backend. Images are addressed by the SHA-256 hex digest of the original."""
+
+    @abstractmethod
+    def staging_path(self) -> Path:
+        """Return a new local path an upload can be written to before it is stored"""
+
+    @abstractmethod
+    def put_file(self, content_hash: str, source: Path, extension: str) -> str:
+        """Move a staged file into the store and return its location (kept as the menu's image_path)"""
+
+    @abstractmethod
+    def put_thumbnail(self, content_hash: str, data: bytes, size: int):
+        """Store the thumbnail of an image"""
+
+    @abstractmethod
+    def get(self, content_hash: str) -> Optional[StoredImage]:
+        """Look up an original image"""
+
+    @abstractmethod
+    def get_thumbnail(self, content_hash: str, size: int) -> Optional[StoredImage]:
+        """Look up the thumbnail of an image"""
+
+    @abstractmethod
+    def hash_for_location(self, location: str) -> Optional[str]:
+        """Return the content hash of a location returned by put_file, or None for paths outside the store"""
+
+    @abstractmethod
+    def delete(self, content_hash: str, min_age_seconds: float = 0) -> int:
+        """Remove an image and its thumbnails unless it was stored recently, returning the bytes reclaimed"""
+
+    @abstractmethod
+    def remove_orphans(self, referenced: Set[str], min_age_seconds: float,
+                       dry_run: bool = False) -> Tuple[List[Path], int]:
+        """Remove images whose hash is not referenced and abandoned staging files"""
+
+
+class LocalImageStore(ImageStore):
+    """Image store on the local file system"""
+
+    def __init__(self, root: Path = IMAGE_STORE_DIR):
+        """
+        Args:
+            root: Directory of the store (originals/, thumbnails/ and staging/ are created inside)
+        """
+        self.root = Path(root)
+        self.originals = self.root / "originals"
+        self.thumbnails = self.root / "thumbnails"
+        self.staging = self.root / "staging"
+        self._originals_dirs = {self.originals, self.originals.resolve()}
+
+    @staticmethod
+    def _shard(base: Path, content_hash: str) -> Path:
+        return base / content_hash[:2] / content_hash[2:4]
+
+    def staging_path(self) -> Path:
+        self.staging.mkdir(parents=True, exist_ok=True)
+        return self.staging / uuid.uuid4().hex
+
+    def put_file(self, content_hash: str, source: Path, extension: str) -> str:
+        """
+        Move a staged file into the store. If the image is already stored the
+        staged copy is dropped and the stored file's modification time is
+        refreshed, so the orphan sweep does not remove it before it is referenced.
+
+        Args:
+            content_hash: SHA-256 hex digest of the file
+            source: Staged file (on the same file system as the store)
+            extension: File extension of the image format (e.g. ".jpg")
+
+        Returns:
+            Location of the stored image
+        """
+        existing = self.get(content_hash)
+        if existing:
+            Path(source).unlink(missing_ok=True)
+            os.utime(existing.path)
+            return str(existing.path)
+        target = self._shard(self.originals, content_hash) / f"{content_hash}{extension}"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+        return str(target)
+
+    def put_thumbnail(self, content_hash: str, data: bytes, size: int):
+        target = self._shard(self.thumbnails, content_hash) / f"{content_hash}_{size}.webp"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write under a temporary name so a concurrent reader never sees a partial file
+        partial = target.with_name(f"{target.name}.{uuid.uuid4().hex}")
+        partial.write_bytes(data)
+        os.replace(partial, target)
+
+    def get(self, content_hash: str) -> Optional[StoredImage]:
+        content_hash = content_hash.lower()
+        for path in self._shard(self.originals, content_hash).glob(f"{content_hash}.*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            return StoredImage(content_hash, path, MEDIA_TYPES.get(path.suffix, "application/octet-stream"), stat)
+        return None
+
+    def get_thumbnail(self, content_hash: str, size: int) -> Optional[StoredImage]:
+        content_hash = content_hash.lower()
+        path = self._shard(self.thumbnails, content_hash) / f"{content_hash}_{size}.webp"
+        try:
+            return StoredImage(content_hash, path, "image/webp", path.stat())
+        except FileNotFoundError:
+            return None
+
+    def hash_for_location(self, location: str) -> Optional[str]:
+        if not location:
+            return None
+        path = Path(location)
+        # Locations are stored as put_file returned them, so a lexical comparison is enough
+        if path.parent.parent.parent not in self._originals_dirs:
+            return None
+        return path.stem
+
+    def delete(self, content_hash: str, min_age_seconds: float = 0) -> int:
+        """
+        Remove an original and all its thumbnails. put_file refreshes the
+        original's modification time when an upload reuses it, so a recent
+        original may belong to an upload whose menu is not saved yet and is kept.
+
+        Args:
+            content_hash: SHA-256 hex digest of the image
+            min_age_seconds: Keep the image if the original was modified more recently than this
+
+        Returns:
+            Bytes reclaimed (0 if nothing was stored or the image was kept)
+        """
+        existing = self.get(content_hash)
+        if existing and existing.stat.st_mtime > time.time() - min_age_seconds:
+            return 0
+        reclaimed = 0
+        for path in self._files(content_hash):
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            reclaimed += size
+        return reclaimed
+
+    def _files(self, content_hash: str) -> List[Path]:
+        return [
+            *self._shard(self.originals, content_hash).glob(f"{content_hash}.*"),
+            *self._shard(self.thumbnails, content_hash).glob(f"{content_hash}_*.webp")
+        ]
+
+    def remove_orphans(self, referenced: Set[str], min_age_seconds: float,
+                       dry_run: bool = False) -> Tuple[List[Path], int]:
+        """
+        Remove originals and thumbnails of images no location in `referenced`
+        points to, and staging files left behind by interrupted uploads.
+
+        Args:
+            referenced: Image locations still in use
+            min_age_seconds: Only remove files not modified for at least this long
+            dry_run: Only report what would be removed
+
+        Returns:
+            Tuple of (removed files, bytes reclaimed)
+        """
+        keep = {self.hash_for_location(location) for location in referenced}
+        cutoff = time.time() - min_age_seconds
+        removed, reclaimed = [], 0
+        # Thumbnails are removed together with their original; a thumbnail
+        # without an original is removed on its own
+        candidates = [(path, path.stem.split(".")[0]) for path in self.originals.glob("*/*/*")]
+        candidates += [(path, path.stem.rsplit("_", 1)[0]) for path in self.thumbnails.glob("*/*/*")]
+        candidates += [(path, None) for path in self.staging.glob("*")]
+        for path, content_hash in candidates:
+            if content_hash in keep:
+                continue
+            try:
+                stat = path.stat()
+                if stat.st_mtime > cutoff:
+                    continue
+                if not dry_run:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+            removed.append(path)
+            reclaimed += stat.st_size
+        return removed, reclaimed
+
+
+image_store: ImageStore = LocalImageStore()
@@ -0,0 +1,158 @@
+"""
+Local scan job queue.
+Jobs are stored in the database, so no external broker is needed and queued or
+interrupted jobs survive a restart. Worker tasks claim jobs and run the normal
+scan pipeline (OCR -> parse_menu_text -> MenuBLL.save_menu).
+"""
+
+import asyncio
+import os
+import time
+import traceback
+from typing import List, Optional, Set
+
+from database import SessionLocal
+from bll.job_bll import JobBLL
+from bll.menu_bll import MenuBLL
+from .executor import run_db
+from .scan_pipeline import scan_menu, stage_timer, perceptual_hash
+
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "2"))
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "100"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", str(JOB_LEASE_SECONDS / 4)))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+
+def _job_call(method: str, *args, **kwargs):
+    """Call a JobBLL method with its own short-lived session"""
+    db = SessionLocal()
+    try:
+        return getattr(JobBLL(db), method)(*args, **kwargs)
+    finally:
+        db.close()
+
+
+def save_scanned_menu(**kwargs) -> dict:
+    """Save a scanned menu with its own short-lived session (for callers without a request session)"""
+    db = SessionLocal()
+    try:
+        return MenuBLL(db).save_menu(**kwargs)
+    finally:
+        db.close()
+
+
+class ScanJobQueue:
+    """Pool of asyncio worker tasks that process queued scan jobs"""
+
+    def __init__(self, workers: int = SCAN_WORKERS, poll_interval: float = JOB_POLL_INTERVAL):
+        """
+        Args:
+            workers: Number of jobs processed concurrently
+            poll_interval: Seconds between queue checks when idle
+        """
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: Set[str] = set()
+        self._last_recovery = 0.0
+
+    async def start(self):
+        """Recover interrupted jobs and start the worker and heartbeat tasks"""
+        await self._recover_stale_jobs()
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        """Stop the worker and heartbeat tasks and put the running jobs back in the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._running:
+            requeued = await run_db(_job_call, "requeue_jobs", list(self._running))
+            self._running.clear()
+            if requeued:
+                print(f"Requeued {requeued} unfinished scan job(s)")
+
+    def notify(self):
+        """Wake idle workers after a job has been enqueued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _recover_stale_jobs(self):
+        """Requeue jobs whose lease expired because their worker (in any process) stopped"""
+        self._last_recovery = time.monotonic()
+        requeued = await run_db(_job_call, "recover_stale_jobs", JOB_LEASE_SECONDS)
+        if requeued:
+            print(f"Requeued {requeued} interrupted scan job(s)")
+
+    async def _heartbeat(self):
+        """Renew the lease of the running jobs while they are processed"""
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+            if not self._running:
+                continue
+            try:
+                await run_db(_job_call, "renew_leases", list(self._running))
+            except Exception as e:
+                print(f"ERROR: Failed to renew scan job leases: {str(e)}")
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await run_db(_job_call, "claim_next_job", JOB_MAX_ATTEMPTS)
+            except Exception as e:
+                print(f"ERROR: Failed to claim scan job: {str(e)}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                # Idle workers also pick up jobs abandoned by a crashed process while this one runs
+                if time.monotonic() - self._last_recovery >= JOB_HEARTBEAT_INTERVAL:
+                    try:
+                        await self._recover_stale_jobs()
+                    except Exception as e:
+                        print(f"ERROR: Failed to recover stale scan jobs: {str(e)}")
+                continue
+
+            # A cancelled job stays in _running, so stop() can requeue it
+            self._running.add(job["job_id"])
+            await self._process(job)
+            self._running.discard(job["job_id"])
+
+    async def _process(self, job: dict):
+        timings = {}
+        try:
+            with stage_timer(timings, "phash"):
+                image_phash = await perceptual_hash(job["image_path"])
+
+            raw_text, parsed_data = await scan_menu(job["image_path"], timings, job["content_hash"])
+
+            with stage_timer(timings, "save"):
+                await run_db(
+                    save_scanned_menu,
+                    menu_data=parsed_data,
+                    menu_id=job["menu_id"],
+                    image_path=job["image_path"],
+                    raw_text=raw_text,
+                    original_filename=job["original_filename"],
+                    content_hash=job["content_hash"],
+                    perceptual_hash=image_phash
+                )
+
+            await run_db(_job_call, "complete_job", job["job_id"], timings)
+        except Exception as e:
+            print(f"ERROR: Scan job {job['job_id']} failed: {str(e)}")
+            print(traceback.format_exc())
+            await run_db(_job_call, "fail_job", job["job_id"], timings, str(e))
@@ -0,0 +1,120 @@
+"""
+In-process LRU/TTL cache of serialized menu responses.
+GET /api/menus/{id} serves the cached JSON bytes (and their compressed
+variants) directly, skipping the database and serialization. Entries are
+invalidated when a menu is deleted or re-parsed, and expire after
+MENU_CACHE_TTL seconds so changes made by other processes (e.g.
+scripts/reparse_menus.py) show up eventually.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+MENU_CACHE_SIZE = int(os.getenv("MENU_CACHE_SIZE", "512"))
+MENU_CACHE_TTL = float(os.getenv("MENU_CACHE_TTL", "300"))
+
+
+class MenuResponseCache:
+    """Thread-safe LRU cache with a TTL, hit/miss counters and load latency"""
+
+    def __init__(self, max_entries: int = MENU_CACHE_SIZE, ttl: float = MENU_CACHE_TTL):
+        """
+        Args:
+            max_entries: Maximum number of cached menus
+            ttl: Seconds an entry stays valid (0 disables expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.max_load_seconds = 0.0
+        self._generation = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidation; pass it to put() to drop loads that raced one"""
+        return self._generation
+
+    def get(self, menu_id: str) -> Optional[Any]:
+        """Return the cached response or None, marking the entry as recently used"""
+        with self._lock:
+            entry = self._entries.get(menu_id)
+            if entry is not None and self.ttl > 0 and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[menu_id]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(menu_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, menu_id: str, body: Any, load_seconds: float = None, generation: int = None):
+        """
+        Store a response, evicting the least recently used entries over the cap.
+
+        Args:
+            menu_id: Menu ID
+            body: Serialized response (an EncodedBody)
+            load_seconds: How long loading it from the database took (for stats)
+            generation: Value of `generation` before the load started; if a menu was
+                invalidated in the meantime the body may be stale and is not stored
+        """
+        with self._lock:
+            if load_seconds is not None:
+                self.loads += 1
+                self.load_seconds += load_seconds
+                self.max_load_seconds = max(self.max_load_seconds, load_seconds)
+            if self.max_entries <= 0 or (generation is not None and generation != self._generation):
+                return
+            self._entries[menu_id] = (time.monotonic(), body)
+            self._entries.move_to_end(menu_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *menu_ids: str):
+        """Drop cached responses for menus that were changed or deleted"""
+        with self._lock:
+            self._generation += 1
+            for menu_id in menu_ids:
+                self._entries.pop(menu_id, None)
+
+    def clear(self):
+        """Remove all entries and reset counters"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = self.loads = 0
+            self.load_seconds = self.max_load_seconds = 0.0
+
+    def stats(self) -> dict:
+        """Return cache size, hit/miss counters and database load latency"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "loads": self.loads,
+                "avg_load_ms": round(self.load_seconds / self.loads * 1000, 2) if self.loads else 0.0,
+                "max_load_ms": round(self.max_load_seconds * 1000, 2)
+            }
+
+
+menu_cache = MenuResponseCache()
@@ -1,89 +1,251 @@
+import os
 import re
-from models.menu import MenuData, MenuCategory, MenuItem
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+from models.menu import MenuData, MenuItemPrice
+
+# Pattern to find prices: either after dash or standalone with $
+# Supports both 1 and 2 decimal places (e.g., $4.7 or $4.70)
+DASH_PRICE_PATTERN = re.compile(r'[\-\–\—]\s*\$?\s*(\d+)\.(\d{1,2})')
+STANDALONE_PRICE_PATTERN = re.compile(r'\$\s*(\d+)\.(\d{1,2})')
+# A price with the text since the previous price (its size label, e.g. " / Large "), so
+# findall returns everything about an item's prices in one call
+LABELLED_PRICE_PATTERN = re.compile(r'(.*?)\$\s*(\d+)\.(\d{1,2})')
+DIGIT_PATTERN = re.compile(r'\d')
+DASHES = '-–—'
+# Characters separating prices from each other and from their size labels
+PRICE_SEPARATORS = ' \t/|,;:()·' + DASHES
+MAX_SIZE_LABEL_LENGTH = 20
+# Distinct matched prices whose MenuItemPrice models are kept for reuse
+PRICE_CACHE_SIZE = int(os.getenv("PRICE_CACHE_SIZE", "4096"))
+
+
+def price_cents(dollars: str, cents: str) -> int:
+    """Convert the digits captured by a price pattern to integer cents ("4", "7" -> 470)"""
+    return int(dollars) * 100 + int(cents.ljust(2, '0'))
+
+
+def parse_price_amounts(price: str) -> List[int]:
+    """
+    Get the amounts of a formatted price string.
+
+    Args:
+        price: Display price, e.g. "$4.70 / $5.20"
+
+    Returns:
+        Amounts in cents, e.g. [470, 520]
+    """
+    return [price_cents(dollars, cents) for dollars, cents in STANDALONE_PRICE_PATTERN.findall(price)]
+
+
+@lru_cache(maxsize=PRICE_CACHE_SIZE)
+def price_variant(raw: Tuple[str, str, str]) -> MenuItemPrice:
+    """
+    Build the MenuItemPrice of a price matched by LABELLED_PRICE_PATTERN.
+    The text before it is its size label ("Small $4.70 / Large $5.20"); the first
+    price's label cannot be told apart from the item name, so its text is empty.
+    Menus repeat the same few prices, so the (frozen) models are cached and shared.
+
+    Args:
+        raw: (text since the previous price, dollars, cents)
+    """
+    text, dollars, cents = raw
+    label = text.strip(PRICE_SEPARATORS) or None
+    if label and (len(label) > MAX_SIZE_LABEL_LENGTH or DIGIT_PATTERN.search(label)):
+        label = None
+    return MenuItemPrice(amount_cents=price_cents(dollars, cents), label=label)
+
+
+class _Category:
+    """Lightweight category record, converted to a MenuCategory only in finish()"""
+    __slots__ = ("name", "is_main", "items")
+
+    def __init__(self, name: str, is_main: bool, items: list):
+        self.name = name
+        self.is_main = is_main
+        self.items = items
+
+
+class MenuTextParser:
+    """
+    Incremental, single-pass menu text parser.
+    Text can be fed in arbitrary chunks (e.g. streamed model tokens) or line by line;
+    every completed line is parsed immediately and reported as events, and finish()
+    returns the same MenuData that parse_menu_text produces for the whole text.
+    Items are kept as (name, price, matched prices) tuples until finish() builds the Pydantic models.
+    """
+
+    def __init__(self):
+        self.restaurant_name: Optional[str] = None
+        self.categories: List[_Category] = []
+        self.current_category: Optional[str] = None
+        self.current_is_main = True
+        self.items: List[tuple] = []
+        self._line_index = 0
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[dict]:
+        """
+        Add a chunk of text and parse every line it completes.
+
+        Args:
+            chunk: Next piece of the text
+
+        Returns:
+            Events for the completed lines (see feed_line)
+        """
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        events = []
+        for line in lines:
+            events.extend(self.feed_line(line))
+        return events
+
+    def feed_line(self, line: str) -> List[dict]:
+        """
+        Parse one complete line.
+
+        Returns:
+            Events: {"type": "restaurant", "name"}, {"type": "category", "name", "is_main"}
+            when a category starts, and {"type": "item", "category", "name", "price", "description", "prices"}
+        """
+        kind, value = self._parse_line(line)
+        if kind is None:
+            return []
+        if kind == "item":
+            name, price, prices = value
+            return [{
+                "type": "item", "category": self.current_category, "name": name, "price": price, "description": "",
+                "prices": [price_variant(raw).model_dump() for raw in prices]
+            }]
+        if kind == "category":
+            return [{"type": "category", "name": self.current_category, "is_main": self.current_is_main}]
+        return [{"type": "restaurant", "name": value}]
+
+    def feed_lines(self, lines: Iterable[str]):
+        """Parse every line of an iterable (a list, a file, a generator...) without building events"""
+        parse_line = self._parse_line
+        for line in lines:
+            parse_line(line)
+
+    def _parse_line(self, line: str) -> tuple:
+        """Parse one line, update the parser state and return (kind, value) or (None, None)"""
+        line = line.strip()
+        if not line:
+            return None, None
+        i = self._line_index
+        self._line_index += 1
 
-
-def parse_menu_text(text: str) -> MenuData:
-    """Parse extracted text into structured menu data"""
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-
-    restaurant_name = None
-    categories = []
-    current_category = None
-    current_is_main = True
-    items = []
-
-    # Pattern to find prices: either after dash or standalone with $
-    # Supports both 1 and 2 decimal places (e.g., $4.7 or $4.70)
-    dash_price_pattern = r'[\-\–\—]\s*\$?\s*(\d+)\.(\d{1,2})'
-    standalone_price_pattern = r'\$\s*(\d+)\.(\d{1,2})'
-
-    for i, line in enumerate(lines):
         if len(line) < 2:
-            continue
+            return None, None
 
-        if i == 0 and not re.search(r'\d', line) and not line.startswith('#'):
-            restaurant_name = line
-            continue
+        first = line[0]
+        if i == 0 and first != '#' and not DIGIT_PATTERN.search(line):
+            self.restaurant_name = line
+            return "restaurant", line
 
         # Check for category markers: ##, ###, or #
-        if line.startswith('#'):
+        if first == '#':
             # Count the number of # symbols
-            hash_count = len(line) - len(line.lstrip('#'))
-            new_is_main = (hash_count == 2)
+            name = line.lstrip('#')
+            new_is_main = (len(line) - len(name) == 2)
 
             # Save previous category if it has items OR if it's a main category (acts as section header)
-            if current_category and (items or current_is_main):
-                categories.append(MenuCategory(
-                    name=current_category,
-                    items=items if items else [],
-                    is_main=current_is_main
-                ))
-                items = []
+            if self.current_category and (self.items or self.current_is_main):
+                self.categories.append(_Category(self.current_category, self.current_is_main, self.items))
+                self.items = []
 
             # Extract category name
-            current_category = line.lstrip('#').strip()
-            current_is_main = new_is_main
-            continue
-
-        if line.isupper() and len(line) > 3 and not re.search(dash_price_pattern, line):
-            if items and current_category:
-                categories.append(MenuCategory(
-                    name=current_category,
-                    items=items,
-                    is_main=current_is_main
-                ))
-                items = []
-            current_category = line.title()
-            current_is_main = True
-            continue
+            self.current_category = name.strip()
+            self.current_is_main = new_is_main
+            return "category", None
+
+        if line.isupper() and len(line) > 3 and not DASH_PRICE_PATTERN.search(line):
+            if self.items and self.current_category:
+                self.categories.append(_Category(self.current_category, self.current_is_main, self.items))
+                self.items = []
+            self.current_category = line.title()
+            self.current_is_main = True
+            return "category", None
 
         # Find all prices (both dash-prefixed and standalone)
-        price_matches = list(re.finditer(standalone_price_pattern, line))
-
-        if price_matches:
-            # Format prices with 2 decimal places (pad with 0 if needed)
-            prices = [f"${m.group(1)}.{m.group(2).ljust(2, '0')}" for m in price_matches]
-            price = " / ".join(prices)
-
-            first_price_pos = price_matches[0].start()
-            item_name = line[:first_price_pos].strip()
-            item_name = re.sub(r'[\-\–\—]+$', '', item_name).strip()
-
-            if item_name and len(item_name) > 1:
-                items.append(MenuItem(
-                    name=item_name,
-                    price=price,
-                    description=""
-                ))
-
-    if items and current_category:
-        categories.append(MenuCategory(
-            name=current_category,
-            items=items,
-            is_main=current_is_main
-        ))
-
-    return MenuData(
-        restaurant_name=restaurant_name,
-        categories=categories
-    )
+        first_price = STANDALONE_PRICE_PATTERN.search(line) if '$' in line else None
+        if first_price is None:
+            return None, None
+
+        price_start = first_price.start()
+        item_name = line[:price_start].strip().rstrip(DASHES).strip()
+        if len(item_name) <= 1:
+            return None, None
+
+        # Format prices with 2 decimal places (pad with 0 if needed). The matched (label text,
+        # dollars, cents) are kept as they are and turned into MenuItemPrice models in finish()
+        prices = LABELLED_PRICE_PATTERN.findall(line, price_start)
+        price = " / ".join([f"${dollars}.{cents.ljust(2, '0')}" for _, dollars, cents in prices])
+        item = (item_name, price, prices)
+        self.items.append(item)
+        return "item", item
+
+    def flush(self) -> List[dict]:
+        """Parse the trailing partial line (text after the last newline) and return its events"""
+        line, self._buffer = self._buffer, ""
+        return self.feed_line(line) if line else []
+
+    def finish(self) -> MenuData:
+        """
+        Parse any trailing partial line and return the complete menu.
+        Events are provisional: a category that ends up without items may be
+        dropped here, so the returned MenuData is authoritative.
+        """
+        self.flush()
+
+        if self.items and self.current_category:
+            self.categories.append(_Category(self.current_category, self.current_is_main, self.items))
+            self.items = []
+
+        # One validation call for the whole menu is much cheaper than building each model in Python;
+        # the shared price models are accepted as they are, without copying
+        return MenuData.model_validate({
+            "restaurant_name": self.restaurant_name,
+            "categories": [
+                {
+                    "name": category.name,
+                    "items": [
+                        {
+                            "name": name,
+                            "price": price,
+                            "description": "",
+                            "prices": [price_variant(raw) for raw in prices]
+                        }
+                        for name, price, prices in category.items
+                    ],
+                    "is_main": category.is_main
+                }
+                for category in self.categories
+            ]
+        })
+
+
+def parse_menu_lines(lines: Iterable[str]) -> MenuData:
+    """Parse menu text given as any iterable of lines (e.g. a file object or a generator)"""
+    parser = MenuTextParser()
+    parser.feed_lines(lines)
+    return parser.finish()
+
+
+def parse_menu_text(text: str) -> MenuData:
+    """Parse extracted text into structured menu data"""
+    return parse_menu_lines(text.split('\n'))
+
+
+def parse_menu_texts(texts: Iterable[str]) -> List[MenuData]:
+    """
+    Parse a batch of menu texts.
+
+    Args:
+        texts: Raw OCR texts
+
+    Returns:
+        MenuData for each text, in order
+    """
+    return [parse_menu_text(text) for text in texts]
@@ -0,0 +1,77 @@
+"""
+In-process LRU cache of raw OCR text.
+Entries are keyed by image content hash + OCR engine + preprocessing parameters,
+so re-uploading the same photo skips OCR and goes straight to parse_menu_text.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))
+
+
+class OCRCache:
+    """Thread-safe LRU cache with hit/miss counters"""
+
+    def __init__(self, max_entries: int = OCR_CACHE_SIZE):
+        """
+        Args:
+            max_entries: Maximum number of cached OCR results
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(content_hash: str, engine: str, params: str) -> tuple:
+        """Build a cache key from the image hash, OCR engine and preprocessing parameters"""
+        return (content_hash, engine, params)
+
+    def get(self, key: tuple) -> Optional[str]:
+        """Return cached OCR text or None, marking the entry as recently used"""
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: tuple, text: str):
+        """Store OCR text, evicting the least recently used entries over the cap"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+ocr_cache = OCRCache()
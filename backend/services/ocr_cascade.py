@@ -0,0 +1,97 @@
+"""
+Confidence-gated OCR cascade.
+Tesseract reads every page first; only pages whose result looks unreliable
+(low word confidence or few lines parsed into priced items) are escalated to
+the OpenAI Vision API.
+"""
+
+import os
+import threading
+from typing import List
+from models.menu import MenuData
+
+# A page is escalated when either check fails (configurable through environment variables)
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "75"))
+CASCADE_MIN_PRICED_RATIO = float(os.getenv("CASCADE_MIN_PRICED_RATIO", "0.3"))
+
+# Assumed OpenAI latency (seconds) for the latency-saved estimate until a real call has been timed
+CASCADE_OPENAI_LATENCY = float(os.getenv("CASCADE_OPENAI_LATENCY", "8"))
+
+
+def score_ocr_result(raw_text: str, confidences: List[float], parsed_data: MenuData) -> dict:
+    """
+    Score a Tesseract result.
+
+    Args:
+        raw_text: OCR text of the page
+        confidences: Per-word Tesseract confidences (0-100)
+        parsed_data: Result of parse_menu_text on raw_text
+
+    Returns:
+        Dict with mean_confidence, priced_lines, text_lines, priced_ratio and escalate
+    """
+    mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    text_lines = sum(1 for line in raw_text.split('\n') if len(line.strip()) >= 2)
+    priced_lines = sum(len(category.items) for category in parsed_data.categories)
+    priced_ratio = priced_lines / text_lines if text_lines else 0.0
+
+    return {
+        "mean_confidence": round(mean_confidence, 2),
+        "priced_lines": priced_lines,
+        "text_lines": text_lines,
+        "priced_ratio": round(priced_ratio, 4),
+        "escalate": mean_confidence < CASCADE_MIN_CONFIDENCE or priced_ratio < CASCADE_MIN_PRICED_RATIO
+    }
+
+
+class CascadeStats:
+    """Thread-safe counters for the cascade's escalation rate and latency"""
+
+    def __init__(self):
+        self.pages = 0
+        self.escalated = 0
+        self.tesseract_seconds = 0.0
+        self.openai_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, tesseract_seconds: float, openai_seconds: float = None):
+        """
+        Record one cascaded page.
+
+        Args:
+            tesseract_seconds: Time spent in Tesseract
+            openai_seconds: Time spent in OpenAI, or None if the page was not escalated
+        """
+        with self._lock:
+            self.pages += 1
+            self.tesseract_seconds += tesseract_seconds
+            if openai_seconds is not None:
+                self.escalated += 1
+                self.openai_seconds += openai_seconds
+
+    def stats(self) -> dict:
+        """
+        Return the escalation rate and the estimated latency saved compared to
+        sending every page to OpenAI (pages kept on Tesseract save one OpenAI call,
+        every page pays for its Tesseract pass).
+        """
+        with self._lock:
+            kept = self.pages - self.escalated
+            if self.escalated:
+                openai_latency = self.openai_seconds / self.escalated
+            else:
+                openai_latency = CASCADE_OPENAI_LATENCY
+            return {
+                "pages": self.pages,
+                "escalated": self.escalated,
+                "escalation_rate": round(self.escalated / self.pages, 4) if self.pages else 0.0,
+                "avg_tesseract_seconds": round(self.tesseract_seconds / self.pages, 4) if self.pages else 0.0,
+                "avg_openai_seconds": round(openai_latency, 4),
+                "openai_latency_measured": bool(self.escalated),
+                "latency_saved_seconds": round(kept * openai_latency - self.tesseract_seconds, 4),
+                "min_confidence": CASCADE_MIN_CONFIDENCE,
+                "min_priced_ratio": CASCADE_MIN_PRICED_RATIO
+            }
+
+
+cascade_stats = CascadeStats()
@@ -1,27 +1,106 @@
 import os
 import base64
+import threading
+from contextlib import aclosing
+import numpy as np
 import pytesseract
-from openai import OpenAI
 from PIL import Image
-from .image_service import preprocess_image
+from typing import AsyncIterator, List, Tuple, Union
+from .image_service import preprocess_array, segment_regions, prepare_openai_image
+from .openai_client import create_chat_completion
+from .executor import run_cpu
 
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
 
-def extract_text_openai(image_path: str) -> str:
-    """Use OpenAI Vision API for accurate text extraction"""
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+TESSERACT_CONFIG = r'--oem 3 --psm 6 -c preserve_interword_spaces=1'
 
-    with open(image_path, "rb") as image_file:
-        base64_image = base64.b64encode(image_file.read()).decode('utf-8')
+# "auto" uses the in-process tesserocr engine when installed, otherwise the pytesseract CLI wrapper
+TESSERACT_BACKEND = os.getenv("TESSERACT_BACKEND", "auto")
 
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": """Extract all menu items from this image and organize them by category.
+# Warm tesserocr engines, one per thread of each worker process
+_engines = threading.local()
+
+
+def _get_engine():
+    """Return this thread's Tesseract engine, loading the eng traineddata only once"""
+    engine = getattr(_engines, "api", None)
+    if engine is None:
+        engine = tesserocr.PyTessBaseAPI(lang='eng', psm=tesserocr.PSM.SINGLE_BLOCK, oem=tesserocr.OEM.DEFAULT)
+        engine.SetVariable("preserve_interword_spaces", "1")
+        _engines.api = engine
+    return engine
+
+
+def _tesserocr_enabled() -> bool:
+    if TESSERACT_BACKEND == "pytesseract":
+        return False
+    if tesserocr is None:
+        if TESSERACT_BACKEND == "tesserocr":
+            print("WARNING: tesserocr is not installed, falling back to pytesseract")
+        return False
+    return True
+
+
+USE_TESSEROCR = _tesserocr_enabled()
+
+
+def ocr_array(image: np.ndarray) -> str:
+    """
+    OCR a grayscale page held in a NumPy array.
+    With tesserocr the pixel buffer is handed to the warm engine directly;
+    otherwise pytesseract writes it to a temp file for the tesseract CLI.
+    """
+    if USE_TESSEROCR:
+        image = np.ascontiguousarray(image)
+        engine = _get_engine()
+        try:
+            engine.SetImageBytes(image.tobytes(), image.shape[1], image.shape[0], 1, image.strides[0])
+            return engine.GetUTF8Text()
+        finally:
+            engine.Clear()
+    return pytesseract.image_to_string(Image.fromarray(image), config=TESSERACT_CONFIG, lang='eng')
+
+
+def ocr_array_with_confidence(image: np.ndarray) -> Tuple[str, List[float]]:
+    """
+    OCR a grayscale page and also return Tesseract's per-word confidences (0-100).
+    Both come from the same recognition pass, so scoring costs no extra OCR run.
+    """
+    if USE_TESSEROCR:
+        image = np.ascontiguousarray(image)
+        engine = _get_engine()
+        try:
+            engine.SetImageBytes(image.tobytes(), image.shape[1], image.shape[0], 1, image.strides[0])
+            text = engine.GetUTF8Text()
+            return text, [float(conf) for conf in engine.AllWordConfidences()]
+        finally:
+            engine.Clear()
+
+    # One tesseract run writes both the plain text (exactly what image_to_string returns,
+    # with its line and paragraph breaks and column spacing) and the TSV word data the
+    # confidences come from. This is pytesseract's run_and_get_multiple_output with TESSERACT_CONFIG
+    cli = pytesseract.pytesseract
+    with cli.save(Image.fromarray(image)) as (output_base, input_filename):
+        cli.run_tesseract(input_filename, output_base, "txt tsv", "eng", f"-c tessedit_create_tsv=1 {TESSERACT_CONFIG}")
+        with open(f"{output_base}.txt", encoding="utf-8") as f:
+            text = f.read()
+        with open(f"{output_base}.tsv", encoding="utf-8") as f:
+            data = cli.file_to_dict(f.read(), "\t", -1)
+
+    # Non-word rows (page/block/line boxes) have a confidence of -1
+    confidences = [
+        float(conf) for conf, word in zip(data.get("conf", []), data.get("text", []))
+        if float(conf) >= 0 and str(word).strip()
+    ]
+    return text, confidences
+
+
+OPENAI_MODEL = "gpt-4o"
+
+MENU_PROMPT = """Extract all menu items from this image and organize them by category.
 
 IMPORTANT RULES:
 1. FIRST LINE: If there's a restaurant/cafe name at the top of the menu, put it as the FIRST LINE (no # prefix)
@@ -45,24 +124,83 @@ Item Name - $X.XX
 Item Name - $X.XX
 
 Use clear line breaks between categories."""
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
+
+
+def build_openai_messages(image_bytes: bytes, mime_type: str) -> list:
+    """Build the chat messages asking the vision model to transcribe a menu image"""
+    base64_image = base64.b64encode(image_bytes).decode('utf-8')
+    return [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": MENU_PROMPT
+                },
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:{mime_type};base64,{base64_image}",
+                        "detail": "high"
                     }
-                ]
-            }
-        ],
+                }
+            ]
+        }
+    ]
+
+
+async def extract_text_openai(image: Union[str, bytes], image_format: str = None) -> str:
+    """Use OpenAI Vision API for accurate text extraction (image_format overrides OPENAI_IMAGE_FORMAT)"""
+    image_bytes, mime_type = await run_cpu(prepare_openai_image, image, image_format)
+    response = await create_chat_completion(
+        model=OPENAI_MODEL,
+        messages=build_openai_messages(image_bytes, mime_type),
         max_tokens=2000
     )
     return response.choices[0].message.content
 
 
-def extract_text_tesseract(image_path: str) -> str:
-    """Extract text using Tesseract OCR"""
-    image = preprocess_image(image_path)
-    custom_config = r'--oem 3 --psm 6 -c preserve_interword_spaces=1'
-    text = pytesseract.image_to_string(image, config=custom_config, lang='eng')
-    return text
+async def stream_text_openai(image: Union[str, bytes], image_format: str = None) -> AsyncIterator[str]:
+    """Like extract_text_openai, but yields the model's text as it is generated"""
+    image_bytes, mime_type = await run_cpu(prepare_openai_image, image, image_format)
+    stream = await create_chat_completion(
+        model=OPENAI_MODEL,
+        messages=build_openai_messages(image_bytes, mime_type),
+        max_tokens=2000,
+        stream=True
+    )
+    # Close the stream (and free its request slot) even if the caller stops reading early
+    async with aclosing(stream):
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+def extract_text_tesseract(image: Union[str, bytes], quality: str = None) -> str:
+    """Extract text using Tesseract OCR (quality selects the preprocessing profile)"""
+    return ocr_array(preprocess_array(image, quality))
+
+
+def extract_text_tesseract_scored(image: Union[str, bytes], quality: str = None) -> Tuple[str, List[float]]:
+    """Extract text using Tesseract OCR along with per-word confidences"""
+    return ocr_array_with_confidence(preprocess_array(image, quality))
+
+
+def segment_for_ocr(image: Union[str, bytes], quality: str = None) -> List[np.ndarray]:
+    """Preprocess a page and cut it into column/block regions (in reading order) for OCR"""
+    page = preprocess_array(image, quality)
+    regions = []
+    for x, y, width, height in segment_regions(page):
+        # Tesseract reads better with a white margin around the text
+        regions.append(np.pad(page[y:y + height, x:x + width], 10, constant_values=255))
+    return regions
+
+
+def extract_text_tesseract_region(region: np.ndarray) -> str:
+    """Extract text from one segmented region (CPU pool workers run Tesseract single-threaded)"""
+    return ocr_array(region)
+
+
+def extract_text_tesseract_region_scored(region: np.ndarray) -> Tuple[str, List[float]]:
+    """Extract text and per-word confidences from one segmented region"""
+    return ocr_array_with_confidence(region)
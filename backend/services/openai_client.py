@@ -0,0 +1,145 @@
+"""
+Shared OpenAI client.
+One AsyncOpenAI client (and its keep-alive connection pool) is reused for every
+request. A semaphore caps the number of in-flight requests, and rate limits,
+server errors and dropped connections are retried with jittered exponential
+backoff that honors the API's Retry-After header.
+"""
+
+import asyncio
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Optional
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, InternalServerError, RateLimitError
+
+# Client settings (configurable through environment variables)
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "0.5"))
+OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", "30"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))
+
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+# The client and semaphore belong to the event loop they were created on
+_client: Optional[AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client for the running event loop"""
+    global _client, _semaphore, _loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _loop is not loop:
+        _client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=OPENAI_TIMEOUT,
+            # Retries are handled here so they can share the concurrency limit and honor Retry-After
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONCURRENCY,
+                    max_keepalive_connections=OPENAI_MAX_CONCURRENCY
+                ),
+                timeout=OPENAI_TIMEOUT
+            )
+        )
+        _semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+        _loop = loop
+    return _client
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Seconds to wait before retrying a failed request.
+    Uses the server's Retry-After (or retry-after-ms) header when present,
+    otherwise "full jitter" exponential backoff.
+
+    Args:
+        error: The exception raised by the request
+        attempt: Zero-based retry attempt
+
+    Returns:
+        Delay in seconds
+    """
+    if isinstance(error, APIStatusError):
+        headers = error.response.headers
+        retry_after_ms = headers.get("retry-after-ms")
+        retry_after = headers.get("retry-after")
+        try:
+            if retry_after_ms is not None:
+                return min(float(retry_after_ms) / 1000, OPENAI_BACKOFF_MAX)
+            if retry_after is not None:
+                if retry_after.replace(".", "", 1).isdigit():
+                    return min(float(retry_after), OPENAI_BACKOFF_MAX)
+                # HTTP-date form
+                return min(max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0), OPENAI_BACKOFF_MAX)
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0, min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF_BASE * 2 ** attempt))
+
+
+async def _hold_slot(stream, semaphore: asyncio.Semaphore) -> AsyncIterator:
+    """Yield the chunks of a stream, releasing its concurrency slot once it is exhausted or closed"""
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        try:
+            await stream.close()
+        finally:
+            semaphore.release()
+
+
+async def create_chat_completion(**kwargs):
+    """
+    Call chat.completions.create on the shared client with concurrency limiting and retries.
+    Takes the same keyword arguments as the OpenAI SDK (pass stream=True for a stream).
+    A stream keeps its slot until it is exhausted or closed, so close it (e.g. with
+    contextlib.aclosing) when stopping early.
+
+    Returns:
+        The ChatCompletion (or an async iterator of chunks when streaming)
+    """
+    client = get_client()
+    semaphore = _semaphore
+    attempt = 0
+    while True:
+        try:
+            # Only the request itself holds a slot, so waiting out a backoff does not block others
+            await semaphore.acquire()
+            try:
+                stats["requests"] += 1
+                response = await client.chat.completions.create(**kwargs)
+            except BaseException:
+                semaphore.release()
+                raise
+            if kwargs.get("stream"):
+                return _hold_slot(response, semaphore)
+            semaphore.release()
+            return response
+        except RETRYABLE_ERRORS as e:
+            if isinstance(e, RateLimitError):
+                stats["rate_limited"] += 1
+            if attempt >= OPENAI_MAX_RETRIES:
+                stats["failures"] += 1
+                raise
+            delay = retry_delay(e, attempt)
+            print(f"OpenAI request failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            stats["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+async def close_client():
+    """Close the shared client's connections (called on application shutdown)"""
+    global _client, _semaphore, _loop
+    if _client is not None:
+        await _client.close()
+    _client = _semaphore = _loop = None
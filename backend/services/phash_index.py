@@ -0,0 +1,166 @@
+"""
+In-memory near-duplicate index over menu perceptual hashes.
+Multi-index hashing finds menus whose image hash is within a few bits of a
+new upload without scanning every stored hash.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+NEAR_DUPLICATE_DISTANCE = int(os.getenv("NEAR_DUPLICATE_DISTANCE", "8"))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _flip_masks(bits: int, radius: int) -> List[int]:
+    """All masks with at most radius bits set within a bits-wide chunk"""
+    masks = [0]
+    for r in range(1, radius + 1):
+        masks.extend(sum(1 << i for i in positions) for positions in combinations(range(bits), r))
+    return masks
+
+
+class MultiIndexHashTable:
+    """
+    Multi-index hashing over 64-bit hashes.
+    Each hash is split into 4 chunks of 16 bits with one lookup table per chunk.
+    If two hashes are within distance r, at least one chunk differs by at most
+    r // 4 bits, so only buckets near each query chunk need to be checked.
+    """
+
+    CHUNKS = 4
+    CHUNK_BITS = 16
+
+    def __init__(self):
+        self._tables: List[Dict[int, Set[int]]] = [defaultdict(set) for _ in range(self.CHUNKS)]
+        self._menu_ids: Dict[int, Set[str]] = defaultdict(set)
+        self._mask_cache: Dict[int, List[int]] = {}
+
+    def _chunks(self, hash_value: int):
+        chunk_mask = (1 << self.CHUNK_BITS) - 1
+        for i in range(self.CHUNKS):
+            yield i, (hash_value >> (i * self.CHUNK_BITS)) & chunk_mask
+
+    def add(self, hash_value: int, menu_id: str):
+        if not self._menu_ids[hash_value]:
+            for i, chunk in self._chunks(hash_value):
+                self._tables[i][chunk].add(hash_value)
+        self._menu_ids[hash_value].add(menu_id)
+
+    def remove(self, hash_value: int, menu_id: str):
+        menu_ids = self._menu_ids.get(hash_value)
+        if not menu_ids:
+            return
+        menu_ids.discard(menu_id)
+        if not menu_ids:
+            del self._menu_ids[hash_value]
+            for i, chunk in self._chunks(hash_value):
+                bucket = self._tables[i].get(chunk)
+                if bucket is not None:
+                    bucket.discard(hash_value)
+                    if not bucket:
+                        del self._tables[i][chunk]
+
+    def search(self, hash_value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """Return (distance, menu_id) pairs within max_distance, closest first"""
+        chunk_radius = max_distance // self.CHUNKS
+        masks = self._mask_cache.get(chunk_radius)
+        if masks is None:
+            masks = self._mask_cache[chunk_radius] = _flip_masks(self.CHUNK_BITS, chunk_radius)
+
+        candidates = set()
+        for i, chunk in self._chunks(hash_value):
+            table = self._tables[i]
+            for mask in masks:
+                bucket = table.get(chunk ^ mask)
+                if bucket:
+                    candidates.update(bucket)
+
+        results = []
+        for candidate in candidates:
+            distance = hamming_distance(hash_value, candidate)
+            if distance <= max_distance:
+                results.extend((distance, menu_id) for menu_id in self._menu_ids[candidate])
+
+        results.sort()
+        return results
+
+
+class PerceptualHashIndex:
+    """
+    Thread-safe near-duplicate index.
+    Loaded lazily from the database on first use, then kept up to date
+    incrementally as menus are saved and deleted.
+    """
+
+    def __init__(self):
+        self._table = MultiIndexHashTable()
+        self._hashes: Dict[str, int] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, loader: Callable[[], Iterable[Tuple[str, str]]]):
+        """
+        Build the index from (menu_id, hex hash) pairs if it has not been built yet.
+
+        Args:
+            loader: Callable returning the stored hashes
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            for menu_id, hex_hash in loader():
+                self._add(menu_id, hex_hash)
+            self._loaded = True
+
+    def add(self, menu_id: str, hex_hash: Optional[str]):
+        """Index a newly saved menu (no-op until the index is loaded, the load will include it)"""
+        if not hex_hash:
+            return
+        with self._lock:
+            if self._loaded:
+                self._add(menu_id, hex_hash)
+
+    def remove(self, menu_id: str):
+        """Remove a deleted menu from the index"""
+        with self._lock:
+            hash_value = self._hashes.pop(menu_id, None)
+            if hash_value is not None:
+                self._table.remove(hash_value, menu_id)
+
+    def find_nearest(self, hex_hash: str, max_distance: int = NEAR_DUPLICATE_DISTANCE) -> Optional[Tuple[str, int]]:
+        """
+        Find the closest indexed menu within max_distance bits.
+
+        Returns:
+            (menu_id, distance) or None if there is no near-duplicate
+        """
+        with self._lock:
+            matches = self._table.search(int(hex_hash, 16), max_distance)
+        if not matches:
+            return None
+        distance, menu_id = matches[0]
+        return menu_id, distance
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _add(self, menu_id: str, hex_hash: str):
+        previous = self._hashes.get(menu_id)
+        if previous is not None:
+            self._table.remove(previous, menu_id)
+        hash_value = int(hex_hash, 16)
+        self._hashes[menu_id] = hash_value
+        self._table.add(hash_value, menu_id)
+
+
+phash_index = PerceptualHashIndex()
@@ -0,0 +1,180 @@
+"""
+Serialization, compression and conditional requests for API responses.
+JSON is encoded with orjson when it is installed (several times faster than
+the json module, same compact UTF-8 output). Large bodies are compressed with
+Brotli or gzip, whichever the client accepts; EncodedBody keeps the
+compressed variants of a cached response so each is only produced once.
+"""
+
+import gzip
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    # Optional: faster JSON encoding
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Optional: Brotli compression (smaller than gzip for JSON)
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+
+def dumps(payload) -> bytes:
+    """Serialize a JSON payload to compact UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding for a response from the Accept-Encoding header.
+
+    Args:
+        accept_encoding: Accept-Encoding request header
+
+    Returns:
+        "br", "gzip" or None (send uncompressed)
+    """
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q=") and params[2:].strip("0.") == "":
+            continue  # q=0 means "not acceptable"
+        accepted.add(coding.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with the given content coding ("br" or "gzip")"""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def matching_etag(if_none_match: Optional[str], etags: tuple) -> Optional[str]:
+    """
+    Find the ETag an If-None-Match header matches (weak comparison, as RFC 9110 requires).
+
+    Args:
+        if_none_match: If-None-Match request header
+        etags: Current ETags of the resource
+
+    Returns:
+        The matching ETag, or None
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etags[0]
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag in etags:
+            return tag
+    return None
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of a compressed variant (a strong ETag must differ per content coding)"""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def not_modified(request: Request, etag: str, cache_control: Optional[str] = None,
+                 vary: bool = False) -> Optional[Response]:
+    """
+    Return a 304 Not Modified response if the client's cached copy has this ETag, else None.
+
+    Args:
+        request: HTTP request (If-None-Match)
+        etag: Current ETag
+        cache_control: Cache-Control header of the 304, or None
+        vary: The response is negotiated by Accept-Encoding, so compressed variants match too
+    """
+    etags = (etag, variant_etag(etag, "br"), variant_etag(etag, "gzip")) if vary else (etag,)
+    matched = matching_etag(request.headers.get("if-none-match"), etags)
+    if matched is None:
+        return None
+    headers = {"ETag": matched}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if vary:
+        headers["Vary"] = "Accept-Encoding"
+    return Response(status_code=304, headers=headers)
+
+
+class EncodedBody:
+    """A serialized JSON response with its ETag, and compressed variants created on first use"""
+
+    __slots__ = ("body", "etag", "_variants", "_lock")
+
+    def __init__(self, body: bytes, etag: Optional[str] = None):
+        """
+        Args:
+            body: Uncompressed JSON bytes
+            etag: Quoted strong ETag of the uncompressed body, or None
+        """
+        self.body = body
+        self.etag = etag
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        """Return the body in a content coding (None for uncompressed), compressing it once"""
+        if encoding is None:
+            return self.body
+        variant = self._variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self._variants.get(encoding)
+                if variant is None:
+                    variant = self._variants[encoding] = compress(self.body, encoding)
+        return variant
+
+
+def json_response(request: Request, body: EncodedBody, cache_control: Optional[str] = None) -> Response:
+    """
+    Send a serialized JSON body, compressed if it is large and the client accepts it,
+    or 304 Not Modified if the client already has this version.
+
+    Args:
+        request: HTTP request (Accept-Encoding, If-None-Match)
+        body: Serialized response
+        cache_control: Cache-Control header value, or None
+
+    Returns:
+        Response
+    """
+    if body.etag:
+        cached = not_modified(request, body.etag, cache_control, vary=True)
+        if cached:
+            return cached
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) \
+        if len(body.body) >= COMPRESS_MIN_BYTES else None
+    headers = {"Vary": "Accept-Encoding"}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if body.etag:
+        headers["ETag"] = variant_etag(body.etag, encoding)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body.encoded(encoding), media_type="application/json", headers=headers)
@@ -0,0 +1,211 @@
+"""
+Menu scan pipeline shared by the synchronous upload endpoint and the job workers:
+OCR (or OCR cache) -> parse_menu_text, with per-stage timings.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from typing import AsyncIterator, List, Optional, Tuple, Union
+from models.menu import MenuData
+from .ocr_service import (
+    extract_text_openai, extract_text_tesseract, extract_text_tesseract_region, segment_for_ocr,
+    extract_text_tesseract_scored, extract_text_tesseract_region_scored, stream_text_openai
+)
+from .image_service import preprocess_params, openai_image_params, compute_perceptual_hash
+from .ocr_cache import ocr_cache
+from .ocr_cascade import score_ocr_result, cascade_stats
+from .menu_parser import parse_menu_text
+from .executor import run_cpu
+from .metrics import stage_seconds, scans_total, menu_items, record_timing
+
+load_dotenv()
+
+# "openai", "tesseract" or "cascade" (Tesseract first, OpenAI only for low-scoring pages).
+# Defaults to OpenAI when an API key is configured, as before.
+OCR_ENGINE = os.getenv("OCR_ENGINE", "openai" if os.getenv("OPENAI_API_KEY") else "tesseract")
+
+if OCR_ENGINE in ("openai", "cascade") and not os.getenv("OPENAI_API_KEY"):
+    print(f"WARNING: OCR_ENGINE={OCR_ENGINE} needs OPENAI_API_KEY, falling back to tesseract")
+    OCR_ENGINE = "tesseract"
+
+USE_OPENAI = OCR_ENGINE == "openai"
+
+# "page" runs Tesseract once over the whole page, "regions" segments the page
+# into columns/blocks and OCRs them in parallel
+TESSERACT_LAYOUT = os.getenv("TESSERACT_LAYOUT", "page")
+
+
+@contextmanager
+def stage_timer(timings: dict, stage: str):
+    """
+    Record the duration of a pipeline stage (in seconds) into timings[stage],
+    the stage latency histogram and the current request's Server-Timing header.
+    A stage that runs more than once (the cascade parses twice when it escalates)
+    adds up in timings.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        timings[stage] = round(timings.get(stage, 0) + seconds, 4)
+        stage_seconds.observe(seconds, stage=stage)
+        record_timing(stage, seconds)
+
+
+async def extract_text_regions(image: Union[str, bytes]) -> str:
+    """
+    Segment the page into regions, OCR them in parallel across the process pool
+    and stitch the text back together in reading order.
+    """
+    regions = await run_cpu(segment_for_ocr, image)
+    texts = await asyncio.gather(*(run_cpu(extract_text_tesseract_region, region) for region in regions))
+    return "\n".join(text.strip() for text in texts if text.strip())
+
+
+async def extract_text_scored(image: Union[str, bytes]) -> Tuple[str, List[float]]:
+    """Run Tesseract with the configured layout, returning text and per-word confidences"""
+    if TESSERACT_LAYOUT == "regions":
+        regions = await run_cpu(segment_for_ocr, image)
+        results = await asyncio.gather(*(run_cpu(extract_text_tesseract_region_scored, region) for region in regions))
+        text = "\n".join(text.strip() for text, _ in results if text.strip())
+        return text, [conf for _, confidences in results for conf in confidences]
+    return await run_cpu(extract_text_tesseract_scored, image)
+
+
+async def extract_text_cascade(image: Union[str, bytes], timings: dict) -> Tuple[str, MenuData]:
+    """
+    Read the page with Tesseract and escalate to OpenAI only when the result scores low.
+
+    Args:
+        image: Path to the uploaded image, or its bytes already in memory
+        timings: Dict that receives per-stage durations
+
+    Returns:
+        Tuple of (raw OCR text, parsed MenuData) from the engine that was kept
+    """
+    with stage_timer(timings, "ocr_tesseract"):
+        raw_text, confidences = await extract_text_scored(image)
+    with stage_timer(timings, "parse"):
+        parsed_data = parse_menu_text(raw_text)
+
+    score = score_ocr_result(raw_text, confidences, parsed_data)
+    if not score["escalate"]:
+        cascade_stats.record(timings["ocr_tesseract"])
+        return raw_text, parsed_data
+
+    print(f"Escalating to OpenAI (confidence {score['mean_confidence']}, priced ratio {score['priced_ratio']})")
+    with stage_timer(timings, "ocr_openai"):
+        raw_text = await extract_text_openai(image)
+    cascade_stats.record(timings["ocr_tesseract"], timings["ocr_openai"])
+    with stage_timer(timings, "parse"):
+        parsed_data = parse_menu_text(raw_text)
+    return raw_text, parsed_data
+
+
+async def extract_text(image: Union[str, bytes]) -> str:
+    """Run OCR on an image with the configured engine, off the event loop"""
+    if USE_OPENAI:
+        # OpenAI runs on the event loop through the shared async client, Tesseract in the process pool
+        return await extract_text_openai(image)
+    if TESSERACT_LAYOUT == "regions":
+        return await extract_text_regions(image)
+    return await run_cpu(extract_text_tesseract, image)
+
+
+async def perceptual_hash(image) -> str:
+    """Compute the perceptual hash of an image path or bytes in the process pool"""
+    return await run_cpu(compute_perceptual_hash, image)
+
+
+def ocr_cache_key(content_hash: str) -> tuple:
+    """Cache key for the OCR text of an image with the current engine and preprocessing"""
+    if USE_OPENAI:
+        # OpenAI receives the re-encoded image, not the Tesseract preprocessing
+        return ocr_cache.make_key(content_hash, "openai", openai_image_params())
+    return ocr_cache.make_key(content_hash, f"{OCR_ENGINE}-{TESSERACT_LAYOUT}", preprocess_params())
+
+
+async def scan_menu(image: Union[str, bytes], timings: Optional[dict] = None,
+                    content_hash: Optional[str] = None) -> Tuple[str, MenuData]:
+    """
+    Extract and parse the menu in an image.
+    When content_hash is given, cached OCR text for the same image is reused.
+
+    Args:
+        image: Path to the uploaded image, or its bytes already in memory
+        timings: Optional dict that receives per-stage durations
+        content_hash: SHA-256 hex digest of the image
+
+    Returns:
+        Tuple of (raw OCR text, parsed MenuData)
+    """
+    timings = {} if timings is None else timings
+    cache_key = ocr_cache_key(content_hash) if content_hash else None
+
+    parsed_data = None
+    outcome = "ocr"
+    try:
+        with stage_timer(timings, "ocr"):
+            raw_text = ocr_cache.get(cache_key) if cache_key else None
+            if raw_text is not None:
+                outcome = "cached"
+            elif OCR_ENGINE != "cascade":
+                raw_text = await extract_text(image)
+        if raw_text is None:
+            # The cascade times its own ocr_tesseract/ocr_openai stages, and parses
+            # the Tesseract text to score it, so it returns the parse too
+            raw_text, parsed_data = await extract_text_cascade(image, timings)
+        if cache_key and outcome == "ocr":
+            ocr_cache.put(cache_key, raw_text)
+
+        if parsed_data is None:
+            with stage_timer(timings, "parse"):
+                parsed_data = parse_menu_text(raw_text)
+    except Exception:
+        scans_total.inc(engine=OCR_ENGINE, outcome="error")
+        raise
+
+    scans_total.inc(engine=OCR_ENGINE, outcome=outcome)
+    menu_items.observe(sum(len(category.items) for category in parsed_data.categories))
+    return raw_text, parsed_data
+
+
+async def stream_menu_text(image: Union[str, bytes], timings: Optional[dict] = None,
+                           content_hash: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Yield the OCR text of an image as it becomes available.
+    With the OpenAI engine the model output is streamed token by token; cached
+    text and the Tesseract/cascade engines yield the whole text at once.
+
+    Args:
+        image: Path to the uploaded image, or its bytes already in memory
+        timings: Optional dict that receives the "ocr" duration
+        content_hash: SHA-256 hex digest of the image (enables the OCR cache)
+    """
+    timings = {} if timings is None else timings
+    cache_key = ocr_cache_key(content_hash) if content_hash else None
+
+    with stage_timer(timings, "ocr"):
+        raw_text = ocr_cache.get(cache_key) if cache_key else None
+        cached = raw_text is not None
+        if not cached and USE_OPENAI:
+            chunks = []
+            async for chunk in stream_text_openai(image):
+                chunks.append(chunk)
+                yield chunk
+            raw_text = "".join(chunks)
+            if cache_key:
+                ocr_cache.put(cache_key, raw_text)
+            return
+        if not cached and OCR_ENGINE != "cascade":
+            raw_text = await extract_text(image)
+    if raw_text is None:
+        # Timed as ocr_tesseract/ocr_openai by the cascade itself
+        raw_text, _ = await extract_text_cascade(image, timings)
+    if cache_key and not cached:
+        ocr_cache.put(cache_key, raw_text)
+    yield raw_text
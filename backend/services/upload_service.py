@@ -0,0 +1,230 @@
+"""
+Upload ingestion and cleanup.
+Uploaded images are copied to disk in fixed-size chunks while their SHA-256 is
+computed, and rejected as soon as they exceed MAX_UPLOAD_BYTES. The bytes are
+kept in one buffer so OCR can decode them without reading the file back.
+Finished uploads are moved into the content-addressed image store together
+with a thumbnail. Images are removed again when their last menu is deleted
+or when no menu or pending scan job refers to them.
+"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Iterable, List, Tuple
+from fastapi import UploadFile
+from PIL import UnidentifiedImageError
+from .executor import run_io, run_cpu
+from .image_service import make_thumbnail, THUMBNAIL_SIZE
+from .image_store import image_store, IMAGE_FORMATS
+from .metrics import timed, upload_bytes, upload_bytes_total, uploads_removed_total, upload_bytes_reclaimed_total
+
+# Upload limits (configurable through environment variables)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "uploads"))
+# Files younger than this are never removed (their menu or job may not be saved yet)
+UPLOAD_SWEEP_MIN_AGE = int(os.getenv("UPLOAD_SWEEP_MIN_AGE", "3600"))
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES"""
+
+    def __init__(self, max_bytes: int = MAX_UPLOAD_BYTES):
+        super().__init__(f"File must be smaller than {round(max_bytes / (1024 * 1024), 1):g}MB")
+        self.max_bytes = max_bytes
+
+
+class InvalidImageError(Exception):
+    """Raised when an upload is not an image format that can be decoded"""
+
+    def __init__(self):
+        super().__init__("File must be an image")
+
+
+async def ingest_upload(file: UploadFile, dest_path: Path = None,
+                        max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[bytearray, str]:
+    """
+    Read an upload chunk by chunk, hashing it and (optionally) writing it to disk.
+    Memory per upload is bounded by max_bytes plus one chunk.
+
+    Args:
+        file: Uploaded file
+        dest_path: Where to store the image, or None to only read it
+        max_bytes: Maximum accepted size
+
+    Returns:
+        Tuple of (image bytes, SHA-256 hex digest)
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_bytes (the partial file is removed)
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    digest = hashlib.sha256()
+    contents = bytearray()
+    with timed("upload"):
+        out = await run_io(open, dest_path, "wb") if dest_path else None
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                if len(contents) + len(chunk) > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                contents += chunk
+                if out:
+                    await run_io(out.write, chunk)
+        except BaseException:
+            if out:
+                out.close()
+                Path(dest_path).unlink(missing_ok=True)
+            raise
+        if out:
+            await run_io(out.close)
+    upload_bytes.observe(len(contents))
+    upload_bytes_total.inc(len(contents))
+    return contents, digest.hexdigest()
+
+
+async def store_upload(staging_path: Path, contents: bytes, content_hash: str) -> str:
+    """
+    Move an ingested upload into the image store and create its thumbnail.
+    An image that is already stored (same content hash) is not stored or decoded again.
+
+    Args:
+        staging_path: File the upload was written to (from image_store.staging_path())
+        contents: Image bytes
+        content_hash: SHA-256 hex digest of the image
+
+    Returns:
+        Location of the stored image (the image_path of its menu or job)
+
+    Raises:
+        InvalidImageError: If the upload cannot be decoded (the staged file is removed)
+    """
+    if await run_io(image_store.get_thumbnail, content_hash, THUMBNAIL_SIZE):
+        stored = await run_io(image_store.get, content_hash)
+        if stored:
+            return await run_io(image_store.put_file, content_hash, staging_path, stored.path.suffix)
+
+    try:
+        with timed("thumbnail"):
+            image_format, thumbnail = await run_cpu(make_thumbnail, contents)
+    except UnidentifiedImageError:
+        await run_io(Path(staging_path).unlink, missing_ok=True)
+        raise InvalidImageError()
+    extension, _ = IMAGE_FORMATS.get(image_format, ("", None))
+    location = await run_io(image_store.put_file, content_hash, staging_path, extension)
+    await run_io(image_store.put_thumbnail, content_hash, thumbnail, THUMBNAIL_SIZE)
+    return location
+
+
+async def create_thumbnail(content_hash: str) -> bool:
+    """
+    Create the thumbnail of a stored image that does not have one yet
+    (images stored before the thumbnail size was changed).
+
+    Args:
+        content_hash: SHA-256 hex digest of the image
+
+    Returns:
+        True if created, False if the image is not stored
+    """
+    stored = await run_io(image_store.get, content_hash)
+    if not stored:
+        return False
+    with timed("thumbnail"):
+        _, thumbnail = await run_cpu(make_thumbnail, str(stored.path))
+    await run_io(image_store.put_thumbnail, content_hash, thumbnail, THUMBNAIL_SIZE)
+    return True
+
+
+def _in_upload_dir(path: Path) -> bool:
+    """Whether a path is inside UPLOAD_DIR (only uploaded images are ever removed)"""
+    return path.resolve().parent == UPLOAD_DIR.resolve()
+
+
+def remove_upload(image_path: str) -> int:
+    """
+    Remove an uploaded image (with its thumbnails if it is in the image store).
+    Stored images are shared by menus with the same content, so only call this
+    once no menu or job refers to image_path anymore. A stored image written or
+    reused by an upload within UPLOAD_SWEEP_MIN_AGE is kept, since that upload's
+    menu or job may not be saved yet; the sweeper removes it later if it stays unused.
+
+    Args:
+        image_path: Image path as stored with the menu
+
+    Returns:
+        Bytes reclaimed (0 if the file does not exist, is kept or is not in UPLOAD_DIR or the store)
+    """
+    content_hash = image_store.hash_for_location(image_path)
+    if content_hash:
+        return image_store.delete(content_hash, min_age_seconds=UPLOAD_SWEEP_MIN_AGE)
+    path = Path(image_path) if image_path else None
+    if path is None or not _in_upload_dir(path):
+        return 0
+    try:
+        size = path.stat().st_size
+        path.unlink()
+    except FileNotFoundError:
+        return 0
+    return size
+
+
+def remove_uploads(image_paths: Iterable[str]) -> Tuple[int, int]:
+    """
+    Remove the images of deleted menus (the paths MenuBLL.delete_menu(s) returned).
+
+    Args:
+        image_paths: Image paths no menu or pending job uses anymore
+
+    Returns:
+        Tuple of (files removed, bytes reclaimed)
+    """
+    files = reclaimed = 0
+    for image_path in image_paths:
+        size = remove_upload(image_path)
+        if size:
+            files += 1
+            reclaimed += size
+    uploads_removed_total.inc(files, reason="menu_deleted")
+    upload_bytes_reclaimed_total.inc(reclaimed, reason="menu_deleted")
+    return files, reclaimed
+
+
+def remove_orphaned_uploads(referenced: Iterable[str], min_age_seconds: float,
+                            dry_run: bool = False) -> Tuple[List[Path], int]:
+    """
+    Remove files in UPLOAD_DIR and the image store that are not referenced anymore.
+    Recent files are kept, since an upload is written before its menu or job is saved.
+
+    Args:
+        referenced: Image paths still in use (menus and pending scan jobs)
+        min_age_seconds: Only remove files not modified for at least this long
+        dry_run: Only report what would be removed
+
+    Returns:
+        Tuple of (removed files, bytes reclaimed)
+    """
+    referenced = set(referenced)
+    removed, reclaimed = image_store.remove_orphans(referenced, min_age_seconds, dry_run)
+    if not UPLOAD_DIR.is_dir():
+        return removed, reclaimed
+    # Images uploaded before the image store was introduced
+    keep = {Path(image_path).resolve() for image_path in referenced if image_path}
+    cutoff = time.time() - min_age_seconds
+    for path in UPLOAD_DIR.iterdir():
+        try:
+            stat = path.stat()
+            if not path.is_file() or stat.st_mtime > cutoff or path.resolve() in keep:
+                continue
+            if not dry_run:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+        removed.append(path)
+        reclaimed += stat.st_size
+    return removed, reclaimed
@@ -0,0 +1,118 @@
+"""
+Background sweeper for orphaned upload files.
+Images left behind by failed scans, abandoned uploads or menus deleted outside
+the API are removed periodically, and the reclaimed space is reported.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Set
+
+from database import SessionLocal
+from bll.job_bll import JobBLL
+from bll.menu_bll import MenuBLL
+from .executor import run_db, run_io
+from .upload_service import remove_orphaned_uploads, UPLOAD_SWEEP_MIN_AGE
+from .metrics import uploads_removed_total, upload_bytes_reclaimed_total
+
+# Seconds between sweeps (0 disables the background sweeper)
+UPLOAD_SWEEP_INTERVAL = int(os.getenv("UPLOAD_SWEEP_INTERVAL", "3600"))
+
+
+def referenced_image_paths() -> Set[str]:
+    """Image paths still in use by menus and unfinished scan jobs"""
+    db = SessionLocal()
+    try:
+        return MenuBLL(db).get_image_paths() | JobBLL(db).get_pending_image_paths()
+    finally:
+        db.close()
+
+
+class UploadSweeper:
+    """Periodic task that removes upload files no menu or pending job refers to"""
+
+    def __init__(self, interval: int = UPLOAD_SWEEP_INTERVAL, min_age: int = UPLOAD_SWEEP_MIN_AGE):
+        """
+        Args:
+            interval: Seconds between sweeps (0 disables the background task)
+            min_age: Minimum file age in seconds before it can be removed
+        """
+        self.interval = interval
+        self.min_age = min_age
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.sweeps = 0
+        self.files_removed = 0
+        self.bytes_reclaimed = 0
+        self.last_sweep_at: Optional[str] = None
+        self.last_sweep_files = 0
+        self.last_sweep_bytes = 0
+
+    async def start(self):
+        """Start the background sweeps"""
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background sweeps"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def sweep(self, dry_run: bool = False) -> dict:
+        """
+        Remove orphaned upload files once.
+
+        Args:
+            dry_run: Only report what would be removed
+
+        Returns:
+            {"files": number of files, "bytes": bytes reclaimed, "dry_run"}
+        """
+        start = time.perf_counter()
+        referenced = await run_db(referenced_image_paths)
+        removed, reclaimed = await run_io(remove_orphaned_uploads, referenced, self.min_age, dry_run)
+        if not dry_run:
+            with self._lock:
+                self.sweeps += 1
+                self.files_removed += len(removed)
+                self.bytes_reclaimed += reclaimed
+                self.last_sweep_at = datetime.utcnow().isoformat()
+                self.last_sweep_files = len(removed)
+                self.last_sweep_bytes = reclaimed
+            uploads_removed_total.inc(len(removed), reason="orphaned")
+            upload_bytes_reclaimed_total.inc(reclaimed, reason="orphaned")
+        if removed:
+            action = "Would remove" if dry_run else "Removed"
+            print(f"{action} {len(removed)} orphaned upload(s), {reclaimed / (1024 * 1024):.1f}MB "
+                  f"in {time.perf_counter() - start:.1f}s")
+        return {"files": len(removed), "bytes": reclaimed, "dry_run": dry_run}
+
+    def stats(self) -> dict:
+        """Return sweep counters and reclaimed space"""
+        with self._lock:
+            return {
+                "interval_seconds": self.interval,
+                "min_age_seconds": self.min_age,
+                "sweeps": self.sweeps,
+                "files_removed": self.files_removed,
+                "bytes_reclaimed": self.bytes_reclaimed,
+                "last_sweep_at": self.last_sweep_at,
+                "last_sweep_files": self.last_sweep_files,
+                "last_sweep_bytes": self.last_sweep_bytes
+            }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"ERROR: Upload sweep failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+
+upload_sweeper = UploadSweeper()
@@ -0,0 +1,38 @@
+"""
+Shared test fixtures.
+Tests run from the backend directory (python -m pytest) and import the backend
+modules the same way the app does.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "scripts"))
+
+from benchmark_openai_client import start_server  # noqa: E402
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    """
+    Start a local stand-in of the chat completions API and point the OpenAI client at it.
+    The fixture is a function taking start_server's settings (latency, rate,
+    reject_first, retry_after); it returns the server's StandInState counters.
+    """
+    servers = []
+
+    def start(latency: float = 0.01, rate: float = 1000, reject_first: int = 0, retry_after: float = 0.0):
+        server, state = start_server(latency, rate, reject_first, retry_after)
+        servers.append(server)
+        monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+        return state
+
+    monkeypatch.setenv("OPENAI_API_KEY", "standin")
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,29 @@
+"""Tests for the worker pools"""
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import pytest
+
+from services import executor
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    yield
+    executor.shutdown_executors()
+
+
+def test_broken_cpu_pool_fails_the_call_and_is_replaced_for_later_calls():
+    async def test():
+        with pytest.raises(BrokenProcessPool):
+            # The worker process exits without a result, like a crash or an OOM kill
+            await executor.run_cpu(partial(os._exit, 1))
+        pool_after_failure = executor._cpu_pool
+        return pool_after_failure, await executor.run_cpu(pow, 2, 10)
+
+    pool_after_failure, result = asyncio.run(test())
+    assert pool_after_failure is None
+    assert result == 1024
@@ -0,0 +1,130 @@
+"""Tests for the shared OpenAI client against the stand-in server (see the standin fixture)"""
+
+import asyncio
+from contextlib import aclosing
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from services import openai_client
+
+CAP = 3
+MESSAGES = [{"role": "user", "content": "Transcribe this menu"}]
+
+
+@pytest.fixture(autouse=True)
+def client_settings(monkeypatch):
+    monkeypatch.setattr(openai_client, "OPENAI_MAX_CONCURRENCY", CAP)
+    monkeypatch.setattr(openai_client, "OPENAI_MAX_RETRIES", 3)
+    monkeypatch.setattr(openai_client, "stats", dict.fromkeys(openai_client.stats, 0))
+
+
+def run(test):
+    """Run a coroutine function on a new event loop, closing the shared client afterwards"""
+    async def main():
+        try:
+            return await test()
+        finally:
+            await openai_client.close_client()
+    return asyncio.run(main())
+
+
+def complete():
+    return openai_client.create_chat_completion(model="gpt-4o", messages=MESSAGES)
+
+
+def open_stream():
+    return openai_client.create_chat_completion(model="gpt-4o", messages=MESSAGES, stream=True)
+
+
+def rate_limit_error(headers: dict) -> RateLimitError:
+    request = httpx.Request("POST", "http://standin/v1/chat/completions")
+    return RateLimitError("Rate limit reached", response=httpx.Response(429, headers=headers, request=request), body=None)
+
+
+def test_in_flight_requests_never_exceed_the_cap(standin):
+    state = standin(latency=0.2)
+
+    async def read_stream():
+        stream = await open_stream()
+        return "".join([chunk.choices[0].delta.content async for chunk in stream if chunk.choices])
+
+    async def test():
+        # Half of them are streams, which hold their slot until they are read to the end
+        return await asyncio.gather(*(read_stream() if i % 2 else complete() for i in range(CAP * 4)))
+
+    results = run(test)
+    assert state.accepted == CAP * 4
+    assert state.max_in_flight == CAP
+    assert all(results[1::2])
+
+
+def test_retries_wait_for_retry_after(standin):
+    state = standin(reject_first=2, retry_after=0.3)
+
+    response = run(complete)
+
+    assert response.choices[0].message.content
+    assert len(state.requests) == 3
+    for (sent, retry_after), (retried, _) in zip(state.requests, state.requests[1:]):
+        # Retry-After is sent with millisecond precision
+        assert retried - sent >= retry_after - 0.001
+    assert openai_client.stats["retries"] == 2
+    assert openai_client.stats["rate_limited"] == 2
+
+
+def test_gives_up_after_max_retries(standin):
+    state = standin(reject_first=100, retry_after=0.01)
+
+    with pytest.raises(RateLimitError):
+        run(complete)
+
+    assert len(state.requests) == openai_client.OPENAI_MAX_RETRIES + 1
+    assert openai_client.stats["failures"] == 1
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "250"}, 0.25),
+    ({"retry-after": "2"}, 2.0),
+    ({"retry-after": "1.5"}, 1.5),
+    ({"retry-after": "3600"}, openai_client.OPENAI_BACKOFF_MAX)
+])
+def test_retry_delay_uses_retry_after(headers, expected):
+    assert openai_client.retry_delay(rate_limit_error(headers), 0) == pytest.approx(expected)
+
+
+def test_retry_delay_without_retry_after_is_jittered_backoff():
+    for attempt in range(6):
+        ceiling = min(openai_client.OPENAI_BACKOFF_MAX, openai_client.OPENAI_BACKOFF_BASE * 2 ** attempt)
+        assert 0 <= openai_client.retry_delay(rate_limit_error({}), attempt) <= ceiling
+
+
+def test_stream_closed_early_frees_its_slot(standin):
+    state = standin(latency=0.5)
+
+    async def test():
+        # If closing leaked the slot, stream number CAP + 1 would wait forever
+        for _ in range(CAP + 1):
+            stream = await asyncio.wait_for(open_stream(), timeout=5)
+            async with aclosing(stream):
+                async for _ in stream:
+                    break
+
+    run(test)
+    assert state.accepted == CAP + 1
+
+
+def test_requests_reuse_one_client_and_its_connections(standin):
+    state = standin(latency=0.05)
+
+    async def test():
+        client = openai_client.get_client()
+        await asyncio.gather(*(complete() for _ in range(CAP * 4)))
+        await complete()
+        return client is openai_client.get_client()
+
+    assert run(test)
+    assert state.accepted == CAP * 4 + 1
+    # Keep-alive connections are reused, so there is at most one per concurrency slot
+    assert state.connections <= CAP
@@ -3,6 +3,7 @@
 import { useState, useEffect } from 'react';
 import { menuApi } from '@/lib/api';
 import { MenuSummary } from '@/types/menu';
+import { API_CONFIG } from '@/lib/constants';
 
 interface MenuListProps {
   onSelectMenu: (menuId: string) => void;
@@ -81,6 +82,15 @@ export default function MenuList({ onSelectMenu }: MenuListProps) {
           onClick={() => onSelectMenu(menu.id)}
           className="bg-white rounded-lg shadow-md hover:shadow-xl transition-shadow cursor-pointer overflow-hidden"
         >
+          {menu.thumbnail_url && (
+            <img
+              src={`${API_CONFIG.BASE_URL}${menu.thumbnail_url}`}
+              alt={menu.restaurant_name || 'Menu preview'}
+              loading="lazy"
+              className="w-full h-40 object-cover bg-gray-100"
+              onError={(e) => { e.currentTarget.style.display = 'none'; }}
+            />
+          )}
           <div className="bg-gradient-to-r from-indigo-600 to-purple-600 text-white p-4">
             <h3 className="text-xl font-bold truncate">
               {menu.restaurant_name || 'Unknown Restaurant'}
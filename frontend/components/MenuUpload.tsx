@@ -1,7 +1,7 @@
 'use client';
 
 import { useState, useRef, useEffect } from 'react';
-import { MenuUploadProps } from '@/types/menu';
+import { MenuItem, MenuUploadProps } from '@/types/menu';
 import { menuApi } from '@/lib/api';
 import { FILE_CONFIG, ERROR_MESSAGES } from '@/lib/constants';
 
@@ -9,6 +9,7 @@ export default function MenuUpload({ onMenuProcessed, isLoading, setIsLoading }:
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
   const [preview, setPreview] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [streamedItems, setStreamedItems] = useState<MenuItem[]>([]);
   const fileInputRef = useRef<HTMLInputElement>(null);
 
   // Clean up preview URL when component unmounts or preview changes
@@ -33,16 +34,16 @@ export default function MenuUpload({ onMenuProcessed, isLoading, setIsLoading }:
         return;
       }
 
-      // Check if filename already exists
+      // Check if this image was already uploaded
       try {
-        const exists = await menuApi.checkFilename(file.name);
+        const exists = await menuApi.checkDuplicate(file);
         if (exists) {
           setError(ERROR_MESSAGES.DUPLICATE_FILE);
           if (fileInputRef.current) fileInputRef.current.value = '';
           return;
         }
       } catch (err) {
-        console.error('Error checking filename:', err);
+        console.error('Error checking for duplicate:', err);
         // Continue with upload if check fails
       }
 
@@ -60,9 +61,27 @@ export default function MenuUpload({ onMenuProcessed, isLoading, setIsLoading }:
 
     setIsLoading(true);
     setError(null);
+    setStreamedItems([]);
 
     try {
-      const data = await menuApi.uploadMenu(selectedFile);
+      // Offer to reuse an existing scan of the same menu
+      let reuseSimilar = false;
+      try {
+        const similar = await menuApi.findSimilar(selectedFile);
+        reuseSimilar = similar.match && window.confirm(ERROR_MESSAGES.SIMILAR_MENU_FOUND);
+      } catch (err) {
+        console.error('Error checking for similar menus:', err);
+        // Continue with a normal scan if the check fails
+      }
+
+      // Stream new scans so items show up while the menu is still being read
+      const data = reuseSimilar
+        ? await menuApi.uploadMenu(selectedFile, true)
+        : await menuApi.uploadMenuStream(selectedFile, (event) => {
+            if (event.type === 'item') {
+              setStreamedItems((items) => [...items, { name: event.name, price: event.price }]);
+            }
+          });
       onMenuProcessed(data);
     } catch (err: any) {
       setError(err.message || ERROR_MESSAGES.UPLOAD_FAILED);
@@ -86,15 +105,15 @@ export default function MenuUpload({ onMenuProcessed, isLoading, setIsLoading }:
         return;
       }
 
-      // Check if filename already exists
+      // Check if this image was already uploaded
       try {
-        const exists = await menuApi.checkFilename(file.name);
+        const exists = await menuApi.checkDuplicate(file);
         if (exists) {
           setError(ERROR_MESSAGES.DUPLICATE_FILE);
           return;
         }
       } catch (err) {
-        console.error('Error checking filename:', err);
+        console.error('Error checking for duplicate:', err);
         // Continue with upload if check fails
       }
 
@@ -178,6 +197,22 @@ export default function MenuUpload({ onMenuProcessed, isLoading, setIsLoading }:
         )}
       </div>
 
+      {isLoading && streamedItems.length > 0 && (
+        <div className="mt-4 p-4 bg-gray-50 border border-gray-200 rounded-lg">
+          <p className="text-sm font-semibold text-gray-700 mb-2">
+            Found {streamedItems.length} items so far...
+          </p>
+          <ul className="text-sm text-gray-600 space-y-1 max-h-48 overflow-y-auto">
+            {streamedItems.map((item, index) => (
+              <li key={index} className="flex justify-between">
+                <span>{item.name}</span>
+                <span className="font-medium">{item.price}</span>
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
+
       {error && (
         <div className="mt-4 p-4 bg-red-50 border border-red-200 rounded-lg">
           <p className="text-red-700 text-sm">{error}</p>
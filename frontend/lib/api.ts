@@ -1,5 +1,5 @@
 import axios, { AxiosError } from 'axios';
-import { MenuData, MenuSummary, MenuListResponse } from '@/types/menu';
+import { MenuData, MenuSummary, MenuListResponse, SimilarMenuResult, ScanEvent } from '@/types/menu';
 import { API_CONFIG, ERROR_MESSAGES } from './constants';
 
 const apiClient = axios.create({
@@ -21,7 +21,7 @@ export class ApiError extends Error {
 }
 
 export const menuApi = {
-  uploadMenu: async (file: File): Promise<MenuData> => {
+  uploadMenu: async (file: File, reuseSimilar = false): Promise<MenuData> => {
     try {
       const formData = new FormData();
       formData.append('file', file);
@@ -33,6 +33,7 @@ export const menuApi = {
           headers: {
             'Content-Type': 'multipart/form-data',
           },
+          params: reuseSimilar ? { reuse_similar: true } : undefined,
         }
       );
 
@@ -47,6 +48,50 @@ export const menuApi = {
     }
   },
 
+  uploadMenuStream: async (file: File, onEvent: (event: ScanEvent) => void): Promise<MenuData> => {
+    const formData = new FormData();
+    formData.append('file', file);
+
+    let response: Response;
+    try {
+      // axios cannot read a streamed response body in the browser, so use fetch here
+      response = await fetch(`${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.UPLOAD_MENU_STREAM}`, {
+        method: 'POST',
+        body: formData,
+      });
+    } catch (error) {
+      throw new ApiError(ERROR_MESSAGES.NETWORK_ERROR, undefined, error);
+    }
+
+    if (!response.ok || !response.body) {
+      const body = await response.json().catch(() => null);
+      throw new ApiError(body?.detail || ERROR_MESSAGES.UPLOAD_FAILED, response.status);
+    }
+
+    // Each line of the response is one JSON event
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += value;
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const event = JSON.parse(line) as ScanEvent;
+        if (event.type === 'error') {
+          throw new ApiError(event.detail || ERROR_MESSAGES.UPLOAD_FAILED);
+        }
+        if (event.type === 'menu') {
+          return event;
+        }
+        onEvent(event);
+      }
+    }
+    throw new ApiError(ERROR_MESSAGES.UPLOAD_FAILED);
+  },
+
   getAllMenus: async (): Promise<MenuSummary[]> => {
     try {
       const response = await apiClient.get<MenuListResponse>(
@@ -92,16 +137,47 @@ export const menuApi = {
     }
   },
 
-  checkFilename: async (filename: string): Promise<boolean> => {
+  checkDuplicate: async (file: File): Promise<boolean> => {
     try {
+      // Hash the file contents so a renamed copy of the same photo is still detected
+      const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+      const hash = Array.from(new Uint8Array(digest))
+        .map((b) => b.toString(16).padStart(2, '0'))
+        .join('');
+
       const response = await apiClient.get<{ exists: boolean }>(
-        API_CONFIG.ENDPOINTS.CHECK_FILENAME(filename)
+        API_CONFIG.ENDPOINTS.CHECK_HASH(hash)
       );
       return response.data.exists;
     } catch (error) {
       if (axios.isAxiosError(error)) {
         const axiosError = error as AxiosError<{ detail?: string }>;
-        const message = axiosError.response?.data?.detail || 'Failed to check filename';
+        const message = axiosError.response?.data?.detail || 'Failed to check for duplicate menu';
+        throw new ApiError(message, axiosError.response?.status, error);
+      }
+      throw new ApiError(ERROR_MESSAGES.NETWORK_ERROR, undefined, error);
+    }
+  },
+
+  findSimilar: async (file: File): Promise<SimilarMenuResult> => {
+    try {
+      const formData = new FormData();
+      formData.append('file', file);
+
+      const response = await apiClient.post<SimilarMenuResult>(
+        API_CONFIG.ENDPOINTS.FIND_SIMILAR,
+        formData,
+        {
+          headers: {
+            'Content-Type': 'multipart/form-data',
+          },
+        }
+      );
+      return response.data;
+    } catch (error) {
+      if (axios.isAxiosError(error)) {
+        const axiosError = error as AxiosError<{ detail?: string }>;
+        const message = axiosError.response?.data?.detail || 'Failed to check for similar menus';
         throw new ApiError(message, axiosError.response?.status, error);
       }
       throw new ApiError(ERROR_MESSAGES.NETWORK_ERROR, undefined, error);
@@ -2,10 +2,12 @@ export const API_CONFIG = {
   BASE_URL: process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000',
   ENDPOINTS: {
     UPLOAD_MENU: '/api/upload-menu',
+    UPLOAD_MENU_STREAM: '/api/upload-menu/stream',
     GET_MENUS: '/api/menus',
     GET_MENU: (id: string) => `/api/menus/${id}`,
     DELETE_MENU: (id: string) => `/api/menus/${id}`,
-    CHECK_FILENAME: (filename: string) => `/api/check-filename/${encodeURIComponent(filename)}`,
+    CHECK_HASH: (hash: string) => `/api/check-hash/${hash}`,
+    FIND_SIMILAR: '/api/find-similar',
   },
 } as const;
 
@@ -21,4 +23,5 @@ export const ERROR_MESSAGES = {
   UPLOAD_FAILED: 'Failed to process menu. Please try again.',
   NETWORK_ERROR: 'Network error. Please check your connection.',
   DUPLICATE_FILE: 'This menu has already been uploaded to the system.',
+  SIMILAR_MENU_FOUND: 'A very similar menu has already been scanned. Open the existing menu instead of scanning again?',
 } as const;
@@ -1,7 +1,13 @@
+export interface MenuItemPrice {
+  amount_cents: number;
+  label: string | null;
+}
+
 export interface MenuItem {
   name: string;
   price: string;
   description?: string;
+  prices?: MenuItemPrice[];
 }
 
 export interface MenuCategory {
@@ -32,9 +38,27 @@ export interface MenuSummary {
   restaurant_name: string;
   created_at: string;
   image_path: string;
+  image_url: string | null;
+  thumbnail_url: string | null;
 }
 
 export interface MenuListResponse {
   menus: MenuSummary[];
   total: number;
+  total_estimated: boolean;
+  next_cursor: string | null;
+}
+
+export type ScanEvent =
+  | { type: 'start'; menu_id: string }
+  | { type: 'restaurant'; name: string }
+  | { type: 'category'; name: string; is_main: boolean }
+  | ({ type: 'item'; category: string | null } & MenuItem)
+  | ({ type: 'menu' } & MenuData)
+  | { type: 'error'; detail: string };
+
+export interface SimilarMenuResult {
+  match: boolean;
+  menu_id: string | null;
+  distance: number | null;
 }